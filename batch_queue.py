@@ -0,0 +1,107 @@
+import os
+
+from burn_engine import BurnJob
+
+# ==========================================
+#            BATCH QUEUE MODEL
+# ==========================================
+# Plain data behind the queue view. The view only draws the rows that are on
+# screen, so everything here has to stay cheap at 10k+ entries: adding checks
+# duplicates through a dict index, not a scan.
+
+
+class QueueEntry:
+    __slots__ = ("filepath", "filename", "sub_path", "state", "estimate")
+
+    def __init__(self, filepath, sub_path=None):
+        self.filepath = filepath
+        self.filename = os.path.basename(filepath)
+        self.sub_path = sub_path  # set when the importer already paired a subtitle source
+        self.state = BurnJob.PENDING
+        self.estimate = None  # predicted encode seconds, once probed
+
+    def __repr__(self):
+        return f"<QueueEntry {self.filename} {self.state}>"
+
+
+class QueueModel:
+    """Ordered list of QueueEntry plus a path -> entry index.
+
+    Listeners registered with subscribe() are called (no arguments) after
+    every change; the GUI uses that to schedule a single redraw.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self.index = {}
+        self.listeners = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __contains__(self, filepath):
+        return filepath in self.index
+
+    def __getitem__(self, i):
+        return self.entries[i]
+
+    def subscribe(self, fn):
+        self.listeners.append(fn)
+
+    def _changed(self):
+        for fn in self.listeners:
+            fn()
+
+    def paths(self):
+        return [e.filepath for e in self.entries]
+
+    def get(self, filepath):
+        return self.index.get(filepath)
+
+    def subtitles(self):
+        """{filepath: sub_path} for entries the importer already paired."""
+        return {e.filepath: e.sub_path for e in self.entries if e.sub_path}
+
+    def add(self, paths, subtitles=None):
+        """Appends every path not already queued. Returns the newly added paths."""
+        subtitles = subtitles or {}
+        added = []
+        for p in paths:
+            if p in self.index: continue
+            entry = QueueEntry(p, subtitles.get(p))
+            self.index[p] = entry
+            self.entries.append(entry)
+            added.append(p)
+        if added: self._changed()
+        return added
+
+    def remove(self, filepath):
+        entry = self.index.pop(filepath, None)
+        if entry is None: return False
+        self.entries.remove(entry)
+        self._changed()
+        return True
+
+    def move(self, filepath, direction):
+        entry = self.index.get(filepath)
+        if entry is None: return False
+        i = self.entries.index(entry)
+        j = i + direction
+        if not 0 <= j < len(self.entries): return False
+        self.entries[i], self.entries[j] = self.entries[j], self.entries[i]
+        self._changed()
+        return True
+
+    def clear(self):
+        self.entries.clear()
+        self.index.clear()
+        self._changed()
+
+    def set_state(self, filepath, state):
+        entry = self.index.get(filepath)
+        if entry is None or entry.state == state: return
+        entry.state = state
+        self._changed()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Compares two run_bench.py result files scenario by scenario.
+
+    python bench/compare.py results/old.json results/new.json
+"""
+import sys
+import json
+
+METRICS = [
+    ("wall_s", "wall s", False),
+    ("first_job_s", "first job s", False),
+    ("fps", "fps", True),
+    ("stages.spawn_s", "spawn s", False),
+    ("stages.progress_parse_s", "parse s", False),
+    ("stages.ui_dispatch_s", "ui s", False),
+    ("peak_rss_kb.self", "rss KiB", False),
+]
+# Changes smaller than this are noise on a shared box
+THRESHOLD = 0.05
+STARTUP_METRICS = [
+    ("import_s", "import s"),
+    ("cli_first_job_cold_s", "cli first job (cold) s"),
+    ("cli_first_job_warm_s", "cli first job (warm) s"),
+]
+
+
+def lookup(scenario, key):
+    value = scenario
+    for part in key.split("."):
+        value = (value or {}).get(part)
+    return value
+
+
+def cell(label, a, b, higher_is_better):
+    """("label old->new (change)", 1 if it got worse else 0), or None when not comparable."""
+    if not a or b is None:
+        return None
+    change = (b - a) / a
+    flag = ""
+    if abs(change) >= THRESHOLD:
+        better = (change > 0) == higher_is_better
+        flag = " +" if better else " !"
+    return f"{label} {a:g}->{b:g} ({change:+.0%}){flag}", int(flag == " !")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print(__doc__.strip(), file=sys.stderr)
+        return 2
+    with open(argv[0], encoding='utf-8') as f: old = json.load(f)
+    with open(argv[1], encoding='utf-8') as f: new = json.load(f)
+    print(f"{old['meta'].get('commit')} -> {new['meta'].get('commit')}")
+
+    worse = 0
+    cells = []
+    for key, label in STARTUP_METRICS:
+        c = cell(label, (old.get("startup") or {}).get(key), (new.get("startup") or {}).get(key), False)
+        if c:
+            cells.append(c[0])
+            worse += c[1]
+    if cells:
+        print("startup: " + ", ".join(cells))
+
+    old_by_name = {s["name"]: s for s in old["scenarios"]}
+    for s in new["scenarios"]:
+        base = old_by_name.get(s["name"])
+        if base is None:
+            print(f"{s['name']}: new scenario")
+            continue
+        cells = []
+        for key, label, higher_is_better in METRICS:
+            c = cell(label, lookup(base, key), lookup(s, key), higher_is_better)
+            if c:
+                cells.append(c[0])
+                worse += c[1]
+        print(f"{s['name']}: " + ", ".join(cells))
+    return 1 if worse else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Scriptable stand-in for ffmpeg and ffprobe, for benchmarking the pipeline
+around the encoder (probing, spawning, progress parsing, callbacks) with
+no GPU and no real encode.
+
+Usage: fake_ffmpeg.py ffmpeg|ffprobe <normal arguments>
+
+Inputs are small JSON files written by run_bench.py:
+    {"duration": 600, "fps": 30, "width": 1920, "height": 1080, "vcodec": "h264"}
+
+Encodes "run" at BENCH_FAKE_SPEED x realtime (default 8) and write -progress
+blocks every BENCH_FAKE_PERIOD seconds (default 0.5, like real ffmpeg).
+With BENCH_FAKE_MARK set, each encode appends its start time (time.time())
+to that file, for time-to-first-job measurements.
+"""
+import os
+import sys
+import json
+import time
+
+SPEED = float(os.environ.get("BENCH_FAKE_SPEED", "8"))
+PERIOD = float(os.environ.get("BENCH_FAKE_PERIOD", "0.5"))
+KEYFRAME_INTERVAL = 2.0
+# Fake output bitrate, so output sizes and bitrates in reports are plausible
+BITRATE_KBPS = 4000
+
+
+def read_input(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"duration": 0, "fps": 30}
+
+
+def arg_after(args, flag, default=None):
+    return args[args.index(flag) + 1] if flag in args[:-1] else default
+
+
+def inputs_of(args):
+    return [args[i + 1] for i, a in enumerate(args[:-1]) if a == '-i']
+
+
+def ffprobe(args):
+    path = args[-1]
+    info = read_input(path)
+    duration, fps = float(info.get("duration", 0)), float(info.get("fps", 30))
+    frames = int(duration * fps)
+    if 'packet=pts_time,flags' in args:
+        step = int(KEYFRAME_INTERVAL * fps) or 1
+        sys.stdout.write("".join(f"{i / fps:.6f},{'K_' if i % step == 0 else '__'}\n" for i in range(frames)))
+    elif '-count_packets' in args:
+        print(json.dumps({"format": {"duration": str(duration)}, "streams": [
+            {"codec_type": "video", "nb_read_packets": str(frames), "duration": str(duration)},
+            {"codec_type": "audio", "nb_read_packets": str(int(duration * 46.875)), "duration": str(duration)},
+        ]}))
+    else:
+        print(json.dumps({
+            "format": {"duration": str(duration), "format_name": "mov,mp4", "bit_rate": str(BITRATE_KBPS * 1000),
+                       "size": str(os.path.getsize(path) if os.path.exists(path) else 0)},
+            "streams": [
+                {"index": 0, "codec_type": "video", "codec_name": info.get("vcodec", "h264"), "width": info.get("width", 1920),
+                 "height": info.get("height", 1080), "pix_fmt": "yuv420p", "avg_frame_rate": f"{int(fps)}/1"},
+                {"index": 1, "codec_type": "audio", "codec_name": "aac", "channels": 2},
+            ],
+        }))
+    return 0
+
+
+def ffmpeg(args):
+    if '-encoders' in args:
+        print(" V....D libx264              libx264 H.264 / AVC (stand-in)")
+        print(" V....D libx265              libx265 H.265 / HEVC (stand-in)")
+        return 0
+    if '-hwaccels' in args:
+        print("Hardware acceleration methods:")
+        return 0
+    if any('print_format=json' in a for a in args):
+        info = read_input(inputs_of(args)[0])
+        time.sleep(float(info.get("duration", 0)) / (SPEED * 20))  # audio-only decode is much faster
+        sys.stderr.write('[Parsed_loudnorm_0]\n{\n"input_i" : "-23.10",\n"input_tp" : "-3.20",\n'
+                         '"input_lra" : "5.40",\n"input_thresh" : "-33.60",\n"target_offset" : "0.20"\n}\n')
+        return 0
+    if 'lavfi' in args:  # encoder trial
+        return 0
+
+    mark = os.environ.get("BENCH_FAKE_MARK")
+    if mark:
+        with open(mark, "a", encoding='utf-8') as f:
+            f.write(f"{time.time()}\n")
+
+    # Progress covers the first input (concat lists and muxes are near-instant)
+    source = inputs_of(args)[0]
+    info = read_input(source) if source.endswith('.mp4') or source.endswith('.mkv') else {"duration": 0}
+    fps = float(info.get("fps", 30))
+    start = float(arg_after(args, '-ss', 0))
+    span = float(arg_after(args, '-t', max(0.0, float(info.get("duration", 0)) - start)))
+    copy = 'copy' in args and '-vf' not in args
+    wall = 0.0 if copy else span / SPEED
+    if '-vn' in args:  # audio-only pass
+        wall /= 20
+
+    out_path = args[-1]
+    t0 = time.monotonic()
+    done = False
+    while not done:
+        elapsed = time.monotonic() - t0
+        done = elapsed >= wall
+        out_time = span if done else span * elapsed / wall
+        frame = int(out_time * fps)
+        sys.stdout.write(
+            f"frame={frame}\nfps={frame / elapsed if elapsed else 0:.2f}\nbitrate={BITRATE_KBPS}.0kbits/s\n"
+            f"total_size={int(out_time * BITRATE_KBPS * 125)}\nout_time_us={int(out_time * 1e6)}\n"
+            f"out_time={time.strftime('%H:%M:%S', time.gmtime(out_time))}.{int(out_time % 1 * 1e6):06d}\n"
+            f"speed={SPEED if not copy else 100:.2f}x\nprogress={'end' if done else 'continue'}\n"
+        )
+        sys.stdout.flush()
+        sys.stderr.write(f"frame={frame} fps=0 q=23.0 size=N/A time={out_time:.2f} bitrate=N/A\n")
+        if not done:
+            time.sleep(min(PERIOD, max(0.0, wall - elapsed)))
+
+    if out_path != '-':
+        with open(out_path, "w", encoding='utf-8') as f:
+            json.dump(dict(info, duration=span), f)
+    return 0
+
+
+if __name__ == "__main__":
+    role, args = sys.argv[1], sys.argv[2:]
+    sys.exit(ffprobe(args) if role == "ffprobe" else ffmpeg(args))
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""Benchmarks the burn pipeline and writes JSON results that can be compared
+between commits (see compare.py).
+
+Two kinds of run:
+  fake  scriptable stand-in ffmpeg/ffprobe (fake_ffmpeg.py): measures our own
+        overhead (probe, spawn, progress parsing, UI dispatch) with no encoder
+  cpu   real ffmpeg + libx264 on synthetic lavfi testsrc2/sine inputs
+
+Every run also measures startup: the import time of the engine and, for
+the CLI in a fresh process, the time until the first encode starts (with an
+empty cache folder, then again with encoder detection cached).
+
+Neither needs a GPU. Example:
+    python bench/run_bench.py --mode fake --files 8 -j 2 -o results/$(git rev-parse --short HEAD).json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import burn_engine
+from burn_engine import BurnEngine, BurnJob, make_settings, find_ffmpeg
+from encoders import BACKENDS_BY_NAME
+from media_probe import MediaProber, ProbeCache, find_ffprobe
+
+FAKE_FFMPEG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_ffmpeg.py")
+# Subtitle cues per minute of video
+DENSITIES = {"sparse": 2, "normal": 12, "dense": 40}
+UI_INTERVAL = 0.1  # same drain period as the GUI's UiBus
+
+
+# --- SYNTHETIC INPUTS ---
+def write_srt(path, duration, per_minute, seed=0):
+    rng = random.Random(seed)
+    count = max(1, int(duration / 60 * per_minute))
+    gap = duration / count
+    with open(path, "w", encoding='utf-8') as f:
+        for i in range(count):
+            start = i * gap + rng.uniform(0, gap * 0.3)
+            end = min(duration, start + min(gap * 0.7, rng.uniform(1.5, 4.0)))
+            f.write(f"{i + 1}\n{_srt_time(start)} --> {_srt_time(end)}\nLine {i + 1} of the benchmark\n\n")
+
+
+def _srt_time(t):
+    ms = int(round(t * 1000))
+    return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d},{ms % 1000:03d}"
+
+
+def make_fake_inputs(work, count, duration, density):
+    paths = []
+    for i in range(count):
+        path = os.path.join(work, f"clip{i:03d}.mp4")
+        with open(path, "w", encoding='utf-8') as f:
+            json.dump({"duration": duration, "fps": 30, "width": 1920, "height": 1080, "vcodec": "h264"}, f)
+        write_srt(os.path.splitext(path)[0] + ".srt", duration, DENSITIES[density], seed=i)
+        paths.append(path)
+    return paths
+
+
+def make_lavfi_inputs(ffmpeg_exe, work, count, duration, density, size):
+    paths = []
+    for i in range(count):
+        path = os.path.join(work, f"clip{i:03d}.mp4")
+        cmd = [ffmpeg_exe, '-y', '-v', 'error',
+               '-f', 'lavfi', '-i', f"testsrc2=size={size}:rate=30:duration={duration}",
+               '-f', 'lavfi', '-i', f"sine=frequency={220 * (i + 1)}:duration={duration}",
+               '-c:v', 'libx264', '-preset', 'ultrafast', '-g', '60', '-pix_fmt', 'yuv420p',
+               '-c:a', 'aac', '-shortest', path]
+        subprocess.run(cmd, check=True)
+        write_srt(os.path.splitext(path)[0] + ".srt", duration, DENSITIES[density], seed=i)
+        paths.append(path)
+    return paths
+
+
+def fake_tools(work):
+    """Executables named ffmpeg/ffprobe that run fake_ffmpeg.py."""
+    bin_dir = os.path.join(work, "bin")
+    os.makedirs(bin_dir, exist_ok=True)
+    for role in ("ffmpeg", "ffprobe"):
+        path = os.path.join(bin_dir, role)
+        with open(path, "w", encoding='utf-8') as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_FFMPEG}" {role} "$@"\n')
+        os.chmod(path, 0o755)
+    return os.path.join(bin_dir, "ffmpeg"), os.path.join(bin_dir, "ffprobe")
+
+
+# --- INSTRUMENTATION ---
+class Stages:
+    """Time spent in each part of our own code, summed over all threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.totals = {"probe_s": 0.0, "spawn_s": 0.0, "progress_parse_s": 0.0, "ui_dispatch_s": 0.0}
+        self.counts = {"spawns": 0, "snapshots": 0, "callbacks": 0, "ui_drains": 0}
+
+    def add(self, stage, seconds, counter=None, n=1):
+        with self.lock:
+            self.totals[stage] += seconds
+            if counter: self.counts[counter] += n
+
+    def as_dict(self):
+        return {**{k: round(v, 6) for k, v in self.totals.items()}, **self.counts}
+
+
+def instrument(stages):
+    """Wraps the engine's Popen and progress parser with timers. Returns an undo function."""
+    real_popen, real_parse = burn_engine.subprocess.Popen, burn_engine.parse_progress
+
+    class TimedPopen(real_popen):
+        def __init__(self, *args, **kwargs):
+            t = time.perf_counter()
+            super().__init__(*args, **kwargs)
+            stages.add("spawn_s", time.perf_counter() - t, "spawns")
+
+    def timed_parse(lines):
+        # Time inside the parser, minus time blocked waiting for ffmpeg's output
+        blocked = [0.0]
+
+        def reader():
+            it = iter(lines)
+            while True:
+                t = time.perf_counter()
+                line = next(it, None)
+                blocked[0] += time.perf_counter() - t
+                if line is None: return
+                yield line
+
+        gen = real_parse(reader())
+        while True:
+            t, b = time.perf_counter(), blocked[0]
+            snap = next(gen, None)
+            stages.add("progress_parse_s", time.perf_counter() - t - (blocked[0] - b), "snapshots" if snap else None)
+            if snap is None: return
+            yield snap
+
+    burn_engine.subprocess.Popen = TimedPopen
+    burn_engine.parse_progress = timed_parse
+
+    def undo():
+        burn_engine.subprocess.Popen = real_popen
+        burn_engine.parse_progress = real_parse
+    return undo
+
+
+class HeadlessBus:
+    """Same keyed coalescing as the GUI's UiBus, drained from a timer thread
+    instead of Tk, calling what the GUI's handlers call."""
+
+    def __init__(self, stages):
+        self.stages = stages
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def post(self, key, fn, *args):
+        t = time.perf_counter()
+        with self.lock:
+            self.pending[key] = (fn, args)
+        self.stages.add("ui_dispatch_s", time.perf_counter() - t, "callbacks")
+
+    def _loop(self):
+        while not self.stop.wait(UI_INTERVAL):
+            self.drain()
+
+    def drain(self):
+        with self.lock:
+            batch, self.pending = self.pending, {}
+        if not batch: return
+        t = time.perf_counter()
+        for fn, args in batch.values():
+            fn(*args)
+        self.stages.add("ui_dispatch_s", time.perf_counter() - t, "ui_drains")
+
+    def close(self):
+        self.stop.set()
+        self.thread.join()
+        self.drain()
+
+
+def peak_rss_kb():
+    if resource is None:
+        return {"self": None, "children": None}
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1024 if sys.platform == "darwin" else 1
+    return {"self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale,
+            "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // scale}
+
+
+# --- SCENARIOS ---
+def run_scenario(name, ffmpeg_exe, ffprobe_exe, inputs, work, settings, jobs):
+    stages = Stages()
+    out_dir = os.path.join(work, f"out-{name}")
+    prober = MediaProber(ffmpeg_exe, ffprobe_exe, ProbeCache(os.path.join(work, f"probe-{name}.json")))
+
+    t = time.perf_counter()
+    prober.submit(inputs)
+    for p in inputs: prober.get(p)
+    stages.add("probe_s", time.perf_counter() - t)
+
+    bus = HeadlessBus(stages)
+    engine = None
+    first_job = []
+
+    def on_job_start(job):
+        if not first_job: first_job.append(time.perf_counter())
+        bus.post(("item", job.filepath), status)
+
+    def status():
+        engine.batch_progress(); engine.batch_eta(); engine.running_jobs()
+
+    undo = instrument(stages)
+    engine = BurnEngine(
+        settings, ffmpeg_exe=ffmpeg_exe, prober=prober, max_jobs=jobs, backends=[BACKENDS_BY_NAME["x264"]],
+        resource_limits={"cpu": jobs},
+        on_job_start=on_job_start,
+        on_progress=lambda job, f: (bus.post("progress", status), bus.post("status", status)),
+        on_job_done=lambda job: bus.post(("item", job.filepath), status),
+    )
+    try:
+        t = time.perf_counter()
+        done = engine.run(inputs, out_dir)
+        wall = time.perf_counter() - t
+    finally:
+        undo()
+        bus.close()
+        prober.shutdown()
+
+    media = sum(j.duration for j in done)
+    frames = sum(int(j.duration * ((j.info or {}).get("fps") or 0)) for j in done)
+    result = {
+        "name": name,
+        "files": len(inputs),
+        "jobs": jobs,
+        "ok": sum(j.status == BurnJob.DONE for j in done),
+        "media_seconds": round(media, 3),
+        "wall_s": round(wall, 4),
+        "first_job_s": round(first_job[0] - t, 4) if first_job else None,
+        "fps": round(frames / wall, 2) if wall else 0,
+        "speed": round(media / wall, 3) if wall else 0,
+        "stages": stages.as_dict(),
+        "peak_rss_kb": peak_rss_kb(),
+    }
+    shutil.rmtree(out_dir, ignore_errors=True)
+    return result
+
+
+# --- STARTUP ---
+def measure_import(module, runs=5):
+    """Median seconds to import `module` in a fresh interpreter."""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    times = []
+    for _ in range(runs):
+        r = subprocess.run([sys.executable, '-c', code], cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, encoding='utf-8')
+        if r.returncode != 0: return None
+        times.append(float(r.stdout))
+    return round(sorted(times)[len(times) // 2], 4)
+
+
+def measure_cli_first_job(ffmpeg_exe, input_path, work, home, name):
+    """Seconds from launching the CLI until the (fake) ffmpeg encode starts."""
+    mark = os.path.join(work, f"mark-{name}")
+    env = dict(os.environ, HOME=home, USERPROFILE=home, BENCH_FAKE_MARK=mark)
+    cmd = [sys.executable, os.path.join(ROOT, "burn_engine.py"), input_path, '-o', os.path.join(work, f"out-{name}"),
+           '--ffmpeg', ffmpeg_exe, '--encoder', 'x264']
+    t = time.time()
+    subprocess.run(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        with open(mark, encoding='utf-8') as f:
+            return round(float(f.readline()) - t, 4)
+    except (OSError, ValueError):
+        return None
+
+
+def measure_startup(work):
+    ffmpeg_exe, _ = fake_tools(work)
+    src = os.path.join(work, "startup")
+    os.makedirs(src, exist_ok=True)
+    input_path = make_fake_inputs(src, 1, 2, "sparse")[0]
+    home = os.path.join(work, "home")  # empty: no probe, encoder or subtitle caches yet
+    return {
+        "import_s": measure_import("burn_engine"),
+        "cli_first_job_cold_s": measure_cli_first_job(ffmpeg_exe, input_path, work, home, "cold"),
+        "cli_first_job_warm_s": measure_cli_first_job(ffmpeg_exe, input_path, work, home, "warm"),
+    }
+
+
+def git_commit():
+    try:
+        r = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, encoding='utf-8')
+        return r.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the subtitle burn pipeline (no GPU needed).")
+    parser.add_argument("--mode", choices=["fake", "cpu", "both"], default="fake")
+    parser.add_argument("--files", type=int, default=6)
+    parser.add_argument("--duration", type=float, help="seconds per input (default: 120 fake, 10 cpu)")
+    parser.add_argument("--density", action="append", choices=list(DENSITIES), help="subtitle density, repeatable (default: all)")
+    parser.add_argument("--size", default="640x360", help="frame size of cpu-mode inputs")
+    parser.add_argument("-j", "--jobs", type=int, default=2)
+    parser.add_argument("--smart", action="store_true", help="also run each scenario with smart render")
+    parser.add_argument("--ffmpeg", help="real ffmpeg for cpu mode (default: search PATH)")
+    parser.add_argument("-o", "--output", help="write JSON results here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    densities = args.density or list(DENSITIES)
+    modes = ["fake", "cpu"] if args.mode == "both" else [args.mode]
+    results = {
+        "meta": {"commit": git_commit(), "python": platform.python_version(), "platform": platform.platform(),
+                 "cpu_count": os.cpu_count(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                 "fake_speed": float(os.environ.get("BENCH_FAKE_SPEED", "8"))},
+        "scenarios": [],
+    }
+
+    work = tempfile.mkdtemp(prefix="subburn-bench-")
+    try:
+        print("measuring startup ...", file=sys.stderr)
+        results["startup"] = measure_startup(work)
+        for mode in modes:
+            if mode == "fake":
+                ffmpeg_exe, ffprobe_exe = fake_tools(work)
+                duration = args.duration or 120
+            else:
+                ffmpeg_exe = args.ffmpeg or find_ffmpeg()
+                ffprobe_exe = find_ffprobe(ffmpeg_exe)
+                if not ffmpeg_exe:
+                    parser.error("cpu mode needs ffmpeg with libx264")
+                duration = args.duration or 10
+            for density in densities:
+                src = os.path.join(work, f"{mode}-{density}")
+                os.makedirs(src, exist_ok=True)
+                if mode == "fake":
+                    inputs = make_fake_inputs(src, args.files, duration, density)
+                else:
+                    inputs = make_lavfi_inputs(ffmpeg_exe, src, args.files, duration, density, args.size)
+                variants = [("full", False)] + ([("smart", True)] if args.smart else [])
+                for variant, smart in variants:
+                    name = f"{mode}-{density}-{variant}"
+                    settings = make_settings(encoder="x264", preset="p1", resume=False, smart_render=smart)
+                    print(f"running {name} ...", file=sys.stderr)
+                    results["scenarios"].append(run_scenario(name, ffmpeg_exe, ffprobe_exe, inputs, work, settings, args.jobs))
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
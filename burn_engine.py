@@ -0,0 +1,1023 @@
+import os
+import sys
+import time
+import shutil
+import sqlite3
+import collections
+import argparse
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import smart_render
+import segment_encode
+from subtitles import load_cues, subtitle_filter, is_prestyled, SubtitleCache
+import loudness
+from job_journal import open_journal, job_fingerprint
+from output_stage import OutputStager, StageError, output_path_for, common_root, estimate_output_size
+from job_metrics import DEFAULT_METRICS_PORT, MetricsServer, export_report
+from throughput import ThroughputModel, makespan, longest_first
+from encoders import BACKENDS, BACKENDS_BY_NAME, detect_backends, choose_backends, backend_for_codec
+from ffmpeg_utils import popen_kwargs, find_ffmpeg, suspend_process, resume_process, terminate_process
+from media_probe import MediaProber
+from media_import import expand_inputs
+from ffmpeg_progress import PROGRESS_ARGS, parse_progress, throttle, drain_lines
+
+# ==========================================
+#        HEADLESS BURN ENGINE (NO GUI)
+# ==========================================
+# Everything in here runs without a display. The Tk app in subtitle_burner.py
+# is just one client of BurnEngine; the CLI at the bottom is another.
+
+# Mappings
+PRESET_MAP = {"Fast (p1)": "p1", "Balanced (p4)": "p4", "Best (p7)": "p7"}
+AUDIO_MAP = {"Copy": "copy", "AAC": "aac", "Normalize": "normalize"}
+COLORS = {"White": "&HFFFFFF&", "Yellow": "&H00FFFF&", "Cyan": "&HFFFF00&", "Green": "&H00FF00&"}
+# Several deliverables from one decode; the first entry is the main output (see "outputs")
+OUTPUT_PROFILES = {
+    "Single Output": [],
+    "+ 720p H.264 Proxy": [{}, {"height": 720, "codec": "h264"}],
+    "+ Proxy + Clean Copy": [{}, {"height": 720, "codec": "h264"}, {"burn": False}],
+}
+
+STDERR_TAIL_LINES = 20
+
+# Same keys get_settings() in the GUI produces (minus the GUI-only "finish")
+DEFAULT_SETTINGS = {
+    "font": "Arial",
+    "size": 24,
+    "color": COLORS["White"],
+    "preset": PRESET_MAP["Balanced (p4)"],
+    "audio": AUDIO_MAP["Copy"],
+    # Segment-parallel mode: split files at least this long into N spans (0 = off)
+    "segments": 0,
+    "segment_min_duration": 20 * 60,
+    # Smart render: re-encode only GOPs with subtitles, stream-copy the rest
+    "smart_render": False,
+    # Count every packet of source and output after a segmented/smart join (slow on long files);
+    # off, only the stream durations in the headers are compared
+    "verify_joins": False,
+    # Encoder backend name from encoders.BACKENDS, or "auto" for the fastest one found
+    "encoder": "auto",
+    # Let jobs overflow onto other backends (e.g. CPU) when the preferred one is full
+    "cpu_spill": False,
+    # Skip outputs the job journal says are complete and up to date
+    "resume": True,
+    # "queue" keeps the user's order; "longest_first" starts the longest predicted jobs first
+    "order": "queue",
+    # Fast local folder to encode into before the output is moved/copied into place (None = next to the output)
+    "scratch": None,
+    # Multi-output: one dict per output file, all encoded from a single decode. Keys (all
+    # optional): height (scale down to this), codec ("hevc"/"h264"), burn (False = no
+    # subtitles), preset, suffix. The first is the main output; [] = just the one output.
+    "outputs": [],
+}
+
+def make_settings(**overrides):
+    """Returns a full settings dict, filling anything missing from DEFAULT_SETTINGS."""
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update({k: v for k, v in overrides.items() if v is not None})
+    return settings
+
+
+# --- FILTER / COMMAND BUILDING ---
+def build_style(settings):
+    return f"FontName={settings['font']},Fontsize={settings['size']},PrimaryColour={settings['color']},Bold=1,Outline=2,Shadow=1,MarginV=25"
+
+
+def find_subtitle(fpath):
+    """Sidecar .srt next to the video, else the video itself (embedded track)."""
+    srt_path = os.path.splitext(fpath)[0] + ".srt"
+    return srt_path if os.path.exists(srt_path) else fpath
+
+
+def build_subtitle_filter(fpath, settings, sub_path=None):
+    sub_path = sub_path or find_subtitle(fpath)
+    return subtitle_filter(sub_path, None if is_prestyled(sub_path) else build_style(settings))
+
+
+def audio_args(audio_mode, measurement=None):
+    """measurement: loudness pass-1 result for 'normalize' (linear pass 2);
+    without one it falls back to single-pass loudnorm."""
+    if audio_mode == 'aac': return ['-c:a', 'aac', '-b:a', '192k']
+    if audio_mode == 'normalize':
+        af = loudness.linear_filter(measurement) if measurement else loudness.one_pass_filter()
+        return ['-af', af, '-ar', loudness.OUTPUT_RATE, '-c:a', 'aac', '-b:a', '192k']
+    if audio_mode == 'none': return ['-an']
+    return ['-c:a', 'copy']
+
+
+# What every command used before backends existed; still the default when none is given
+DEFAULT_BACKEND = BACKENDS_BY_NAME["nvenc_hevc"]
+
+
+def build_burn_cmd(ffmpeg_exe, fpath, out_path, settings, sub_path=None, backend=None, measurement=None):
+    backend = backend or DEFAULT_BACKEND
+    vf = build_subtitle_filter(fpath, settings, sub_path)
+    return [
+        ffmpeg_exe, '-y', '-hide_banner', *PROGRESS_ARGS, *backend.input_args(),
+        '-i', fpath, '-map', '0:v:0', '-map', '0:a:0?', '-vf', f"{vf},format=yuv420p",
+        *backend.video_args(settings['preset'])
+    ] + audio_args(settings['audio'], measurement) + [out_path]
+
+
+def variant_suffix(variant):
+    """File name suffix of an extra output, e.g. _720p_h264 or _clean."""
+    if variant.get("suffix"): return variant["suffix"]
+    parts = [f"{variant['height']}p"] if variant.get("height") else []
+    parts += [variant["codec"]] if variant.get("codec") else []
+    parts += [] if variant.get("burn", True) else ["clean"]
+    return "_" + "_".join(parts or ["alt"])
+
+
+def parse_variant(spec):
+    """CLI variant spec: [HEIGHT|source][:CODEC][:clean], e.g. 720:h264 or clean."""
+    variant = {}
+    for part in filter(None, spec.lower().split(":")):
+        if part.isdigit(): variant["height"] = int(part)
+        elif part == "clean": variant["burn"] = False
+        elif part in ("hevc", "h264"): variant["codec"] = part
+        elif part != "source": raise ValueError(f"unknown output variant part: {part}")
+    return variant
+
+
+def build_multi_cmd(ffmpeg_exe, fpath, outputs, settings, sub_path=None, input_backend=None, measurement=None):
+    """One decode, several outputs. outputs: [(out_path, backend, variant), ...].
+    The source is split before the subtitles filter only when some outputs
+    are clean, and once after it for the burned ones, so libass renders
+    each frame once however many burned outputs there are."""
+    burned = [i for i, (_, _, v) in enumerate(outputs) if v.get("burn", True)]
+    clean = [i for i, (_, _, v) in enumerate(outputs) if not v.get("burn", True)]
+    burn_src = clean_src = "[0:v]"
+    graph = []
+    if burned and clean:
+        graph.append("[0:v]split=2[burn][clean]")
+        burn_src, clean_src = "[burn]", "[clean]"
+    if burned:
+        graph.append(f"{burn_src}{build_subtitle_filter(fpath, settings, sub_path)},split={len(burned)}" + "".join(f"[s{i}]" for i in burned))
+    if clean:
+        graph.append(f"{clean_src}split={len(clean)}" + "".join(f"[s{i}]" for i in clean))
+    out_args = []
+    for i, (out_path, backend, variant) in enumerate(outputs):
+        # Never upscale: the smaller of the requested and the source height
+        scale = f"scale=-2:'min({variant['height']},ih)'," if variant.get("height") else ""
+        graph.append(f"[s{i}]{scale}format=yuv420p[v{i}]")
+        out_args += ['-map', f'[v{i}]', '-map', '0:a:0?', *backend.video_args(variant.get("preset") or settings['preset'])]
+        out_args += audio_args(settings['audio'], measurement) + [out_path]
+    return [
+        ffmpeg_exe, '-y', '-hide_banner', *PROGRESS_ARGS, *(input_backend or DEFAULT_BACKEND).input_args(),
+        '-i', fpath, '-filter_complex', ";".join(graph), *out_args
+    ]
+
+
+def build_mux_cmd(ffmpeg_exe, video_path, audio_src, out_path, audio):
+    """Final mux: encoded video stream-copied, audio (re)encoded from the source.
+    Only the first audio track: that is the one loudness pass 1 measured."""
+    return [
+        ffmpeg_exe, '-y', '-hide_banner', *PROGRESS_ARGS, '-i', video_path, '-i', audio_src,
+        '-map', '0:v:0', '-map', '1:a:0?', '-c:v', 'copy', *audio, out_path
+    ]
+
+
+def build_preview_cmd(ffmpeg_exe, fpath, out_path, settings, seconds=30, backend=None, sub_path=None, start=0.0):
+    backend = backend or DEFAULT_BACKEND
+    vf = build_subtitle_filter(fpath, settings, sub_path)
+    if start:
+        # Fast seek restarts timestamps at 0; shift them back for the subtitles filter
+        vf = f"setpts=PTS+{start:.3f}/TB,{vf},setpts=PTS-STARTPTS"
+    return [
+        ffmpeg_exe, '-y', '-hide_banner', *(['-ss', f"{start:.3f}"] if start else []), '-t', str(seconds),
+        '-i', fpath, '-vf', f"{vf},format=yuv420p",
+        *backend.video_args("p1"), out_path
+    ]
+
+
+def render_preview(ffmpeg_exe, input_path, settings, output_path=None, backend=None, start=0.0, seconds=30):
+    """Encodes a short sample (30s from the start by default). Returns the output path or None."""
+    output_path = output_path or os.path.join(os.path.dirname(input_path), "preview.mp4")
+    source = find_subtitle(input_path)
+    sub_path = SubtitleCache(ffmpeg_exe).prepare(source, build_style(settings)) or source
+    cmd = build_preview_cmd(ffmpeg_exe, input_path, output_path, settings, seconds, backend, sub_path, start)
+    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **popen_kwargs())
+    return output_path if os.path.exists(output_path) else None
+
+
+# ==========================================
+#                   JOBS
+# ==========================================
+class BurnJob:
+    PENDING, RUNNING, DONE, FAILED, CANCELLED = "pending", "running", "done", "failed", "cancelled"
+
+    def __init__(self, filepath, out_path, resource="nvenc", sub_path=None):
+        self.filepath = filepath
+        self.filename = os.path.basename(filepath)
+        self.out_path = out_path
+        self.sub_path = sub_path  # None -> looked up next to the video at encode time
+        self.burn_sub = None  # what the filter reads: the prepared (cached) file, else the source
+        self.work_path = None  # where ffmpeg writes; committed to out_path when the job succeeds
+        self.variants = []  # multi-output: dicts of the variant plus out_path/work_path; [0] is out_path itself
+        self.resource = resource
+        self.candidates = []  # EncoderBackends this job may run on, best first
+        self.backend = None   # the one the scheduler picked
+        self.segments = 1  # >1: segment-parallel encode, holding that many resource slots
+        self.mode = None   # "full", "segmented", "smart", "multi" or "skipped", set when the job starts
+        self.fingerprint = None  # of input + subtitle + settings, for the job journal
+        self.status = BurnJob.PENDING
+        self.progress = 0.0
+        self.duration = 0
+        self.info = None  # probe data (media_probe.parse_probe_json)
+        self.queued_at = None
+        self.started_at = None
+        self.finished_at = None
+        self.min_fps = None  # lowest fps ffmpeg reported (ignoring the 0 at start-up)
+        self.stats = None  # latest ffmpeg_progress.ProgressSnapshot
+        self.stderr_tail = []
+        self.returncode = None
+
+        # Per-job control state (each job owns its ffmpeg processes)
+        self.processes = []
+        self.is_paused = False
+        self.cancel_event = threading.Event()
+
+    def __repr__(self):
+        return f"<BurnJob {self.filename} {self.status} {self.progress:.0%}>"
+
+    # --- CONTROL (safe to call from any thread) ---
+    def pause(self):
+        if self._signal_process(suspend=True): self.is_paused = True
+
+    def resume(self):
+        if self._signal_process(suspend=False): self.is_paused = False
+
+    @property
+    def slots(self):
+        # Each encoder in a multi-output graph holds a session of its own
+        return max(self.segments, len(self.variants))
+
+    def _signal_process(self, suspend):
+        ok = False
+        for proc in list(self.processes):
+            if suspend_process(proc) if suspend else resume_process(proc):
+                ok = True
+        return ok
+
+    def cancel(self):
+        self.cancel_event.set()
+        self.is_paused = False
+        for proc in list(self.processes):
+            terminate_process(proc)
+
+
+# ==========================================
+#              JOB SCHEDULER
+# ==========================================
+# NVENC on consumer cards allows a handful of sessions; CPU encodes each want
+# several cores, so by default only a couple of those run side by side.
+DEFAULT_RESOURCE_LIMITS = {"nvenc": 3, "qsv": 2, "amf": 2, "videotoolbox": 2, "cpu": max(1, (os.cpu_count() or 4) // 8)}
+
+
+class JobScheduler:
+    """Runs jobs on up to `max_jobs` worker threads, never exceeding the
+    per-resource limit (job.resource -> max concurrent slots of that kind;
+    a plain job takes one slot, a segment-parallel job one per segment).
+
+    Pending jobs are started in order, but a job whose resource is full does
+    not block later jobs that need a different resource. A job with several
+    candidate backends runs on the first one whose resource has room, and
+    job.backend / job.resource are set to that choice.
+    """
+
+    def __init__(self, max_jobs=1, resource_limits=None):
+        self.max_jobs = max(1, int(max_jobs))
+        self.resource_limits = dict(DEFAULT_RESOURCE_LIMITS)
+        self.resource_limits.update(resource_limits or {})
+        self.cond = threading.Condition()
+        self.running = {}  # resource -> slots in use
+        self.active = 0    # jobs running
+
+    def limit_for(self, resource):
+        return self.resource_limits.get(resource)
+
+    def _has_room(self, resource, slots):
+        limit = self.limit_for(resource)
+        # A job wider than the limit runs alone rather than never
+        return limit is None or self.running.get(resource, 0) + min(slots, limit) <= limit
+
+    def _pick(self, job):
+        """(backend, resource) the job can start on right now, or None."""
+        if self.active >= self.max_jobs: return None
+        if not job.candidates:
+            return (None, job.resource) if self._has_room(job.resource, job.slots) else None
+        for backend in job.candidates:
+            if self._has_room(backend.resource, job.slots):
+                return backend, backend.resource
+        return None
+
+    def run(self, jobs, run_fn, stop_event):
+        """Blocks until every job has run or stop_event is set and the running ones finished."""
+        pending = list(jobs)
+        workers = []
+
+        def worker(job):
+            try:
+                run_fn(job)
+            finally:
+                with self.cond:
+                    self.running[job.resource] -= job.slots
+                    self.active -= 1
+                    self.cond.notify_all()
+
+        with self.cond:
+            while pending and not stop_event.is_set():
+                job, pick = next(((j, p) for j in pending for p in [self._pick(j)] if p), (None, None))
+                if job is None:
+                    self.cond.wait(0.5)
+                    continue
+                pending.remove(job)
+                if pick[0] is not None: job.backend = pick[0]
+                job.resource = pick[1]
+                if job.cancel_event.is_set():
+                    job.status = BurnJob.CANCELLED
+                    continue
+                self.running[job.resource] = self.running.get(job.resource, 0) + job.slots
+                self.active += 1
+                t = threading.Thread(target=worker, args=(job,), daemon=True)
+                t.start()
+                workers.append(t)
+
+        for t in workers:
+            t.join()
+
+
+# ==========================================
+#                  ENGINE
+# ==========================================
+class BurnEngine:
+    """Runs a batch of burn jobs. All reporting goes through the optional callbacks:
+
+    on_job_start(job), on_progress(job, fraction), on_job_done(job),
+    on_batch_done(jobs, completed)
+
+    on_progress is rate-limited to one call per job every `progress_interval`
+    seconds; job.stats holds the typed ffmpeg numbers behind it.
+
+    Callbacks fire on worker threads (several at once when max_jobs > 1), so
+    GUI clients must marshal them.
+    """
+
+    def __init__(self, settings=None, ffmpeg_exe=None, on_job_start=None, on_progress=None, on_job_done=None, on_batch_done=None,
+                 max_jobs=1, resource_limits=None, prober=None, progress_interval=0.5, backends=None, model=None,
+                 stage_tag=None):
+        self.settings = make_settings(**(settings or {}))
+        self.ffmpeg_exe = ffmpeg_exe or find_ffmpeg()
+        self.on_job_start = on_job_start
+        self.on_progress = on_progress
+        self.on_job_done = on_job_done
+        self.on_batch_done = on_batch_done
+        self.progress_interval = progress_interval
+        self.scheduler = JobScheduler(max_jobs, resource_limits)
+        # Share the GUI's prober when given one so files probed at import are not probed again
+        self.prober = prober or MediaProber(self.ffmpeg_exe)
+        # Detected lazily on the first run (cached on disk after the first detection)
+        self.backends = backends
+        # Learned encode speeds, shared with the GUI's estimates when it passes its own
+        self.model = model or ThroughputModel()
+        # Loudness pass 1 runs here, in the background, when audio is "normalize"
+        self.loudness = None
+        # Extracted / pre-styled subtitle files, shared across runs on disk
+        self.subtitles = SubtitleCache(self.ffmpeg_exe)
+        # Staging paths, free-space checks and the final rename/copy of outputs.
+        # stage_tag keeps this engine's staging names apart from another engine
+        # working on the same outputs (a job server worker holding a newer lease)
+        self.stager = OutputStager(self.settings["scratch"], tag=stage_tag)
+
+        self.jobs = []
+        self.journals = {}  # output folder -> JobJournal (None when it cannot be written)
+        self.journal_lock = threading.Lock()
+        self.is_paused = False
+        self.stop_event = threading.Event()
+
+    def _emit(self, callback, *args):
+        if callback:
+            callback(*args)
+
+    def make_jobs(self, inputs, output_dir=None, subtitles=None, root=None):
+        """Without output_dir each output goes to an Output folder next to its
+        input; with one, the inputs' folders below root (default: their
+        common folder) are mirrored inside it."""
+        if not inputs: return []
+        if output_dir and root is None:
+            root = common_root(inputs)
+        subtitles = subtitles or {}
+        return [BurnJob(f, output_path_for(f, output_dir, root), sub_path=subtitles.get(f)) for f in inputs]
+
+    def _job_weight(self, job):
+        # Media seconds when known, so a 2h film counts more than a 20min episode
+        info = self.prober.cache.get(job.filepath) if job.info is None else job.info
+        return (info or {}).get("duration") or 1.0
+
+    def batch_progress(self):
+        """Overall fraction done across every job in the batch, weighted by duration."""
+        if not self.jobs: return 0.0
+        total = done = 0.0
+        for j in self.jobs:
+            w = self._job_weight(j)
+            total += w
+            done += w * (1.0 if j.status == BurnJob.DONE else j.progress)
+        return done / total if total else 0.0
+
+    def estimate(self, job):
+        """Predicted wall seconds for the whole job, from probe data and the throughput model."""
+        info = job.info if job.info is not None else self.prober.cache.get(job.filepath)
+        backend = job.backend.name if job.backend else None
+        return self.model.predict_seconds(info, self.settings["preset"], backend, job.resource) / max(1, job.segments)
+
+    def workers(self):
+        """How many jobs can really run at once, given max_jobs and the resource limits."""
+        resources = {b.resource for j in self.jobs for b in j.candidates} or {j.resource for j in self.jobs}
+        limits = [self.scheduler.limit_for(r) for r in resources]
+        if any(l is None for l in limits): return self.scheduler.max_jobs
+        return max(1, min(self.scheduler.max_jobs, sum(limits)))
+
+    def batch_eta(self):
+        """Seconds left for the batch: running jobs from their live speed,
+        pending ones from the model, laid out over the available workers."""
+        busy, pending = [], []
+        for j in self.jobs:
+            if j.status == BurnJob.RUNNING:
+                if j.stats and j.stats.speed > 0 and j.duration:
+                    busy.append(j.duration * (1 - j.progress) / (j.stats.speed * j.segments))
+                else:
+                    busy.append(self.estimate(j) * (1 - j.progress))
+            elif j.status == BurnJob.PENDING:
+                pending.append(self.estimate(j))
+        if not busy and not pending: return None
+        return makespan(pending, self.workers(), busy)
+
+    def start(self, inputs, output_dir=None, subtitles=None, root=None):
+        """Same as run() but on a daemon thread. Returns the thread."""
+        t = threading.Thread(target=self.run, args=(inputs, output_dir, subtitles, root), daemon=True)
+        t.start()
+        return t
+
+    def run(self, inputs, output_dir=None, subtitles=None, root=None):
+        """Blocking batch run. Returns the list of BurnJob results.
+
+        subtitles optionally maps input -> subtitle source already found by
+        the importer, saving the per-file sidecar lookup.
+        """
+        if not self.ffmpeg_exe:
+            raise FileNotFoundError("FFmpeg not found")
+        self.stop_event.clear()
+        self.is_paused = False
+        self.jobs = self.make_jobs(inputs, output_dir, subtitles, root)
+        if self.backends is None:
+            self.backends = detect_backends(self.ffmpeg_exe)
+        candidates = choose_backends(self.backends, self.settings["encoder"], self.settings["cpu_spill"])
+        if not candidates:
+            # No silent failures: every job says why it did not run
+            for job in self.jobs:
+                job.status = BurnJob.FAILED
+                job.stderr_tail = ["No working video encoder found (checked NVENC, QSV, AMF, VideoToolbox, x264, x265)"]
+                self._emit(self.on_job_done, job)
+            self._emit(self.on_batch_done, self.jobs, True)
+            return self.jobs
+        now = time.time()
+        for job in self.jobs:
+            job.queued_at = now
+            job.candidates = candidates
+            job.backend = candidates[0]
+            job.resource = candidates[0].resource
+        # Probe everything up front in the background; encodes pick results up from the cache
+        self.prober.submit([j.filepath for j in self.jobs])
+        if self.settings["audio"] == "normalize":
+            self.loudness = self.loudness or loudness.LoudnessAnalyzer(self.ffmpeg_exe)
+            self.loudness.submit([j.filepath for j in self.jobs])
+        if self.settings["outputs"]:
+            self.plan_outputs()
+        elif self.settings["segments"] > 1:
+            self.plan_segments()
+        if self.settings["order"] == "longest_first":
+            # Needs every probe; they were started in parallel above
+            for job in self.jobs: self.prober.get(job.filepath)
+            self.jobs = longest_first(self.jobs, self.estimate)
+
+        self.scheduler.run(self.jobs, self.run_job, self.stop_event)
+        self.stager.wait()  # outputs still copying from scratch
+        self.prober.cache.save()
+        self.model.save()
+        if self.loudness: self.loudness.cache.save()
+        for journal in self.journals.values():
+            if journal: journal.close()
+        self.journals = {}
+
+        for job in self.jobs:
+            if job.status == BurnJob.PENDING: job.status = BurnJob.CANCELLED
+        self._emit(self.on_batch_done, self.jobs, not self.stop_event.is_set())
+        return self.jobs
+
+    def plan_segments(self):
+        """Marks long files for segment-parallel encoding. Needs their durations,
+        so this waits for the (parallel) probes of the batch.
+
+        A hardware encoder has a fixed number of sessions, so a file gets at
+        most that many spans there. On the CPU the requested count stands:
+        x264/x265 threads share the cores anyway, and a split file wider than
+        the CPU job limit simply runs alone."""
+        for job in self.jobs:
+            limit = None if job.resource == "cpu" else self.scheduler.limit_for(job.resource)
+            limit = limit or self.settings["segments"]
+            duration = self.prober.duration(job.filepath)
+            if duration >= self.settings["segment_min_duration"]:
+                job.segments = max(1, min(self.settings["segments"], limit))
+
+    def plan_outputs(self):
+        """Multi-output mode: one output per declared variant for every job,
+        all from a single decode (segment and smart modes do not apply)."""
+        for job in self.jobs:
+            stem, ext = os.path.splitext(job.out_path)
+            job.variants = [dict(v, out_path=job.out_path if i == 0 else stem + variant_suffix(v) + ext)
+                            for i, v in enumerate(self.settings["outputs"])]
+
+    def run_process(self, job, cmd, on_snapshot=None):
+        """Runs one ffmpeg owned by `job` to completion, feeding throttled
+        -progress snapshots to on_snapshot. Returns the exit code."""
+        # Own process group: pause and cancel reach anything ffmpeg spawns, and
+        # no stdin, so ffmpeg never waits on (or eats) the terminal
+        proc = subprocess.Popen(
+            cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True,
+            encoding='utf-8', errors='replace', **popen_kwargs(new_group=True)
+        )
+        job.processes.append(proc)
+        # Batch-wide pause applies to jobs that start while paused too
+        if self.is_paused or job.is_paused: job.pause()
+        if job.cancel_event.is_set(): terminate_process(proc)
+
+        # stderr only matters when something fails; keep its tail, drained on the side
+        tail = collections.deque(maxlen=STDERR_TAIL_LINES)
+        drain = threading.Thread(target=drain_lines, args=(proc.stderr, tail), daemon=True)
+        drain.start()
+
+        # Blocks while the process is suspended, so pausing costs nothing here
+        for snap in throttle(parse_progress(proc.stdout), self.progress_interval):
+            if on_snapshot: on_snapshot(snap)
+
+        returncode = proc.wait()
+        drain.join(timeout=1)
+        job.processes.remove(proc)
+        if returncode != 0 or not job.stderr_tail:
+            job.stderr_tail = list(tail)
+        return returncode
+
+    def settings_key(self):
+        """The settings that shape an output; changing any of them re-encodes."""
+        s = self.settings
+        key = [build_style(s), s["preset"], s["audio"], s["encoder"]]
+        if s["outputs"]: key.append(repr(s["outputs"]))
+        return "|".join(key)
+
+    def journal_for(self, job):
+        out_dir = os.path.dirname(os.path.abspath(job.out_path))
+        with self.journal_lock:
+            if out_dir not in self.journals:
+                self.journals[out_dir] = open_journal(out_dir)
+            return self.journals[out_dir]
+
+    def discard_partial(self, job):
+        """Removes whatever an earlier interrupted run left for this output.
+        An existing output stays until the new one replaces it."""
+        out_dir = os.path.dirname(job.out_path)
+        for kind in ("segments", "smart", "norm"):
+            shutil.rmtree(self.work_dir(job, kind, out_dir), ignore_errors=True)
+        for out_path in self.output_paths(job):
+            self.stager.clear(out_path)
+
+    def work_dir(self, job, kind, folder=None):
+        """Folder for a job's intermediate files (segments, smart parts, the
+        silent video before a loudness mux), next to its staging path."""
+        tag = f"{self.stager.tag}-" if self.stager.tag else ""
+        return os.path.join(folder or os.path.dirname(job.work_path), f".{kind}-{tag}{job.filename}")
+
+    def output_paths(self, job):
+        """Every file the job writes: its variants, or just out_path."""
+        return [v["out_path"] for v in job.variants] or [job.out_path]
+
+    def run_job(self, job):
+        """Runs one job on a scheduler thread. Any error ends the job as
+        FAILED with the error in stderr_tail instead of dying with the thread."""
+        try:
+            return self._run_job(job)
+        except Exception as e:
+            job.returncode = None
+            job.stderr_tail = [f"{type(e).__name__}: {e}"]
+            if job.finished_at is not None:
+                return job  # finish_job already ran; the error came after it
+            return self.finish_job(job, None)
+
+    def _run_job(self, job):
+        job.status = BurnJob.RUNNING
+        job.progress = 0.0
+        job.started_at = time.time()
+        os.makedirs(os.path.dirname(job.out_path) or ".", exist_ok=True)
+
+        journal = self.journal_for(job)
+        if journal:
+            job.fingerprint = job_fingerprint(job.filepath, job.sub_path or find_subtitle(job.filepath), self.settings_key())
+            outputs = self.output_paths(job)
+            try:
+                if self.settings["resume"] and all(journal.is_complete(p, job.fingerprint) for p in outputs):
+                    job.mode = "skipped"
+                    job.status = BurnJob.DONE
+                    job.progress = 1.0
+                    job.returncode = 0
+                    job.finished_at = time.time()
+                    self._emit(self.on_job_done, job)
+                    return job
+                # Not known to be complete and current: clear leftovers of an interrupted run
+                self.discard_partial(job)
+                for out_path in outputs:
+                    journal.begin(out_path, job.filepath, job.fingerprint)
+            except sqlite3.Error:
+                journal = None  # locked or damaged journal: this job runs without skip/resume
+        self._emit(self.on_job_start, job)
+
+        job.info = self.prober.get(job.filepath)
+        job.duration = (job.info or {}).get("duration") or 0
+        if os.path.abspath(job.out_path) == os.path.abspath(job.filepath):
+            # -o pointing at the input folder: committing would replace the source
+            job.stderr_tail = ["output path is the input file itself"]
+            return self.finish_job(job, journal)
+        # Segmented and smart encodes hold their parts and the joined file at once
+        copies = 2 if job.segments > 1 or self.settings["smart_render"] else 1
+        try:
+            job.work_path = self.stager.stage(job.out_path, estimate_output_size(job.info, job.filepath, copies))
+            for i, variant in enumerate(job.variants):
+                variant["work_path"] = job.work_path if i == 0 else self.stager.stage(variant["out_path"], estimate_output_size(job.info, job.filepath))
+        except StageError as e:
+            job.stderr_tail = [str(e)]
+            return self.finish_job(job, journal)
+        source = job.sub_path or find_subtitle(job.filepath)
+        job.burn_sub = self.subtitles.prepare(source, build_style(self.settings), (job.info or {}).get("subtitle_streams")) or source
+        if job.variants:
+            job.returncode = self.encode_multi(job)
+        else:
+            job.returncode = self.encode_smart(job) if self.settings["smart_render"] else None
+        if job.returncode is None:
+            job.returncode = self.encode_segmented(job) if job.segments > 1 else self.encode_single(job)
+
+        if job.returncode == 0 and not job.cancel_event.is_set():
+            job.progress = 1.0
+            if job.mode == "full":
+                # Segmented and smart speeds depend on the file, not just on the encoder
+                self.model.learn(job.info, self.settings["preset"], job.backend.name if job.backend else None,
+                                 job.duration, time.time() - job.started_at)
+            # Returning frees the slot at once; a copy off scratch overlaps the next encode
+            self.commit_outputs(job, journal)
+            return job
+        return self.finish_job(job, journal)
+
+    def commit_outputs(self, job, journal):
+        """Commits every output of the job; it finishes when the last is in place."""
+        outputs = [(v["work_path"], v["out_path"]) for v in job.variants] or [(job.work_path, job.out_path)]
+        remaining, errors, lock = [len(outputs)], [], threading.Lock()
+
+        def done(error):
+            with lock:
+                if error is not None: errors.append(error)
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                self.finish_job(job, journal, errors[0] if errors else None)
+
+        for work_path, out_path in outputs:
+            self.stager.commit(work_path, out_path, done, job.cancel_event)
+
+    def finish_job(self, job, journal, commit_error=None):
+        if job.cancel_event.is_set():
+            job.status = BurnJob.CANCELLED
+        elif job.returncode == 0 and commit_error is None:
+            job.status = BurnJob.DONE
+        else:
+            job.status = BurnJob.FAILED
+            if commit_error is not None:
+                job.stderr_tail = [f"could not move the output into place: {commit_error}"]
+        if journal:
+            try:
+                for out_path in self.output_paths(job):
+                    journal.finish(out_path, job.filepath, job.fingerprint, job.status == BurnJob.DONE)
+            except sqlite3.Error:
+                pass  # the next run just encodes this output again
+        if job.status != BurnJob.DONE:
+            for work_path in {job.work_path, *(v.get("work_path") for v in job.variants)} - {None}:
+                self.stager.discard(work_path)
+        job.finished_at = time.time()
+        self._emit(self.on_job_done, job)
+        return job
+
+    def _report(self, job, snap, out_time):
+        job.stats = snap
+        if snap.fps > 0 and snap.out_time > 1.0:
+            job.min_fps = snap.fps if job.min_fps is None else min(job.min_fps, snap.fps)
+        if job.duration > 0:
+            job.progress = min(out_time / job.duration, 1.0)
+        self._emit(self.on_progress, job, job.progress)
+
+    def encode_single(self, job):
+        job.mode = "full"
+        measurement = None
+        if self.settings["audio"] == "normalize":
+            measurement = self.loudness.ready(job.filepath)
+            if measurement is None:
+                return self.encode_then_normalize(job)
+        cmd = build_burn_cmd(self.ffmpeg_exe, job.filepath, job.work_path, self.settings, job.burn_sub, job.backend, measurement)
+        return self.run_process(job, cmd, lambda snap: self._report(job, snap, snap.out_time))
+
+    def encode_multi(self, job):
+        """Every declared output from one ffmpeg: decode and subtitles once,
+        then a scale and an encoder per output."""
+        job.mode = "multi"
+        outputs = []
+        for variant in job.variants:
+            codec = variant.get("codec")
+            backend = job.backend
+            if codec and (backend is None or backend.codec != codec):
+                backend = backend_for_codec(self.backends or [], codec, job.resource)
+            if backend is None:
+                job.stderr_tail = [f"no working {codec} encoder for {os.path.basename(variant['out_path'])}"]
+                return 1
+            outputs.append((variant["work_path"], backend, variant))
+        # One graph cannot mux audio in later: wait for the loudness measurement
+        measurement = self.loudness.get(job.filepath) if self.settings["audio"] == "normalize" else None
+        cmd = build_multi_cmd(self.ffmpeg_exe, job.filepath, outputs, self.settings, job.burn_sub, job.backend, measurement)
+        return self.run_process(job, cmd, lambda snap: self._report(job, snap, snap.out_time))
+
+    def encode_then_normalize(self, job):
+        """Loudness pass 1 is still running: burn the video without audio now
+        and apply pass 2 in a final mux, instead of waiting for it up front."""
+        work_dir = self.work_dir(job, "norm")
+        os.makedirs(work_dir, exist_ok=True)
+        video_path = os.path.join(work_dir, "video.mkv")
+        try:
+            cmd = build_burn_cmd(self.ffmpeg_exe, job.filepath, video_path, dict(self.settings, audio="none"), job.burn_sub, job.backend)
+            code = self.run_process(job, cmd, lambda snap: self._report(job, snap, snap.out_time))
+            if code != 0 or job.cancel_event.is_set():
+                return code or 1
+            audio = audio_args("normalize", self.loudness.get(job.filepath))
+            return self.run_process(job, build_mux_cmd(self.ffmpeg_exe, video_path, job.filepath, job.work_path, audio))
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def encode_segmented(self, job):
+        """Burns keyframe-aligned spans of one file in parallel, then joins them
+        losslessly with the concat demuxer and muxes audio from a single pass."""
+        ffprobe = self.prober.ffprobe_exe
+        spans = segment_encode.plan_segments(segment_encode.keyframe_times(ffprobe, job.filepath), job.duration, job.segments) if ffprobe else []
+        if len(spans) < 2:
+            return self.encode_single(job)
+
+        job.mode = "segmented"
+        work_dir = self.work_dir(job, "segments")
+        os.makedirs(work_dir, exist_ok=True)
+        fps = (job.info or {}).get("fps") or 0
+        sub_filter = build_subtitle_filter(job.filepath, self.settings, job.burn_sub)
+        seg_paths = [os.path.join(work_dir, f"seg{i:03d}.mkv") for i in range(len(spans))]
+        seg_times = [0.0] * len(spans)
+        lock = threading.Lock()
+
+        def encode(i):
+            start, end = spans[i]
+            cmd = segment_encode.build_segment_cmd(
+                self.ffmpeg_exe, job.filepath, start, end, segment_encode.segment_filter(start, sub_filter),
+                job.backend.video_args(self.settings["preset"]), seg_paths[i], job.backend.input_args(), fps
+            )
+
+            def on_snap(snap):
+                with lock:
+                    seg_times[i] = snap.out_time
+                    total = sum(seg_times)
+                self._report(job, snap, total)
+            return self.run_process(job, cmd, on_snap)
+
+        tasks = [lambda i=i: encode(i) for i in range(len(spans))]
+        audio_src, audio_task = self._audio_pass(job, work_dir)
+        if audio_task: tasks.append(audio_task)
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(tasks)) as pool:
+                codes = list(pool.map(lambda fn: fn(), tasks))
+            if any(codes) or job.cancel_event.is_set():
+                return next((c for c in codes if c), 1)
+
+            list_path = segment_encode.write_concat_list(seg_paths, os.path.join(work_dir, "list.txt"))
+            code = self.run_process(job, segment_encode.build_concat_cmd(self.ffmpeg_exe, list_path, audio_src, job.work_path))
+            if code == 0:
+                problems = segment_encode.check_join(ffprobe, job.filepath, job.work_path, fps, self.settings["verify_joins"])
+                if problems:
+                    job.stderr_tail = ["segment join check failed: " + p for p in problems]
+                    return 1
+            return code
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _audio_pass(self, job, work_dir):
+        """(audio source for the final join, task that produces it or None).
+        Copy mode reads the source directly; other modes encode audio once."""
+        if self.settings["audio"] == "copy":
+            return job.filepath, None
+        audio_src = os.path.join(work_dir, "audio.mka")
+
+        def task():
+            # Built at run time so normalize picks up the loudness measurement
+            measurement = self.loudness.get(job.filepath) if self.settings["audio"] == "normalize" else None
+            audio = audio_args(self.settings["audio"], measurement)
+            return self.run_process(job, segment_encode.build_audio_cmd(self.ffmpeg_exe, job.filepath, audio, audio_src))
+        return audio_src, task
+
+    def encode_smart(self, job):
+        """Burns only the GOPs that carry subtitles and stream-copies the rest.
+        Returns the exit code, or None when the job should get a full encode
+        instead (unsafe source, dense subtitles, or a join that fails checks)."""
+        ffprobe = self.prober.ffprobe_exe
+        if not ffprobe or smart_render.blocker(job.info, job.out_path) or job.duration <= 0:
+            return None
+        # Burned parts must come out in the source's own codec
+        part_backend = backend_for_codec(self.backends or [], job.info["vcodec"], job.resource)
+        if part_backend is None:
+            return None
+        cues = load_cues(job.burn_sub, self.ffmpeg_exe)
+        if cues is None:
+            return None
+        spans = smart_render.plan_spans(cues, segment_encode.keyframe_times(ffprobe, job.filepath), job.duration)
+        burn_total = smart_render.burned_seconds(spans, job.duration)
+        if not spans or burn_total > job.duration * smart_render.MAX_BURN_FRACTION:
+            return None
+
+        job.mode = "smart"
+        work_dir = self.work_dir(job, "smart")
+        os.makedirs(work_dir, exist_ok=True)
+        vcodec = job.info["vcodec"]
+        fps = job.info.get("fps") or 0
+        sub_filter = build_subtitle_filter(job.filepath, self.settings, job.burn_sub)
+        audio_src, audio_task = self._audio_pass(job, work_dir)
+        part_paths = []
+        try:
+            # Progress counts re-encoded seconds only; copied parts are near-instant
+            burned_before = 0.0
+            for i, (start, end, burn) in enumerate(spans):
+                if job.cancel_event.is_set(): return 1
+                part = os.path.join(work_dir, f"part{i:03d}.ts")
+                part_paths.append(part)
+                if burn:
+                    cmd = smart_render.build_burn_part_cmd(
+                        self.ffmpeg_exe, job.filepath, start, end, segment_encode.segment_filter(start, sub_filter),
+                        part_backend.video_args(self.settings["preset"]), part, part_backend.input_args(), fps
+                    )
+                    base = burned_before
+                    on_snap = lambda snap, base=base: self._report(job, snap, (base + snap.out_time) / burn_total * job.duration)
+                    burned_before += (job.duration if end is None else end) - start
+                else:
+                    cmd = smart_render.build_copy_part_cmd(self.ffmpeg_exe, job.filepath, start, end, vcodec, part, fps)
+                    on_snap = None
+                code = self.run_process(job, cmd, on_snap)
+                if code != 0:
+                    return None if not job.cancel_event.is_set() else code
+
+            # Audio last, so a loudness measurement has had the whole burn to finish
+            if audio_task and audio_task() != 0:
+                return 1
+            list_path = segment_encode.write_concat_list(part_paths, os.path.join(work_dir, "list.txt"))
+            code = self.run_process(job, segment_encode.build_concat_cmd(self.ffmpeg_exe, list_path, audio_src, job.work_path))
+            if code != 0 or segment_encode.check_join(ffprobe, job.filepath, job.work_path, fps, self.settings["verify_joins"]):
+                return None if not job.cancel_event.is_set() else code
+            return 0
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def ffmpeg_pids(self):
+        """PIDs of every live ffmpeg the batch owns (for telemetry)."""
+        return [p.pid for j in self.running_jobs() for p in list(j.processes) if p.poll() is None]
+
+    def running_jobs(self):
+        return [j for j in self.jobs if j.status == BurnJob.RUNNING]
+
+    # --- BATCH CONTROL (safe to call from any thread) ---
+    def pause(self):
+        self.is_paused = True
+        for job in self.running_jobs(): job.pause()
+
+    def resume(self):
+        self.is_paused = False
+        for job in self.running_jobs(): job.resume()
+
+    def cancel(self):
+        self.stop_event.set()
+        self.is_paused = False
+        for job in list(self.jobs): job.cancel()
+
+
+def run_batch(inputs, settings=None, output_dir=None, **engine_kwargs):
+    """Python API: burn `inputs` (files or folders) and return the finished jobs.
+    engine_kwargs go straight to BurnEngine (ffmpeg_exe, on_progress, ...)."""
+    engine = BurnEngine(settings, **engine_kwargs)
+    files, subtitles = expand_inputs(inputs)
+    return engine.run(files, output_dir, subtitles, root=common_root(inputs))
+
+
+# ==========================================
+#                   CLI
+# ==========================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Burn subtitles into videos without the GUI.")
+    parser.add_argument("inputs", nargs="+", help="video files or folders")
+    parser.add_argument("-o", "--output", help="output folder, mirroring the inputs' subfolders (default: Output next to each input)")
+    parser.add_argument("--scratch", help="fast local folder to encode into; outputs are moved or copied into place when done")
+    parser.add_argument("--font", default=DEFAULT_SETTINGS["font"])
+    parser.add_argument("--size", type=int, default=DEFAULT_SETTINGS["size"])
+    parser.add_argument("--color", choices=list(COLORS.keys()), default="White")
+    parser.add_argument("--preset", choices=sorted(set(PRESET_MAP.values())), default=DEFAULT_SETTINGS["preset"])
+    parser.add_argument("--audio", choices=sorted(set(AUDIO_MAP.values())), default=DEFAULT_SETTINGS["audio"])
+    parser.add_argument("--ffmpeg", help="path to ffmpeg (default: search PATH)")
+    parser.add_argument("--max-depth", type=int, help="how deep to search folders (default: no limit, 0 = top level only)")
+    parser.add_argument("--include", action="append", help="filename pattern to import, repeatable (default: *.mp4 *.mkv *.avi)")
+    parser.add_argument("--exclude", action="append", help="file or folder name pattern to skip, repeatable (Output, preview.mp4 and .partial-* are always skipped)")
+    parser.add_argument("--segments", type=int, default=0, help="split long files into N keyframe-aligned spans encoded in parallel "
+                        "(on a GPU at most as many as its sessions, e.g. --nvenc-sessions; on the CPU the split file runs alone)")
+    parser.add_argument("--segment-min-minutes", type=float, default=DEFAULT_SETTINGS["segment_min_duration"] / 60, help="only split files at least this long")
+    parser.add_argument("--encoder", default="auto", choices=["auto"] + [b.name for b in BACKENDS], help="video encoder backend (default: fastest available)")
+    parser.add_argument("--cpu-spill", action="store_true", help="run extra jobs on other backends (e.g. CPU) when the preferred one is full")
+    parser.add_argument("--list-encoders", action="store_true", help="show the encoder backends that work on this machine and exit")
+    parser.add_argument("--smart", action="store_true", help="re-encode only the parts with subtitles, stream-copy the rest")
+    parser.add_argument("--verify-joins", action="store_true", help="after a segmented or smart join, compare frame counts with the source (reads both files)")
+    parser.add_argument("--variant", action="append", type=parse_variant, metavar="SPEC",
+                        help="also write this variant from the same decode, repeatable: [HEIGHT][:h264|hevc][:clean], e.g. 720:h264 or clean")
+    parser.add_argument("--force", action="store_true", help="re-encode outputs even if the journal says they are up to date")
+    parser.add_argument("--report", help="write per-job metrics here when the batch ends (.csv, else JSON)")
+    parser.add_argument("--metrics-port", type=int, nargs="?", const=DEFAULT_METRICS_PORT,
+                        help=f"serve /metrics and /jobs.json on localhost while running (default port {DEFAULT_METRICS_PORT})")
+    parser.add_argument("--order", choices=["queue", "longest_first"], default="queue", help="job order (longest_first shortens parallel batches)")
+    parser.add_argument("--watch", action="store_true", help="keep running and burn new files dropped into the input folder (needs -o)")
+    parser.add_argument("--settle", type=float, default=10.0, help="watch mode: seconds a file must stop changing before it is picked up")
+    parser.add_argument("--skip-existing", action="store_true", help="watch mode: ignore files already in the folder at start-up")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="max encodes running at once")
+    parser.add_argument("--nvenc-sessions", type=int, default=DEFAULT_RESOURCE_LIMITS["nvenc"], help="max concurrent NVENC jobs")
+    parser.add_argument("--cpu-jobs", type=int, default=DEFAULT_RESOURCE_LIMITS["cpu"], help="max concurrent CPU-only jobs")
+    args = parser.parse_args(argv)
+
+    if args.list_encoders:
+        ffmpeg_exe = args.ffmpeg or find_ffmpeg()
+        for b in detect_backends(ffmpeg_exe, refresh=True):
+            print(f"{b.name:20} {b.label:20} resource={b.resource}")
+        return 0
+
+    if args.watch:
+        if len(args.inputs) != 1 or not os.path.isdir(args.inputs[0]) or not args.output:
+            parser.error("--watch needs exactly one input folder and -o")
+        inputs, subtitles = [], {}
+    else:
+        inputs, subtitles = expand_inputs(args.inputs, args.include, args.exclude, args.max_depth)
+    if not inputs and not args.watch:
+        parser.error("no video files found")
+    settings = make_settings(font=args.font, size=args.size, color=COLORS[args.color], preset=args.preset, audio=args.audio,
+                             segments=args.segments, segment_min_duration=args.segment_min_minutes * 60, smart_render=args.smart,
+                             verify_joins=args.verify_joins,
+                             encoder=args.encoder, cpu_spill=args.cpu_spill, resume=not args.force, order=args.order, scratch=args.scratch,
+                             outputs=[{}] + args.variant if args.variant else [])
+
+    def on_job_start(job):
+        print(f"Processing: {job.filename}", file=sys.stderr)
+
+    def on_progress(job, fraction):
+        if args.jobs == 1:
+            print(f"\r  {fraction:6.1%}", end="", file=sys.stderr, flush=True)
+
+    def on_job_done(job):
+        status = "up to date, skipped" if job.mode == "skipped" else job.status
+        print(f"\r  {job.filename}: {status}" + " " * 8, file=sys.stderr)
+
+    def make_engine():
+        return BurnEngine(settings, ffmpeg_exe=args.ffmpeg, on_job_start=on_job_start, on_progress=on_progress, on_job_done=on_job_done,
+                          max_jobs=args.jobs, resource_limits={"nvenc": args.nvenc_sessions, "cpu": args.cpu_jobs})
+
+    engine = make_engine()
+    if not engine.ffmpeg_exe:
+        print("ERROR: FFmpeg not found", file=sys.stderr)
+        return 2
+    if args.watch:
+        import watch_folder
+        return watch_folder.run_watch(args.inputs[0], args.output, make_engine, settle=args.settle, skip_existing=args.skip_existing)
+    server = MetricsServer(lambda: engine.jobs, args.metrics_port).start() if args.metrics_port else None
+    try:
+        jobs = engine.run(inputs, args.output, subtitles, root=common_root(args.inputs))
+    except KeyboardInterrupt:
+        engine.cancel()
+        return 130
+    finally:
+        if args.report:
+            export_report(engine.jobs, args.report)
+        if server:
+            server.stop()
+    return 0 if all(j.status == BurnJob.DONE for j in jobs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
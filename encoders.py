@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from ffmpeg_utils import DATA_DIR, popen_kwargs
+
+# ==========================================
+#            ENCODER BACKENDS
+# ==========================================
+# Every way we can encode video sits behind the same small interface, so the
+# engine never hard-codes hevc_nvenc. Which ones work on this machine is found
+# by asking ffmpeg (-encoders, -hwaccels) and doing a tiny trial encode, and
+# the answer is cached per ffmpeg build.
+
+ENCODER_CACHE_PATH = os.path.join(DATA_DIR, "encoders.json")
+# Drivers come and go (eGPU, driver updates); re-check once a day
+DETECT_TTL = 24 * 3600
+
+
+class EncoderBackend:
+    """One encoder as ffmpeg sees it.
+
+    presets maps our generic PRESET_MAP values (p1 fast / p4 balanced /
+    p7 best) to this encoder's own speed/quality preset.
+    """
+
+    def __init__(self, name, label, encoder, codec, resource, presets, quality_args, preset_flag='-preset', hwaccel=None):
+        self.name = name
+        self.label = label
+        self.encoder = encoder
+        self.codec = codec
+        self.resource = resource
+        self.presets = presets
+        self.quality_args = quality_args
+        self.preset_flag = preset_flag
+        self.hwaccel = hwaccel  # value for -hwaccel, or None for software decode
+
+    def __repr__(self):
+        return f"<EncoderBackend {self.name}>"
+
+    def input_args(self):
+        return ['-hwaccel', self.hwaccel] if self.hwaccel else []
+
+    def video_args(self, preset):
+        args = ['-c:v', self.encoder]
+        if self.presets:
+            args += [self.preset_flag, self.presets.get(preset, self.presets["p4"])]
+        return args + list(self.quality_args)
+
+    def trial_cmd(self, ffmpeg_exe):
+        # 256x256 clears every hardware encoder's minimum frame size
+        return [ffmpeg_exe, '-v', 'error', '-f', 'lavfi', '-i', 'color=c=black:s=256x256:d=0.2',
+                '-frames:v', '2', *self.video_args("p1"), '-f', 'null', '-']
+
+
+# Preference order: fastest first. CPU encoders come last; x264 before x265
+# because it is several times faster on the same cores.
+BACKENDS = [
+    EncoderBackend("nvenc_hevc", "NVIDIA HEVC", "hevc_nvenc", "hevc", "nvenc",
+                   {"p1": "p1", "p4": "p4", "p7": "p7"}, ['-cq', '22'], hwaccel="cuda"),
+    EncoderBackend("nvenc_h264", "NVIDIA H.264", "h264_nvenc", "h264", "nvenc",
+                   {"p1": "p1", "p4": "p4", "p7": "p7"}, ['-cq', '22'], hwaccel="cuda"),
+    EncoderBackend("qsv_hevc", "Intel QSV HEVC", "hevc_qsv", "hevc", "qsv",
+                   {"p1": "veryfast", "p4": "medium", "p7": "veryslow"}, ['-global_quality', '24']),
+    EncoderBackend("qsv_h264", "Intel QSV H.264", "h264_qsv", "h264", "qsv",
+                   {"p1": "veryfast", "p4": "medium", "p7": "veryslow"}, ['-global_quality', '22']),
+    EncoderBackend("amf_hevc", "AMD HEVC", "hevc_amf", "hevc", "amf",
+                   {"p1": "speed", "p4": "balanced", "p7": "quality"}, ['-rc', 'cqp', '-qp_i', '22', '-qp_p', '24'], preset_flag='-quality'),
+    EncoderBackend("amf_h264", "AMD H.264", "h264_amf", "h264", "amf",
+                   {"p1": "speed", "p4": "balanced", "p7": "quality"}, ['-rc', 'cqp', '-qp_i', '20', '-qp_p', '22'], preset_flag='-quality'),
+    EncoderBackend("videotoolbox_hevc", "Apple HEVC", "hevc_videotoolbox", "hevc", "videotoolbox",
+                   None, ['-q:v', '65']),
+    EncoderBackend("x264", "CPU H.264 (x264)", "libx264", "h264", "cpu",
+                   {"p1": "veryfast", "p4": "medium", "p7": "slow"}, ['-crf', '20']),
+    EncoderBackend("x265", "CPU HEVC (x265)", "libx265", "hevc", "cpu",
+                   {"p1": "veryfast", "p4": "medium", "p7": "slow"}, ['-crf', '24']),
+]
+BACKENDS_BY_NAME = {b.name: b for b in BACKENDS}
+
+
+def _list_names(ffmpeg_exe, flag):
+    """Second column of `ffmpeg -encoders` / names under `ffmpeg -hwaccels`."""
+    try:
+        r = subprocess.run([ffmpeg_exe, '-hide_banner', flag], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                           encoding='utf-8', errors='replace', **popen_kwargs())
+    except OSError:
+        return set()
+    names = set()
+    for line in r.stdout.splitlines():
+        parts = line.split()
+        if flag == '-encoders' and len(parts) >= 2 and len(parts[0]) == 6 and parts[0][0] == 'V':
+            names.add(parts[1])
+        elif flag == '-hwaccels' and len(parts) == 1 and not line.endswith(':'):
+            names.add(parts[0])
+    return names
+
+
+def _trial(ffmpeg_exe, backend):
+    try:
+        r = subprocess.run(backend.trial_cmd(ffmpeg_exe), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=30, **popen_kwargs())
+        return r.returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+
+
+def _probe_backends(ffmpeg_exe):
+    encoders = _list_names(ffmpeg_exe, '-encoders')
+    hwaccels = _list_names(ffmpeg_exe, '-hwaccels')
+    # Compiled in is not the same as usable: hardware ones need a trial encode
+    candidates = [b for b in BACKENDS if b.encoder in encoders]
+    with ThreadPoolExecutor(max_workers=max(1, len(candidates))) as pool:
+        works = list(pool.map(lambda b: _trial(ffmpeg_exe, b), candidates))
+    available = []
+    for b, ok in zip(candidates, works):
+        if not ok: continue
+        # Keep hardware decode only where ffmpeg actually has that hwaccel
+        available.append({"name": b.name, "hwaccel": b.hwaccel in hwaccels if b.hwaccel else False})
+    return available
+
+
+def _cache_key(ffmpeg_exe):
+    try:
+        st = os.stat(ffmpeg_exe)
+        return f"{os.path.abspath(ffmpeg_exe)}|{st.st_size}|{st.st_mtime_ns}"
+    except OSError:
+        return ffmpeg_exe
+
+
+def detect_backends(ffmpeg_exe, cache_path=ENCODER_CACHE_PATH, refresh=False):
+    """Working backends on this machine, fastest first. Cached per ffmpeg build."""
+    if not ffmpeg_exe:
+        return []
+    key = _cache_key(ffmpeg_exe)
+    try:
+        with open(cache_path, encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    entry = cache.get(key)
+    if refresh or not entry or time.time() - entry.get("checked", 0) > DETECT_TTL:
+        entry = {"checked": time.time(), "available": _probe_backends(ffmpeg_exe)}
+        cache[key] = entry
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, "w", encoding='utf-8') as f:
+                json.dump(cache, f)
+        except OSError:
+            pass
+
+    found = []
+    for item in entry["available"]:
+        b = BACKENDS_BY_NAME.get(item["name"])
+        if b is None: continue
+        if b.hwaccel and not item["hwaccel"]:
+            b = EncoderBackend(b.name, b.label, b.encoder, b.codec, b.resource, b.presets, b.quality_args, b.preset_flag)
+        found.append(b)
+    return found
+
+
+def choose_backends(available, wanted="auto", spill=False):
+    """Candidate backends for a job, best first.
+
+    wanted is "auto" or a backend name (falls back to auto when that one is
+    not available here). With spill, every other working backend follows as
+    an overflow target for when the preferred resource is full.
+    """
+    if not available:
+        return []
+    first = next((b for b in available if b.name == wanted), available[0])
+    if not spill:
+        return [first]
+    chosen, resources = [first], {first.resource}
+    for b in available:
+        if b.resource not in resources:
+            chosen.append(b)
+            resources.add(b.resource)
+    return chosen
+
+
+def backend_for_codec(available, codec, resource=None):
+    """A working backend that outputs `codec`, preferring `resource`."""
+    matches = [b for b in available if b.codec == codec]
+    return next((b for b in matches if b.resource == resource), matches[0] if matches else None)
@@ -0,0 +1,86 @@
+import time
+
+# ==========================================
+#     FFMPEG -progress STREAM PARSING
+# ==========================================
+# With `-progress pipe:1 -nostats` ffmpeg writes blocks of key=value lines to
+# stdout, each block closed by `progress=continue` (or `progress=end`). That
+# format is meant for machines, unlike the stderr stats line which changes
+# between builds.
+
+PROGRESS_ARGS = ['-progress', 'pipe:1', '-nostats']
+
+
+def _to_int(value):
+    try: return int(value)
+    except (TypeError, ValueError): return 0
+
+
+def _to_float(value):
+    try: return float(value)
+    except (TypeError, ValueError): return 0.0
+
+
+def _parse_clock(value):
+    """'01:02:03.500000' -> 3723.5"""
+    try:
+        h, m, s = value.split(':')
+        return int(h)*3600 + int(m)*60 + float(s)
+    except (AttributeError, ValueError):
+        return 0.0
+
+
+class ProgressSnapshot:
+    """One -progress block with typed fields. Unknown/N/A values read as 0."""
+
+    def __init__(self, fields):
+        self.frame = _to_int(fields.get("frame"))
+        self.fps = _to_float(fields.get("fps"))
+        self.speed = _to_float((fields.get("speed") or "").rstrip("x"))
+        self.bitrate_kbps = _to_float((fields.get("bitrate") or "").replace("kbits/s", ""))
+        self.total_size = _to_int(fields.get("total_size"))
+        # out_time_ms is really microseconds too (long-standing ffmpeg quirk)
+        us = fields.get("out_time_us") or fields.get("out_time_ms")
+        self.out_time = _to_int(us) / 1e6 if _to_int(us) > 0 else _parse_clock(fields.get("out_time"))
+        self.is_end = fields.get("progress") == "end"
+
+    def as_dict(self):
+        return {
+            "frame": self.frame, "fps": self.fps, "speed": self.speed, "bitrate_kbps": self.bitrate_kbps,
+            "total_size": self.total_size, "out_time": self.out_time, "is_end": self.is_end,
+        }
+
+    def __repr__(self):
+        return f"<ProgressSnapshot t={self.out_time:.2f}s frame={self.frame} fps={self.fps} speed={self.speed}x>"
+
+
+def parse_progress(lines):
+    """Yields a ProgressSnapshot for every complete block in an iterable of lines."""
+    fields = {}
+    for line in lines:
+        key, sep, value = line.strip().partition('=')
+        if not sep: continue
+        fields[key] = value.strip()
+        if key == "progress":
+            yield ProgressSnapshot(fields)
+            fields = {}
+
+
+def throttle(snapshots, interval=0.5, clock=time.monotonic):
+    """Passes through at most one snapshot per `interval` seconds.
+
+    Skipped blocks are simply superseded by the next one (each block carries
+    totals, not deltas). The final `progress=end` block is always delivered.
+    """
+    last = None
+    for snap in snapshots:
+        now = clock()
+        if snap.is_end or last is None or now - last >= interval:
+            last = now
+            yield snap
+
+
+def drain_lines(stream, sink):
+    """Reads a text stream to EOF, appending lines to `sink` (e.g. a bounded deque)."""
+    for line in stream:
+        sink.append(line.rstrip())
@@ -0,0 +1,139 @@
+import os
+import sys
+import shutil
+import signal
+import subprocess
+
+# ==========================================
+#     SHARED FFMPEG / PLATFORM HELPERS
+# ==========================================
+
+# Windows: hide the console window ffmpeg would otherwise pop up
+CREATE_NO_WINDOW = 0x08000000
+CREATE_NEW_PROCESS_GROUP = 0x00000200
+
+# Per-user folder for caches and history (probe cache, journals, ...)
+DATA_DIR = os.path.join(os.path.expanduser("~"), ".subtitle_burner")
+
+
+def popen_kwargs(new_group=False):
+    """Extra subprocess arguments so ffmpeg stays invisible on Windows.
+
+    new_group: start the process as the leader of its own process group, so
+    suspend/resume/kill below reach everything it spawns (and a Ctrl+C in
+    the terminal goes to us, not straight to ffmpeg).
+    """
+    if sys.platform != "win32":
+        return {"start_new_session": True} if new_group else {}
+    startupinfo = subprocess.STARTUPINFO()
+    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    flags = CREATE_NO_WINDOW | (CREATE_NEW_PROCESS_GROUP if new_group else 0)
+    return {"startupinfo": startupinfo, "creationflags": flags}
+
+
+def find_ffmpeg():
+    ffmpeg_exe = shutil.which("ffmpeg")
+    if not ffmpeg_exe and os.path.exists("ffmpeg.exe"):
+        ffmpeg_exe = os.path.abspath("ffmpeg.exe")
+    return ffmpeg_exe
+
+
+# ==========================================
+#            PROCESS CONTROL
+# ==========================================
+# Pause, resume and stop a spawned process together with its children.
+# POSIX: signals to the process group (started with popen_kwargs(new_group=True)),
+# SIGSTOP/SIGCONT to pause. Windows has no stop signal: psutil suspends the
+# threads of each process in the tree (imported only when first needed).
+
+def _group(proc):
+    """The process group to signal when proc leads its own, else None."""
+    try:
+        pgid = os.getpgid(proc.pid)
+    except (OSError, AttributeError):
+        return None
+    return pgid if pgid == proc.pid else None
+
+
+def _signal(proc, sig):
+    if proc.poll() is not None: return False
+    try:
+        pgid = _group(proc)
+        os.killpg(pgid, sig) if pgid is not None else os.kill(proc.pid, sig)
+        return True
+    except OSError:
+        return False
+
+
+def _process_tree(proc):
+    try:
+        import psutil
+        parent = psutil.Process(proc.pid)
+        return [parent] + parent.children(recursive=True)
+    except Exception:  # psutil missing or the process already gone
+        return []
+
+
+def suspend_process(proc):
+    """True if proc (and its children) are now paused."""
+    if sys.platform != "win32":
+        return _signal(proc, signal.SIGSTOP)
+    ok = False
+    for p in _process_tree(proc):
+        try:
+            p.suspend()
+            ok = True
+        except Exception:
+            pass
+    return ok
+
+
+def resume_process(proc):
+    if sys.platform != "win32":
+        return _signal(proc, signal.SIGCONT)
+    ok = False
+    for p in _process_tree(proc):
+        try:
+            p.resume()
+            ok = True
+        except Exception:
+            pass
+    return ok
+
+
+def terminate_process(proc, force=False):
+    """Stops proc and everything it spawned. A paused tree is resumed first,
+    or it would never act on the signal."""
+    if proc.poll() is not None: return
+    if sys.platform != "win32":
+        _signal(proc, signal.SIGKILL if force else signal.SIGTERM)
+        _signal(proc, signal.SIGCONT)
+        return
+    tree = _process_tree(proc)
+    for p in reversed(tree):
+        try:
+            p.resume()
+            p.kill() if force else p.terminate()
+        except Exception:
+            pass
+    if not tree:
+        try: proc.kill() if force else proc.terminate()
+        except OSError: pass
+
+
+def open_path(path):
+    """Opens a file or folder with the desktop's default application."""
+    if sys.platform == "win32":
+        os.startfile(path)
+    elif sys.platform == "darwin":
+        subprocess.Popen(["open", path])
+    else:
+        subprocess.Popen(["xdg-open", path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def shutdown_command(delay=60):
+    """Command that powers the machine off after `delay` seconds."""
+    if sys.platform == "win32":
+        return ["shutdown", "/s", "/t", str(delay)]
+    # POSIX shutdown takes whole minutes
+    return ["shutdown", "-h", f"+{max(1, round(delay / 60))}"]
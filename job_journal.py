@@ -0,0 +1,122 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+
+# ==========================================
+#              JOB JOURNAL
+# ==========================================
+# One small SQLite file per output folder remembers what each output was
+# made from. A re-run skips outputs that are complete and still match their
+# input, subtitle and settings; anything else found at an output path (a job
+# that crashed, was cancelled or failed half-way) is thrown away first.
+
+JOURNAL_NAME = ".subtitle_burner_journal.sqlite"
+# Seconds to wait for another writer (thread, process or host) holding the lock.
+# The default rollback journal, not WAL: WAL needs shared memory, which network
+# filesystems do not provide, and output folders are often on shares
+BUSY_TIMEOUT = 15.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    out_path    TEXT PRIMARY KEY,
+    input_path  TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    state       TEXT NOT NULL,
+    out_size    INTEGER,
+    started_at  REAL,
+    finished_at REAL
+)
+"""
+
+
+def file_signature(path):
+    """Cheap identity of a file: path, size and mtime (no hashing of contents)."""
+    if not path:
+        return "-"
+    try:
+        st = os.stat(path)
+    except OSError:
+        return f"{os.path.abspath(path)}|missing"
+    return f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
+
+
+def job_fingerprint(input_path, sub_path, settings_key):
+    """Changes whenever the input, its subtitle source or the settings that
+    shape the output change."""
+    h = hashlib.sha1()
+    for part in (file_signature(input_path), file_signature(sub_path), settings_key):
+        h.update(part.encode('utf-8', 'replace'))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class JobJournal:
+    """Per-output-folder record of job states. Safe to share between worker
+    threads; every write is committed at once so a crash loses nothing.
+    Methods raise sqlite3.Error when the file is locked for too long or
+    damaged; callers then carry on without the journal."""
+
+    RUNNING, DONE, FAILED = "running", "done", "failed"
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        # Journals written by older versions were switched to WAL; the mode sticks to the file
+        self.db.execute("PRAGMA journal_mode=DELETE")
+        self.db.execute(SCHEMA)
+        self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    def get(self, out_path):
+        with self.lock:
+            row = self.db.execute("SELECT state, fingerprint, out_size FROM jobs WHERE out_path = ?", (os.path.abspath(out_path),)).fetchone()
+        return None if row is None else {"state": row[0], "fingerprint": row[1], "out_size": row[2]}
+
+    def is_complete(self, out_path, fingerprint):
+        """True if out_path was finished from exactly this fingerprint and is
+        still the same size on disk."""
+        row = self.get(out_path)
+        if not row or row["state"] != self.DONE or row["fingerprint"] != fingerprint:
+            return False
+        try:
+            return os.path.getsize(out_path) == row["out_size"]
+        except OSError:
+            return False
+
+    def begin(self, out_path, input_path, fingerprint):
+        self._write(out_path, input_path, fingerprint, self.RUNNING, None, time.time(), None)
+
+    def finish(self, out_path, input_path, fingerprint, ok):
+        size = None
+        if ok:
+            try: size = os.path.getsize(out_path)
+            except OSError: ok = False
+        self._write(out_path, input_path, fingerprint, self.DONE if ok else self.FAILED, size, None, time.time())
+
+    def _write(self, out_path, input_path, fingerprint, state, out_size, started_at, finished_at):
+        with self.lock:
+            self.db.execute(
+                "INSERT INTO jobs (out_path, input_path, fingerprint, state, out_size, started_at, finished_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(out_path) DO UPDATE SET "
+                "input_path = excluded.input_path, fingerprint = excluded.fingerprint, state = excluded.state, "
+                "out_size = excluded.out_size, started_at = COALESCE(excluded.started_at, jobs.started_at), "
+                "finished_at = excluded.finished_at",
+                (os.path.abspath(out_path), input_path, fingerprint, state, out_size, started_at, finished_at)
+            )
+            self.db.commit()
+
+
+def open_journal(output_dir):
+    """Journal for an output folder, or None if it cannot be created there
+    (read-only share etc.); jobs then simply run without skip/resume."""
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        return JobJournal(os.path.join(output_dir, JOURNAL_NAME))
+    except (OSError, sqlite3.Error):
+        return None
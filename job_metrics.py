@@ -0,0 +1,183 @@
+import os
+import csv
+import json
+import threading
+
+# ==========================================
+#         PER-JOB METRICS AND REPORTS
+# ==========================================
+# The engine fills the timing/fps fields on each BurnJob as it runs; this
+# module turns jobs into flat records, writes batch reports (CSV or JSON)
+# and serves the same numbers as plain-text metrics for dashboards.
+
+FIELDS = [
+    "file", "output", "status", "mode", "backend", "queued_at", "started_at", "finished_at",
+    "queue_wait_s", "encode_s", "media_s", "avg_fps", "min_fps", "speed",
+    "input_bytes", "output_bytes", "output_kbps", "exit_code", "stderr_tail",
+]
+DEFAULT_METRICS_PORT = 9464
+
+
+def _size(path):
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError):
+        return None
+
+
+def job_record(job):
+    """Flat dict of one job's metrics (None where not known)."""
+    encode_s = job.finished_at - job.started_at if job.started_at and job.finished_at else None
+    wait_s = job.started_at - job.queued_at if job.started_at and job.queued_at else None
+    fps = (job.info or {}).get("fps") or 0
+    media_s = job.duration or None
+    out_bytes = _size(job.out_path) if job.status == "done" else None
+    ran = encode_s and job.mode != "skipped"
+    return {
+        "file": job.filepath,
+        "output": job.out_path,
+        "status": job.status,
+        "mode": job.mode,
+        "backend": job.backend.name if job.backend else None,
+        "queued_at": job.queued_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "queue_wait_s": round(wait_s, 3) if wait_s is not None else None,
+        "encode_s": round(encode_s, 3) if encode_s is not None else None,
+        "media_s": media_s,
+        # Whole-job figures, so segmented and smart encodes compare fairly with full ones
+        "avg_fps": round(media_s * fps / encode_s, 2) if ran and media_s and fps else None,
+        "min_fps": round(job.min_fps, 2) if job.min_fps is not None else None,
+        "speed": round(media_s / encode_s, 3) if ran and media_s else None,
+        "input_bytes": _size(job.filepath),
+        "output_bytes": out_bytes,
+        "output_kbps": round(out_bytes * 8 / media_s / 1000, 1) if out_bytes and media_s else None,
+        "exit_code": job.returncode,
+        "stderr_tail": "\n".join(job.stderr_tail) if job.stderr_tail else None,
+    }
+
+
+def batch_summary(jobs):
+    records = [job_record(j) for j in jobs]
+    ran = [r for r in records if r["encode_s"] and r["mode"] != "skipped"]
+    starts = [r["started_at"] for r in records if r["started_at"]]
+    ends = [r["finished_at"] for r in records if r["finished_at"]]
+    counts = {}
+    for r in records:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    media = sum(r["media_s"] or 0 for r in ran)
+    wall = max(ends) - min(starts) if starts and ends else None
+    return {
+        "jobs": len(records),
+        "by_status": counts,
+        "skipped": sum(r["mode"] == "skipped" for r in records),
+        "wall_s": round(wall, 3) if wall else None,
+        "media_s": round(media, 3),
+        "batch_speed": round(media / wall, 3) if wall else None,
+        "input_bytes": sum(r["input_bytes"] or 0 for r in ran),
+        "output_bytes": sum(r["output_bytes"] or 0 for r in ran),
+        "slowest": [r["file"] for r in sorted(ran, key=lambda r: r["speed"] or 0)[:5]],
+    }
+
+
+def export_report(jobs, path):
+    """Writes per-job records to path: CSV for .csv, otherwise JSON with a summary."""
+    records = [job_record(j) for j in jobs]
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if path.lower().endswith(".csv"):
+        with open(path, "w", newline="", encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+    else:
+        with open(path, "w", encoding='utf-8') as f:
+            json.dump({"summary": batch_summary(jobs), "jobs": records}, f, indent=2)
+    return path
+
+
+# --- TEXT METRICS ENDPOINT ---
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def render_metrics(jobs):
+    """Prometheus text exposition of the current batch."""
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP subburn_{name} {help_text}")
+        lines.append(f"# TYPE subburn_{name} {kind}")
+        for labels, value in samples:
+            if value is None: continue
+            label_text = ",".join(f'{k}="{_label(v)}"' for k, v in labels.items())
+            lines.append(f"subburn_{name}{{{label_text}}} {value}" if label_text else f"subburn_{name} {value}")
+
+    records = [job_record(j) for j in jobs]
+    counts = {}
+    for r in records:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    metric("jobs", "gauge", "Jobs in the current batch by status.", [({"status": s}, n) for s, n in sorted(counts.items())])
+    progress = [({"file": os.path.basename(j.filepath)}, round(j.progress, 4)) for j in jobs if j.status == "running"]
+    metric("job_progress", "gauge", "Fraction done of running jobs.", progress)
+    per_job = [
+        ("job_encode_seconds", "Wall time of finished jobs.", "encode_s"),
+        ("job_queue_wait_seconds", "Time between batch start and job start.", "queue_wait_s"),
+        ("job_avg_fps", "Average encode fps over the whole job.", "avg_fps"),
+        ("job_min_fps", "Lowest fps ffmpeg reported during the job.", "min_fps"),
+        ("job_speed", "Media seconds encoded per wall second.", "speed"),
+        ("job_input_bytes", "Input file size.", "input_bytes"),
+        ("job_output_bytes", "Output file size.", "output_bytes"),
+        ("job_output_kbps", "Output average bitrate.", "output_kbps"),
+        ("job_exit_code", "ffmpeg exit code of finished jobs.", "exit_code"),
+    ]
+    for name, help_text, key in per_job:
+        samples = [({"file": os.path.basename(r["file"]), "status": r["status"], "backend": r["backend"] or ""}, r[key])
+                   for r in records if r["finished_at"]]
+        metric(name, "gauge", help_text, samples)
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serves /metrics (text) and /jobs.json on a local port from a thread.
+
+    jobs_fn returns the jobs to report on, so one server can follow batch
+    after batch (e.g. lambda: engine.jobs).
+    """
+
+    def __init__(self, jobs_fn, port=DEFAULT_METRICS_PORT, host="127.0.0.1"):
+        # Imported here: http.server (and ssl, email behind it) is most of the
+        # engine's import time, and only --metrics-port needs it
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                jobs = list(jobs_fn() or [])
+                if self.path.split("?")[0] == "/metrics":
+                    body, ctype = render_metrics(jobs).encode('utf-8'), "text/plain; version=0.0.4"
+                elif self.path.split("?")[0] == "/jobs.json":
+                    body = json.dumps({"summary": batch_summary(jobs), "jobs": [job_record(j) for j in jobs]}).encode('utf-8')
+                    ctype = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,707 @@
+import os
+import re
+import sys
+import hmac
+import json
+import time
+import uuid
+import socket
+import signal
+import argparse
+import threading
+import subprocess
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from burn_engine import BurnEngine, BurnJob, DEFAULT_SETTINGS, AUDIO_MAP, make_settings
+from encoders import BACKENDS_BY_NAME
+from job_metrics import job_record
+from media_import import expand_inputs
+from output_stage import output_path_for, common_root
+from throughput import ThroughputModel
+
+# ==========================================
+#        JOB SERVER AND RENDER WORKERS
+# ==========================================
+# Spreads a batch over several processes or machines. The server only holds
+# the queue; workers lease one job at a time over plain HTTP + JSON, run it
+# with their own BurnEngine, send progress as heartbeats and post the result.
+# A lease that stops heartbeating (worker killed, node gone) goes back to
+# the queue for another worker. Inputs and outputs are paths, so remote
+# workers need the same shared storage mounted at the same paths.
+#
+# Every request carries "Authorization: Bearer <token>" when the server has
+# a token, and a server can be limited to output roots: a submit that would
+# write anywhere else is refused. Each lease has its own id, which workers use
+# as the staging tag, so a job handed to a second worker while the first one
+# still runs never shares partial files or scratch folders with it.
+#
+#   POST /jobs             {"inputs", "output_dir", "subtitles", "root", "settings"} -> {"ids"}
+#                          (400: malformed, 403: output outside the allowed roots)
+#   GET  /jobs             -> {"jobs": [...]}
+#   POST /lease            {"worker"} -> job with "lease" and "heartbeat", or 204 when the queue is empty
+#   POST /jobs/<id>/progress  {"worker", "progress", "fps", "speed"} (409: lease lost, stop)
+#   POST /jobs/<id>/done   {"worker", "status", "returncode", "stderr_tail", "record"}
+#   POST /cancel           cancels everything not finished
+
+DEFAULT_SERVER_PORT = 8765
+LEASE_TIMEOUT = 30.0     # seconds without a heartbeat before a job is reassigned
+HEARTBEAT_INTERVAL = 5.0
+MAX_ATTEMPTS = 3         # a job that killed this many workers is failed, not retried forever
+IDLE_POLL = 2.0
+TOKEN_ENV = "SUBBURN_JOB_TOKEN"  # shared token, read by every command and client when not given
+MAX_BODY = 16 * 1024 * 1024
+LOOPBACK = ("127.0.0.1", "localhost", "::1")
+
+
+# --- REQUEST CHECKS ---
+# Anything from the network is checked before it reaches a BurnEngine: setting
+# values end up in filter strings, file names and ffmpeg arguments.
+SAFE_TEXT = re.compile(r"^[\w .&+-]*$")
+SAFE_SUFFIX = re.compile(r"^[\w.+-]*$")  # no separators: variants stay next to the main output
+CHOICES = {
+    "audio": set(AUDIO_MAP.values()),
+    "order": {"queue", "longest_first"},
+    "encoder": {"auto"} | set(BACKENDS_BY_NAME),
+}
+VARIANT_KEYS = {"height", "codec", "burn", "preset", "suffix"}
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0
+
+
+def check_variant(variant):
+    if not isinstance(variant, dict) or not set(variant) <= VARIANT_KEYS:
+        raise ValueError(f"bad output {variant!r}")
+    if variant.get("height") is not None and not (isinstance(variant["height"], int) and _is_number(variant["height"])):
+        raise ValueError("output height must be a whole number")
+    if variant.get("codec") not in (None, "hevc", "h264"):
+        raise ValueError("output codec must be hevc or h264")
+    if not isinstance(variant.get("burn", True), bool):
+        raise ValueError("output burn must be true or false")
+    if not SAFE_TEXT.match(str(variant.get("preset") or "")) or not SAFE_SUFFIX.match(str(variant.get("suffix") or "")):
+        raise ValueError("bad output preset or suffix")
+
+
+def check_settings(settings):
+    """ValueError unless settings is a dict of known settings with values of
+    the defaults' types (and, for choices, known values)."""
+    if not isinstance(settings, dict):
+        raise ValueError("settings must be an object")
+    for key, value in settings.items():
+        if key not in DEFAULT_SETTINGS:
+            raise ValueError(f"unknown setting {key!r}")
+        default = DEFAULT_SETTINGS[key]
+        if value is None or key == "scratch":
+            continue  # workers use their own scratch folder
+        if key == "outputs":
+            if not isinstance(value, list): raise ValueError("outputs must be a list")
+            for variant in value: check_variant(variant)
+        elif isinstance(default, bool):
+            if not isinstance(value, bool): raise ValueError(f"{key} must be true or false")
+        elif isinstance(default, float):
+            if not _is_number(value): raise ValueError(f"{key} must be a number")
+        elif isinstance(default, int):
+            if not (isinstance(value, int) and _is_number(value)): raise ValueError(f"{key} must be a whole number")
+        elif not isinstance(value, str) or not SAFE_TEXT.match(value):
+            raise ValueError(f"bad value for {key}")
+        elif key in CHOICES and value not in CHOICES[key]:
+            raise ValueError(f"{key} must be one of {', '.join(sorted(CHOICES[key]))}")
+
+
+def _optional_str(value, name):
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f"{name} must be a string")
+    return value
+
+
+def _under(path, roots):
+    real = os.path.realpath(path)
+    for root in roots:
+        try:
+            if os.path.commonpath([real, root]) == root: return True
+        except ValueError:
+            pass  # another drive
+    return False
+
+
+class QueuedJob:
+    def __init__(self, job_id, filepath, out_path, sub_path, settings):
+        self.id = job_id
+        self.filepath = filepath
+        self.out_path = out_path
+        self.sub_path = sub_path
+        self.settings = settings
+        self.status = BurnJob.PENDING
+        self.progress = 0.0
+        self.fps = None
+        self.speed = None
+        self.worker = None
+        self.lease = None      # id of the current lease, the worker's staging tag
+        self.last_seen = None  # monotonic time of the lease holder's last heartbeat
+        self.attempts = 0
+        self.cancel_requested = False
+        self.returncode = None
+        self.stderr_tail = []
+        self.record = None  # job_metrics.job_record() from the worker
+
+    def to_dict(self):
+        return {
+            "id": self.id, "file": self.filepath, "output": self.out_path, "status": self.status,
+            "progress": round(self.progress, 4), "fps": self.fps, "speed": self.speed, "worker": self.worker,
+            "attempts": self.attempts, "returncode": self.returncode, "stderr_tail": self.stderr_tail, "record": self.record,
+        }
+
+
+class JobQueue:
+    """Server-side state; every method is thread-safe."""
+
+    def __init__(self, lease_timeout=LEASE_TIMEOUT, max_attempts=MAX_ATTEMPTS, allowed_roots=None):
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        # Folders outputs may be written under (None = anywhere)
+        self.allowed_roots = [os.path.realpath(r) for r in allowed_roots] if allowed_roots else None
+        self.jobs = {}
+        self.order = []
+        self.lock = threading.Lock()
+        self.next_id = 1
+
+    def submit(self, inputs, output_dir=None, subtitles=None, root=None, settings=None):
+        """Queues one job per input. ValueError for a malformed batch,
+        PermissionError when an output would land outside the allowed roots."""
+        if not isinstance(inputs, list) or not all(isinstance(f, str) and f for f in inputs):
+            raise ValueError("inputs must be a list of paths")
+        _optional_str(output_dir, "output_dir")
+        _optional_str(root, "root")
+        subtitles = subtitles or {}
+        if not isinstance(subtitles, dict) or not all(isinstance(v, str) for v in subtitles.values()):
+            raise ValueError("subtitles must map inputs to subtitle paths")
+        check_settings(settings or {})
+        settings = make_settings(**dict(settings or {}, scratch=None))
+        if output_dir and root is None:
+            root = common_root(inputs)
+        out_paths = [output_path_for(f, output_dir, root) for f in inputs]
+        if self.allowed_roots:
+            outside = [p for p in out_paths if not _under(p, self.allowed_roots)]
+            if outside:
+                raise PermissionError(f"output outside the allowed roots: {outside[0]}")
+        ids = []
+        with self.lock:
+            for f, out_path in zip(inputs, out_paths):
+                job = QueuedJob(str(self.next_id), f, out_path, subtitles.get(f), settings)
+                self.next_id += 1
+                self.jobs[job.id] = job
+                self.order.append(job.id)
+                ids.append(job.id)
+        return ids
+
+    def lease(self, worker):
+        with self.lock:
+            self._reap()
+            for job_id in self.order:
+                job = self.jobs[job_id]
+                if job.status == BurnJob.PENDING:
+                    job.status = BurnJob.RUNNING
+                    job.worker = worker
+                    job.last_seen = time.monotonic()
+                    job.attempts += 1
+                    job.progress = 0.0
+                    job.lease = uuid.uuid4().hex[:12]
+                    # Beat well inside the timeout, whatever the worker was started with
+                    return {"id": job.id, "lease": job.lease, "input": job.filepath, "out_path": job.out_path,
+                            "sub_path": job.sub_path, "settings": job.settings, "heartbeat": self.lease_timeout / 4}
+        return None
+
+    def heartbeat(self, job_id, worker, progress=None, fps=None, speed=None):
+        """False when the worker no longer holds the job (reassigned or cancelled)."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.worker != worker or job.status != BurnJob.RUNNING or job.cancel_requested:
+                return False
+            job.last_seen = time.monotonic()
+            if progress is not None: job.progress = progress
+            job.fps, job.speed = fps, speed
+            return True
+
+    def finish(self, job_id, worker, status, returncode=None, stderr_tail=None, record=None):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.worker != worker or job.status != BurnJob.RUNNING:
+                return False  # a late answer from a worker whose lease was given away
+            if status == BurnJob.CANCELLED and not job.cancel_requested:
+                # The worker was shut down, nobody cancelled the job: someone else runs it
+                job.status, job.worker, job.progress = BurnJob.PENDING, None, 0.0
+                return True
+            job.status = status if status in (BurnJob.DONE, BurnJob.FAILED, BurnJob.CANCELLED) else BurnJob.FAILED
+            job.returncode = returncode
+            job.stderr_tail = stderr_tail or []
+            job.record = record
+            if job.status == BurnJob.DONE: job.progress = 1.0
+            return True
+
+    def cancel(self):
+        with self.lock:
+            for job in self.jobs.values():
+                if job.status == BurnJob.PENDING:
+                    job.status = BurnJob.CANCELLED
+                elif job.status == BurnJob.RUNNING:
+                    job.cancel_requested = True  # the worker hears it on its next heartbeat
+
+    def _reap(self):
+        now = time.monotonic()
+        for job in self.jobs.values():
+            if job.status != BurnJob.RUNNING or now - job.last_seen <= self.lease_timeout: continue
+            job.stderr_tail = [f"worker {job.worker} stopped responding"]
+            job.worker = None
+            if job.cancel_requested:
+                job.status = BurnJob.CANCELLED
+            elif job.attempts >= self.max_attempts:
+                job.status = BurnJob.FAILED
+            else:
+                job.status = BurnJob.PENDING
+
+    def reap(self):
+        with self.lock:
+            self._reap()
+
+    def snapshot(self):
+        with self.lock:
+            return [self.jobs[i].to_dict() for i in self.order]
+
+
+# --- SERVER ---
+class JobServer:
+    """HTTP front of a JobQueue, served from a thread (like MetricsServer)."""
+
+    def __init__(self, port=DEFAULT_SERVER_PORT, host="127.0.0.1", queue=None, token=None):
+        self.queue = queue or JobQueue()
+        jobs = self.queue
+        expected = f"Bearer {token}".encode('utf-8') if token else None
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, code, payload=None):
+                body = json.dumps(payload).encode('utf-8') if payload is not None else b""
+                self.send_response(code)
+                if payload is not None:
+                    self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _authorized(self):
+                if expected is None: return True
+                if hmac.compare_digest(self.headers.get("Authorization", "").encode('utf-8'), expected): return True
+                self._send(401, {"error": "missing or wrong token"})
+                return False
+
+            def _body(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length > MAX_BODY:
+                    raise ValueError("request too large")
+                data = json.loads(self.rfile.read(length)) if length else {}
+                if not isinstance(data, dict):
+                    raise ValueError("expected a JSON object")
+                return data
+
+            def do_GET(self):
+                if not self._authorized(): return
+                if self.path.split("?")[0] == "/jobs":
+                    self._send(200, {"jobs": jobs.snapshot()})
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def do_POST(self):
+                if not self._authorized(): return
+                try:
+                    self._post(self._body())
+                except PermissionError as e:
+                    self._send(403, {"error": str(e)})
+                except (ValueError, TypeError) as e:
+                    self._send(400, {"error": str(e) or "bad request"})
+
+            def _post(self, data):
+                parts = self.path.split("?")[0].strip("/").split("/")
+                if parts == ["jobs"]:
+                    ids = jobs.submit(data.get("inputs") or [], data.get("output_dir"), data.get("subtitles"),
+                                      data.get("root"), data.get("settings"))
+                    self._send(200, {"ids": ids})
+                    return
+                if parts == ["cancel"]:
+                    jobs.cancel()
+                    self._send(200, {"ok": True})
+                    return
+                worker = data.get("worker")
+                if not isinstance(worker, str) or not worker:
+                    raise ValueError("worker must be a non-empty string")
+                if parts == ["lease"]:
+                    job = jobs.lease(worker)
+                    self._send(200, job) if job else self._send(204)
+                elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "progress":
+                    numbers = [data.get(k) for k in ("progress", "fps", "speed")]
+                    if not all(v is None or _is_number(v) for v in numbers):
+                        raise ValueError("progress, fps and speed must be numbers")
+                    ok = jobs.heartbeat(parts[1], worker, *numbers)
+                    self._send(200 if ok else 409, {"ok": ok})
+                elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "done":
+                    tail, record, code = data.get("stderr_tail") or [], data.get("record"), data.get("returncode")
+                    if not isinstance(data.get("status"), str) or not isinstance(tail, list) \
+                            or not (record is None or isinstance(record, dict)) or not (code is None or isinstance(code, int)):
+                        raise ValueError("bad result")
+                    ok = jobs.finish(parts[1], worker, data["status"], code, [str(line) for line in tail], record)
+                    self._send(200 if ok else 409, {"ok": ok})
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.url = f"http://{host}:{self.port}"
+        self.stop_event = threading.Event()
+        self.threads = [threading.Thread(target=self.httpd.serve_forever, daemon=True),
+                        threading.Thread(target=self._reaper, daemon=True)]
+
+    def _reaper(self):
+        # Leases also expire without anyone asking for work
+        while not self.stop_event.wait(1.0):
+            self.queue.reap()
+
+    def start(self):
+        for t in self.threads: t.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# --- CLIENT ---
+class JobClient:
+    """Small JSON-over-HTTP client for the endpoints above."""
+
+    def __init__(self, url, timeout=10.0, token=None):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.token = token or os.environ.get(TOKEN_ENV)
+
+    def call(self, method, path, payload=None):
+        """(status code, decoded JSON or None)."""
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = {"Content-Type": "application/json"}
+        if self.token: headers["Authorization"] = f"Bearer {self.token}"
+        req = urllib.request.Request(self.url + path, data=data, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as r:
+                body = r.read()
+                return r.status, json.loads(body) if body else None
+        except urllib.error.HTTPError as e:
+            body = e.read()
+            return e.code, json.loads(body) if body else None
+
+    def _check(self, status, data):
+        if status != 200:
+            raise ValueError(f"job server answered {status}: {(data or {}).get('error', 'no reason given')}")
+        return data
+
+    def submit(self, inputs, output_dir=None, subtitles=None, root=None, settings=None):
+        """Job ids; ValueError when the server refuses the batch."""
+        return self._check(*self.call("POST", "/jobs", {"inputs": inputs, "output_dir": output_dir, "subtitles": subtitles or {},
+                                                        "root": root, "settings": settings or {}}))["ids"]
+
+    def jobs(self):
+        return self._check(*self.call("GET", "/jobs"))["jobs"]
+
+    def cancel(self):
+        self.call("POST", "/cancel", {})
+
+
+# --- WORKER ---
+class Worker:
+    """Leases jobs from a server and runs them one at a time with a local
+    BurnEngine. Several Worker threads (or processes) can share a server."""
+
+    def __init__(self, url, ffmpeg_exe=None, worker_id=None, scratch=None, heartbeat=HEARTBEAT_INTERVAL, log=None, token=None):
+        self.client = JobClient(url, token=token)
+        self.ffmpeg_exe = ffmpeg_exe
+        self.id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.scratch = scratch  # this node's own scratch folder (the submitter's means nothing here)
+        self.heartbeat = heartbeat
+        self.log = log or (lambda msg: print(msg, file=sys.stderr))
+        self.model = ThroughputModel()
+        self.stop_event = threading.Event()
+        self.engine = None
+
+    def run(self, once=False):
+        """Works until stop() (or, with once=True, until the queue is empty)."""
+        while not self.stop_event.is_set():
+            try:
+                code, job = self.client.call("POST", "/lease", {"worker": self.id})
+            except OSError as e:
+                self.log(f"[{self.id}] server unreachable ({e}); retrying")
+                self.stop_event.wait(IDLE_POLL * 2)
+                continue
+            if code in (401, 403):
+                self.log(f"[{self.id}] server refused the token ({TOKEN_ENV})")
+            if code != 200 or not job:
+                if once: return
+                self.stop_event.wait(IDLE_POLL)
+                continue
+            self.run_job(job)
+
+    def run_job(self, lease):
+        self.log(f"[{self.id}] {os.path.basename(lease['input'])}")
+        settings = dict(lease["settings"], scratch=self.scratch)
+        # The lease id tags the staging names: if this lease is given away, the
+        # next holder encodes next to us, not into our partial file
+        engine = self.engine = BurnEngine(settings, ffmpeg_exe=self.ffmpeg_exe, model=self.model, stage_tag=lease.get("lease"))
+        interval = min(self.heartbeat, lease.get("heartbeat") or self.heartbeat)
+        done = threading.Event()
+        state = {"progress": 0.0, "fps": None, "speed": None}
+
+        def on_progress(job, fraction):
+            state["progress"] = fraction
+            if job.stats: state["fps"], state["speed"] = job.stats.fps, job.stats.speed
+
+        def beat():
+            # Also while probing or committing, when ffmpeg reports nothing
+            while not done.wait(interval):
+                try:
+                    code, _ = self.client.call("POST", f"/jobs/{lease['id']}/progress", dict(state, worker=self.id))
+                except OSError:
+                    continue  # server blip; the lease timeout is much longer than one beat
+                if code == 409:
+                    engine.cancel()  # reassigned or cancelled
+                    return
+
+        engine.on_progress = on_progress
+        threading.Thread(target=beat, daemon=True).start()
+        out_dir = os.path.dirname(lease["out_path"])
+        subtitles = {lease["input"]: lease["sub_path"]} if lease.get("sub_path") else None
+        try:
+            # root = the input's own folder, so the output lands exactly at out_path
+            jobs = engine.run([lease["input"]], out_dir, subtitles, root=os.path.dirname(os.path.abspath(lease["input"])))
+            job = jobs[0]
+            result = {"status": job.status, "returncode": job.returncode, "stderr_tail": job.stderr_tail, "record": job_record(job)}
+        except Exception as e:
+            result = {"status": BurnJob.FAILED, "stderr_tail": [f"{type(e).__name__}: {e}"]}
+        finally:
+            done.set()
+            self.engine = None
+        try:
+            self.client.call("POST", f"/jobs/{lease['id']}/done", dict(result, worker=self.id))
+        except OSError:
+            pass  # the lease expires and the job runs again elsewhere
+
+    def stop(self):
+        self.stop_event.set()
+        if self.engine: self.engine.cancel()
+
+
+def spawn_local_workers(url, count, ffmpeg_exe=None, scratch=None, token=None):
+    """Worker processes on this machine (same Python, same code). The token
+    goes through the environment, not the command line other users can see."""
+    cmd = [sys.executable, os.path.abspath(__file__), "worker", url]
+    if ffmpeg_exe: cmd += ["--ffmpeg", ffmpeg_exe]
+    if scratch: cmd += ["--scratch", scratch]
+    env = dict(os.environ, **({TOKEN_ENV: token} if token else {}))
+    return [subprocess.Popen(cmd, env=env) for _ in range(count)]
+
+
+# ==========================================
+#     REMOTE BATCH (CLIENT OF A SERVER)
+# ==========================================
+class RemoteEngine:
+    """Stands in for BurnEngine when the batch runs on a job server: the
+    same start/cancel/progress surface and callbacks, fed by polling /jobs.
+    Jobs are BurnJob objects, so metrics and reports work unchanged."""
+
+    def __init__(self, url, settings=None, on_job_start=None, on_progress=None, on_job_done=None, on_batch_done=None,
+                 poll_interval=1.0, token=None):
+        self.client = JobClient(url, token=token)
+        self.settings = make_settings(**(settings or {}))
+        self.on_job_start = on_job_start
+        self.on_progress = on_progress
+        self.on_job_done = on_job_done
+        self.on_batch_done = on_batch_done
+        self.poll_interval = poll_interval
+        self.jobs = []
+        self.is_paused = False  # pausing remote workers is not supported
+        self.stop_event = threading.Event()
+
+    def _emit(self, callback, *args):
+        if callback:
+            callback(*args)
+
+    def start(self, inputs, output_dir=None, subtitles=None, root=None):
+        t = threading.Thread(target=self.run, args=(inputs, output_dir, subtitles, root), daemon=True)
+        t.start()
+        return t
+
+    def run(self, inputs, output_dir=None, subtitles=None, root=None):
+        self.jobs = [BurnJob(f, None, sub_path=(subtitles or {}).get(f)) for f in inputs]
+        settings = dict(self.settings, scratch=None)  # workers use their own
+        try:
+            ids = self.client.submit(inputs, output_dir, subtitles, root, settings)
+        except (OSError, ValueError, KeyError) as e:
+            for job in self.jobs:
+                job.status, job.stderr_tail = BurnJob.FAILED, [f"Job server {self.client.url}: {e}"]
+                self._emit(self.on_job_done, job)
+            self._emit(self.on_batch_done, self.jobs, False)
+            return self.jobs
+        by_id = dict(zip(ids, self.jobs))
+        finished = set()
+        while len(finished) < len(ids):
+            time.sleep(self.poll_interval)  # not stop_event.wait: after cancel() it would return at once
+            try:
+                remote = {j["id"]: j for j in self.client.jobs() if j["id"] in by_id}
+            except (OSError, ValueError):
+                if self.stop_event.is_set(): break  # cancelled and the server is gone: stop waiting
+                continue
+            for job_id, r in remote.items():
+                job = by_id[job_id]
+                job.out_path = r["output"]
+                if r["status"] == BurnJob.RUNNING and job.status != BurnJob.RUNNING:
+                    job.status = BurnJob.RUNNING
+                    job.started_at = job.started_at or time.time()
+                    self._emit(self.on_job_start, job)
+                if r["status"] == BurnJob.RUNNING and r["progress"] != job.progress:
+                    job.progress = r["progress"]
+                    self._emit(self.on_progress, job, job.progress)
+                if r["status"] in (BurnJob.DONE, BurnJob.FAILED, BurnJob.CANCELLED) and job_id not in finished:
+                    finished.add(job_id)
+                    record = r.get("record") or {}
+                    job.status, job.returncode, job.stderr_tail = r["status"], r["returncode"], r["stderr_tail"]
+                    job.progress = 1.0 if job.status == BurnJob.DONE else job.progress
+                    job.started_at = record.get("started_at") or job.started_at
+                    job.finished_at = record.get("finished_at") or time.time()
+                    job.duration = record.get("media_s") or 0
+                    job.min_fps = record.get("min_fps")
+                    job.mode = record.get("mode")
+                    self._emit(self.on_job_done, job)
+                elif r["status"] == BurnJob.PENDING and job.status == BurnJob.RUNNING:
+                    job.status = BurnJob.PENDING  # its worker died; queued again
+        self._emit(self.on_batch_done, self.jobs, not self.stop_event.is_set())
+        return self.jobs
+
+    def batch_progress(self):
+        if not self.jobs: return 0.0
+        return sum(1.0 if j.status == BurnJob.DONE else j.progress for j in self.jobs) / len(self.jobs)
+
+    def batch_eta(self):
+        return None
+
+    def running_jobs(self):
+        return [j for j in self.jobs if j.status == BurnJob.RUNNING]
+
+    def ffmpeg_pids(self):
+        return []
+
+    def pause(self):
+        pass
+
+    def resume(self):
+        pass
+
+    def cancel(self):
+        self.stop_event.set()
+        try:
+            self.client.cancel()
+        except OSError:
+            pass
+
+
+# ==========================================
+#                   CLI
+# ==========================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run burns on a job server with worker processes.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("serve", help="run the job server")
+    p.add_argument("--host", default="127.0.0.1", help="address to listen on (0.0.0.0 for remote workers)")
+    p.add_argument("--port", type=int, default=DEFAULT_SERVER_PORT)
+    p.add_argument("--local-workers", type=int, default=0, help="also start this many workers on this machine")
+    p.add_argument("--lease-timeout", type=float, default=LEASE_TIMEOUT, help="seconds without a heartbeat before a job is reassigned")
+    p.add_argument("--ffmpeg", help="path to ffmpeg for the local workers")
+    p.add_argument("--scratch", help="scratch folder for the local workers")
+    p.add_argument("--token", default=os.environ.get(TOKEN_ENV),
+                   help=f"shared token every client must send (default: ${TOKEN_ENV}); required off localhost")
+    p.add_argument("--allow-root", action="append", default=[], metavar="FOLDER",
+                   help="only accept outputs under this folder (repeatable); required off localhost")
+
+    p = sub.add_parser("worker", help="lease and run jobs from a server")
+    p.add_argument("url")
+    p.add_argument("-j", "--jobs", type=int, default=1, help="jobs this worker runs at once")
+    p.add_argument("--ffmpeg", help="path to ffmpeg (default: search PATH)")
+    p.add_argument("--scratch", help="fast local folder to encode into on this node")
+    p.add_argument("--once", action="store_true", help="exit when the queue is empty")
+    p.add_argument("--token", default=os.environ.get(TOKEN_ENV), help=f"the server's token (default: ${TOKEN_ENV})")
+
+    p = sub.add_parser("submit", help="queue files on a server")
+    p.add_argument("url")
+    p.add_argument("inputs", nargs="+", help="video files or folders (paths as the workers see them)")
+    p.add_argument("-o", "--output", help="output folder (default: Output next to each input)")
+    p.add_argument("--settings", help="JSON object of burn settings, e.g. '{\"size\": 28}'")
+    p.add_argument("--wait", action="store_true", help="wait until every submitted job has finished")
+    p.add_argument("--token", default=os.environ.get(TOKEN_ENV), help=f"the server's token (default: ${TOKEN_ENV})")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        # Reachable from other machines: any of them could otherwise queue writes anywhere
+        if args.host not in LOOPBACK and not (args.token and args.allow_root):
+            parser.error(f"--host {args.host} needs --token (or ${TOKEN_ENV}) and at least one --allow-root")
+        queue = JobQueue(args.lease_timeout, allowed_roots=args.allow_root)
+        server = JobServer(args.port, args.host, queue, token=args.token).start()
+        print(f"Job server on {server.url}", file=sys.stderr)
+        url = f"http://127.0.0.1:{server.port}" if args.host in ("0.0.0.0", "") else server.url
+        procs = spawn_local_workers(url, args.local_workers, args.ffmpeg, args.scratch, args.token)
+        try:
+            while True: time.sleep(3600)
+        except KeyboardInterrupt:
+            return 130
+        finally:
+            for proc in procs: proc.terminate()
+            for proc in procs: proc.wait()
+            server.stop()
+
+    if args.command == "worker":
+        workers = [Worker(args.url, args.ffmpeg, scratch=args.scratch, token=args.token) for _ in range(max(1, args.jobs))]
+        threads = [threading.Thread(target=w.run, args=(args.once,), daemon=True) for w in workers]
+        for t in threads: t.start()
+        # Terminated (e.g. by serve): cancel the running encodes instead of orphaning ffmpeg
+        signal.signal(signal.SIGTERM, lambda *_: [w.stop() for w in workers])
+        try:
+            for t in threads:
+                while t.is_alive(): t.join(1.0)
+        except KeyboardInterrupt:
+            for w in workers: w.stop()
+            return 130
+        return 0
+
+    files, subtitles = expand_inputs(args.inputs)
+    if not files:
+        parser.error("no video files found")
+    client = JobClient(args.url, token=args.token)
+    try:
+        ids = client.submit(files, args.output, subtitles, common_root(args.inputs), json.loads(args.settings) if args.settings else None)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    print(f"Queued {len(ids)} job(s)", file=sys.stderr)
+    if not args.wait:
+        return 0
+    while True:
+        jobs = [j for j in client.jobs() if j["id"] in ids]
+        if all(j["status"] in (BurnJob.DONE, BurnJob.FAILED, BurnJob.CANCELLED) for j in jobs):
+            for j in jobs: print(f"{os.path.basename(j['file'])}: {j['status']}", file=sys.stderr)
+            return 0 if all(j["status"] == BurnJob.DONE for j in jobs) else 1
+        time.sleep(IDLE_POLL)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
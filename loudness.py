@@ -0,0 +1,156 @@
+import os
+import re
+import json
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from ffmpeg_utils import DATA_DIR, popen_kwargs
+from job_journal import file_signature
+
+# ==========================================
+#      TWO-PASS LOUDNESS NORMALIZATION
+# ==========================================
+# Pass 1 measures each input's loudness with an audio-only ffmpeg (no video
+# decode) as soon as the batch starts, a couple at a time alongside the
+# encodes. Pass 2 is loudnorm in linear mode with those measurements, applied
+# wherever the job's audio is finally encoded. Measurements are cached per
+# input file, so re-runs and previews never measure twice.
+
+TARGET = {"I": -16.0, "TP": -1.5, "LRA": 11.0}
+LOUDNESS_CACHE_PATH = os.path.join(DATA_DIR, "loudness_cache.json")
+MEASURED_KEYS = ("input_i", "input_tp", "input_lra", "input_thresh", "target_offset")
+# loudnorm works at 192 kHz internally; bring it back to a normal rate
+OUTPUT_RATE = "48000"
+
+JSON_BLOCK = re.compile(r"\{[^{}]*\"input_i\"[^{}]*\}", re.S)
+
+
+def _target_args():
+    return f"I={TARGET['I']}:TP={TARGET['TP']}:LRA={TARGET['LRA']}"
+
+
+def build_measure_cmd(ffmpeg_exe, input_path):
+    return [
+        ffmpeg_exe, '-hide_banner', '-nostats', '-i', input_path,
+        '-map', '0:a:0', '-vn', '-sn', '-af', f"loudnorm={_target_args()}:print_format=json", '-f', 'null', '-'
+    ]
+
+
+def parse_measurement(stderr_text):
+    """The loudnorm JSON report from pass 1 as {key: float}, or None."""
+    blocks = JSON_BLOCK.findall(stderr_text or "")
+    if not blocks:
+        return None
+    try:
+        data = json.loads(blocks[-1])
+        m = {k: float(data[k]) for k in MEASURED_KEYS}
+    except (ValueError, KeyError):
+        return None
+    # Silence measures as -inf; linear mode cannot do anything useful with it
+    if any(v != v or v in (float('inf'), float('-inf')) for v in m.values()):
+        return None
+    return m
+
+
+def one_pass_filter():
+    return f"loudnorm={_target_args()}"
+
+
+def linear_filter(m):
+    """Pass 2: applies the measured gain as a single linear correction."""
+    return (f"loudnorm={_target_args()}:measured_I={m['input_i']}:measured_TP={m['input_tp']}"
+            f":measured_LRA={m['input_lra']}:measured_thresh={m['input_thresh']}"
+            f":offset={m['target_offset']}:linear=true")
+
+
+def measure(ffmpeg_exe, input_path):
+    try:
+        r = subprocess.run(build_measure_cmd(ffmpeg_exe, input_path), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                           encoding='utf-8', errors='replace', **popen_kwargs())
+    except OSError:
+        return None
+    return parse_measurement(r.stderr) if r.returncode == 0 else None
+
+
+class LoudnessCache:
+    """Measurements keyed by input file signature (path, size, mtime)."""
+
+    def __init__(self, path=LOUDNESS_CACHE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.dirty = False
+        try:
+            with open(path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, input_path):
+        with self.lock:
+            return self.entries.get(file_signature(input_path))
+
+    def put(self, input_path, measurement):
+        with self.lock:
+            self.entries[file_signature(input_path)] = measurement
+            self.dirty = True
+
+    def save(self):
+        with self.lock:
+            if not self.dirty: return
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp = self.path + ".tmp"
+                with open(tmp, "w", encoding='utf-8') as f:
+                    json.dump(self.entries, f)
+                os.replace(tmp, self.path)
+                self.dirty = False
+            except OSError:
+                pass
+
+
+class LoudnessAnalyzer:
+    """Runs pass 1 for queued files in the background.
+
+    Audio-only decoding is cheap, so a small pool keeps ahead of the encodes
+    without competing with them for the GPU.
+    """
+
+    def __init__(self, ffmpeg_exe, cache=None, max_workers=2):
+        self.ffmpeg_exe = ffmpeg_exe
+        self.cache = cache or LoudnessCache()
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
+        self.futures = {}
+        self.lock = threading.Lock()
+
+    def _run(self, path):
+        m = self.cache.get(path)
+        if m is None:
+            m = measure(self.ffmpeg_exe, path)
+            if m is not None: self.cache.put(path, m)
+        return m
+
+    def submit(self, paths):
+        with self.lock:
+            for p in paths:
+                if p not in self.futures:
+                    self.futures[p] = self.pool.submit(self._run, p)
+
+    def ready(self, path):
+        """Measurement if pass 1 has finished for path, else None (never blocks)."""
+        m = self.cache.get(path)
+        if m is not None: return m
+        with self.lock:
+            fut = self.futures.get(path)
+        return fut.result() if fut is not None and fut.done() else None
+
+    def get(self, path):
+        """Measurement for path, waiting for pass 1 if needed. None if it failed."""
+        self.submit([path])
+        with self.lock:
+            fut = self.futures[path]
+        return fut.result()
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.cache.save()
@@ -0,0 +1,123 @@
+import os
+import time
+import fnmatch
+import threading
+
+# ==========================================
+#      STREAMING FOLDER IMPORT (SCANDIR)
+# ==========================================
+# Walks folder trees with os.scandir on a worker thread and hands matches
+# over in batches, each paired with its .srt sidecar while the directory
+# listing is already in memory. Nothing here touches the GUI.
+
+VIDEO_EXTS = ('.mp4', '.mkv', '.avi')
+DEFAULT_INCLUDE = ["*" + ext for ext in VIDEO_EXTS]
+# Our own outputs land in Output/ next to the inputs; never re-import them
+DEFAULT_EXCLUDE = ["Output", "preview.mp4", ".partial-*"]
+
+
+def _matches(name, patterns):
+    name = name.lower()
+    return any(fnmatch.fnmatch(name, p.lower()) for p in patterns)
+
+
+def scan_folder(root, include=None, exclude=None, max_depth=None, cancel_event=None):
+    """Yields (video_path, sub_path) for every matching file under `root`.
+
+    sub_path is the sidecar .srt when one sits next to the video, otherwise the
+    video itself (the subtitles filter then reads its embedded track).
+    max_depth=0 means only `root` itself; None means no limit. Directories
+    are walked depth-first in name order so results stream in a stable order.
+    `exclude` patterns are skipped on top of DEFAULT_EXCLUDE, never instead of it.
+    """
+    include = include or DEFAULT_INCLUDE
+    exclude = DEFAULT_EXCLUDE + list(exclude or [])
+    stack = [(root, 0)]
+    while stack:
+        if cancel_event is not None and cancel_event.is_set(): return
+        folder, depth = stack.pop()
+        try:
+            with os.scandir(folder) as it:
+                entries = sorted(it, key=lambda e: e.name.lower())
+        except OSError:
+            continue  # unreadable folder (permissions, share went away)
+
+        names = {e.name.lower(): e.name for e in entries}
+        subdirs = []
+        for e in entries:
+            if _matches(e.name, exclude): continue
+            try:
+                is_dir = e.is_dir()
+            except OSError:
+                continue
+            if is_dir:
+                if max_depth is None or depth < max_depth:
+                    subdirs.append(e.path)
+            elif _matches(e.name, include):
+                srt = names.get(os.path.splitext(e.name)[0].lower() + ".srt")
+                yield e.path, (os.path.join(folder, srt) if srt else e.path)
+        # Reversed so the stack pops them in name order
+        stack.extend((d, depth + 1) for d in reversed(subdirs))
+
+
+def expand_inputs(paths, include=None, exclude=None, max_depth=None):
+    """Folders become their (recursive) video files, plain files pass through.
+    Returns (files, subtitles) where subtitles maps scanned files to their sub_path."""
+    seen, files, subtitles = set(), [], {}
+    for p in paths:
+        found = scan_folder(p, include, exclude, max_depth) if os.path.isdir(p) else [(p, None)]
+        for video, sub in found:
+            if video in seen: continue
+            seen.add(video)
+            files.append(video)
+            if sub: subtitles[video] = sub
+    return files, subtitles
+
+
+class FolderScanner:
+    """Background scan of one or more folders.
+
+    on_batch(pairs) gets lists of (video_path, sub_path) every `batch_size`
+    matches or `batch_interval` seconds, whichever comes first, and
+    on_done(count, cancelled) fires once at the end. Both run on the
+    scanner thread.
+    """
+
+    def __init__(self, roots, on_batch, on_done=None, include=None, exclude=None, max_depth=None, batch_size=200, batch_interval=0.25):
+        self.roots = list(roots)
+        self.on_batch = on_batch
+        self.on_done = on_done
+        self.include = include
+        self.exclude = exclude
+        self.max_depth = max_depth
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.cancel_event = threading.Event()
+        self.count = 0
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def is_alive(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def run(self):
+        batch, last_flush = [], time.monotonic()
+        for root in self.roots:
+            for pair in scan_folder(root, self.include, self.exclude, self.max_depth, self.cancel_event):
+                if self.cancel_event.is_set(): break
+                batch.append(pair)
+                self.count += 1
+                if len(batch) >= self.batch_size or time.monotonic() - last_flush >= self.batch_interval:
+                    self.on_batch(batch)
+                    batch, last_flush = [], time.monotonic()
+        if batch:
+            self.on_batch(batch)
+        if self.on_done:
+            self.on_done(self.count, self.cancel_event.is_set())
@@ -0,0 +1,218 @@
+import os
+import re
+import json
+import shutil
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from ffmpeg_utils import DATA_DIR, popen_kwargs
+
+# ==========================================
+#        MEDIA PROBE (ffprobe + CACHE)
+# ==========================================
+# One ffprobe call per file gives everything the encoder and ETA code need.
+# Results are cached on disk by path, validated against size and mtime, so
+# re-importing a library does not probe it again.
+
+PROBE_CACHE_PATH = os.path.join(DATA_DIR, "probe_cache.json")
+
+
+def find_ffprobe(ffmpeg_exe=None):
+    """ffprobe on PATH, else the one sitting next to ffmpeg."""
+    exe = shutil.which("ffprobe")
+    if not exe and ffmpeg_exe:
+        folder = os.path.dirname(ffmpeg_exe)
+        for name in ("ffprobe.exe", "ffprobe"):
+            if os.path.exists(os.path.join(folder, name)):
+                return os.path.join(folder, name)
+    return exe
+
+
+def _parse_rate(rate):
+    try:
+        num, den = rate.split("/")
+        return float(num) / float(den) if float(den) else 0.0
+    except (ValueError, AttributeError):
+        return 0.0
+
+
+def parse_probe_json(data):
+    """Flattens ffprobe's -show_format -show_streams JSON into the fields we use."""
+    fmt = data.get("format", {})
+    streams = data.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video" and not s.get("disposition", {}).get("attached_pic")), {})
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), {})
+
+    duration = float(fmt.get("duration") or video.get("duration") or 0)
+    subs = []
+    for s in streams:
+        if s.get("codec_type") != "subtitle": continue
+        tags = s.get("tags", {})
+        subs.append({
+            "index": s.get("index"),
+            "codec": s.get("codec_name"),
+            "language": tags.get("language"),
+            "title": tags.get("title"),
+        })
+
+    return {
+        "duration": duration,
+        "width": video.get("width", 0),
+        "height": video.get("height", 0),
+        "vcodec": video.get("codec_name"),
+        "pix_fmt": video.get("pix_fmt"),
+        "fps": _parse_rate(video.get("avg_frame_rate")) or _parse_rate(video.get("r_frame_rate")),
+        "acodec": audio.get("codec_name"),
+        "audio_streams": sum(1 for s in streams if s.get("codec_type") == "audio"),
+        "subtitle_streams": subs,
+        "format": fmt.get("format_name"),
+        "bit_rate": int(fmt.get("bit_rate") or 0),
+        "size": int(fmt.get("size") or 0),
+    }
+
+
+def banner_duration(ffmpeg_exe, path):
+    """Fallback when ffprobe is missing: scrape Duration from `ffmpeg -i`. 0 if unknown."""
+    try:
+        r = subprocess.run([ffmpeg_exe, '-i', path], stderr=subprocess.PIPE, encoding='utf-8', errors='replace', **popen_kwargs())
+        m = re.search(r"Duration: (\d{2}):(\d{2}):(\d{2}\.\d{2})", r.stderr)
+        if m:
+            h, m, s = map(float, m.groups())
+            return h*3600 + m*60 + s
+    except OSError: pass
+    return 0
+
+
+def probe_file(ffprobe_exe, path):
+    """Runs ffprobe on one file. Returns the parsed dict, or None if it failed."""
+    cmd = [ffprobe_exe, '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', path]
+    try:
+        r = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, encoding='utf-8', errors='replace', **popen_kwargs())
+        if r.returncode != 0: return None
+        return parse_probe_json(json.loads(r.stdout or "{}"))
+    except (OSError, ValueError):
+        return None
+
+
+class ProbeCache:
+    """On-disk {path: {size, mtime_ns, info}} map. A stale size/mtime is a miss."""
+
+    def __init__(self, path=PROBE_CACHE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.dirty = False
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    @staticmethod
+    def _stat(path):
+        try:
+            st = os.stat(path)
+            return st.st_size, st.st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self, path):
+        stat = self._stat(path)
+        with self.lock:
+            entry = self.entries.get(os.path.abspath(path))
+        if entry and stat and (entry["size"], entry["mtime_ns"]) == stat:
+            return entry["info"]
+        return None
+
+    def put(self, path, info):
+        stat = self._stat(path)
+        if not stat: return
+        with self.lock:
+            self.entries[os.path.abspath(path)] = {"size": stat[0], "mtime_ns": stat[1], "info": info}
+            self.dirty = True
+
+    def save(self):
+        with self.lock:
+            if not self.dirty: return
+            snapshot = json.dumps(self.entries)
+            self.dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding='utf-8') as f:
+                f.write(snapshot)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # cache is an optimisation, never fatal
+
+
+class MediaProber:
+    """Probes files on a small thread pool as soon as they are submitted.
+
+    submit() returns immediately; get() returns the cached info, waiting for
+    an in-flight probe of that file if there is one.
+    """
+
+    def __init__(self, ffmpeg_exe=None, ffprobe_exe=None, cache=None, max_workers=4):
+        self.ffmpeg_exe = ffmpeg_exe
+        self.ffprobe_exe = ffprobe_exe or find_ffprobe(ffmpeg_exe)
+        self.cache = cache if cache is not None else ProbeCache()
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="probe")
+        self.lock = threading.Lock()
+        self.futures = {}
+
+    def _probe(self, path):
+        info = self.cache.get(path)
+        if info is not None: return info
+        if self.ffprobe_exe:
+            info = probe_file(self.ffprobe_exe, path)
+        elif self.ffmpeg_exe:
+            # No ffprobe around: duration only, from ffmpeg's banner
+            duration = banner_duration(self.ffmpeg_exe, path)
+            info = {"duration": duration} if duration else None
+        if info is not None:
+            self.cache.put(path, info)
+        return info
+
+    def _finished(self, path):
+        with self.lock:
+            self.futures.pop(path, None)
+            idle = not self.futures
+        if idle:
+            self.cache.save()
+
+    def submit(self, paths, callback=None):
+        """Queues background probes. callback(path, info) fires on a pool thread."""
+        for path in paths:
+            with self.lock:
+                if path in self.futures: continue
+                fut = self.pool.submit(self._probe, path)
+                self.futures[path] = fut
+
+            def done(f, path=path):
+                self._finished(path)
+                if callback:
+                    callback(path, f.result() if not f.exception() else None)
+            fut.add_done_callback(done)
+
+    def get(self, path):
+        with self.lock:
+            fut = self.futures.get(path)
+        if fut is not None:
+            try:
+                return fut.result()
+            except Exception:
+                return None
+        info = self._probe(path)
+        self.cache.save()
+        return info
+
+    def duration(self, path):
+        """Duration in seconds, or 0 when the file could not be probed."""
+        info = self.get(path)
+        return (info or {}).get("duration") or 0
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.cache.save()
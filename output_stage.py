@@ -0,0 +1,211 @@
+import os
+import shutil
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# ==========================================
+#       OUTPUT STAGING AND COMMIT
+# ==========================================
+# ffmpeg never writes the final file name. Each job encodes to a staging
+# path: a per-job folder in the scratch directory when one is configured
+# (fast local disk while sources and outputs sit on a share), else a hidden
+# ".partial-" name next to the output. A finished file is committed with an
+# atomic rename when staging and output share a filesystem; otherwise it is
+# copied in the background (into a ".partial-" name, then renamed) while the
+# next encode already runs. A cancelled or crashed job therefore never
+# leaves a truncated file under the output name.
+#
+# Several workers on one output (a lease handed to another node while the
+# first still runs) give their stagers different tags, so neither removes or
+# overwrites what the other is staging; the last finished rename wins.
+#
+# Before a job starts, free space is checked against a size estimate, with
+# the space promised to jobs still running or committing held back.
+
+PARTIAL_PREFIX = ".partial-"
+# Output estimate: source size times this (quality-targeted encodes rarely grow
+# a file by more), plus a flat margin for small files and container overhead
+SIZE_FACTOR = 1.25
+SIZE_MARGIN = 256 * 1024 * 1024
+COPY_CHUNK = 8 * 1024 * 1024
+
+
+class StageError(OSError):
+    pass
+
+
+def output_path_for(input_path, output_dir=None, root=None):
+    """Where the burned copy of input_path goes: an Output folder next to the
+    input, or output_dir with the input's folder structure under root mirrored."""
+    name = os.path.basename(input_path)
+    if not output_dir:
+        return os.path.join(os.path.dirname(os.path.abspath(input_path)), "Output", name)
+    rel = "."
+    if root:
+        try:
+            rel = os.path.relpath(os.path.dirname(os.path.abspath(input_path)), os.path.abspath(root))
+        except ValueError:
+            rel = "."  # another drive (Windows)
+        if rel.startswith(".."): rel = "."
+    return os.path.normpath(os.path.join(output_dir, rel, name))
+
+
+def common_root(paths):
+    dirs = [os.path.dirname(os.path.abspath(p)) if not os.path.isdir(p) else os.path.abspath(p) for p in paths]
+    try:
+        return os.path.commonpath(dirs) if dirs else None
+    except ValueError:
+        return None  # mixed drives: no common folder, outputs go flat
+
+
+def estimate_output_size(info, input_path, work_copies=1):
+    """Bytes to keep free for one job. Segmented and smart encodes hold their
+    parts and the joined file at the same time (work_copies=2)."""
+    size = (info or {}).get("size") or 0
+    if not size:
+        try: size = os.path.getsize(input_path)
+        except OSError: size = 0
+    return int(size * SIZE_FACTOR * work_copies) + SIZE_MARGIN
+
+
+def _device(path):
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path: break
+        path = parent
+    try:
+        return os.stat(path).st_dev
+    except OSError:
+        return None
+
+
+def _free(path):
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path: break
+        path = parent
+    try:
+        return shutil.disk_usage(path).free
+    except OSError:
+        return None
+
+
+class OutputStager:
+    """Hands out staging paths (with a free-space check) and commits them.
+
+    commit() calls on_done(error or None) once the output is in place: at
+    once for a rename, from a copy thread otherwise.
+    """
+
+    def __init__(self, scratch_dir=None, copy_workers=1, tag=None):
+        self.scratch_dir = os.path.abspath(scratch_dir) if scratch_dir else None
+        self.tag = tag  # makes staging names unique to this stager (e.g. a job server lease)
+        self.copy_workers = copy_workers
+        self.reserved = {}  # device -> bytes promised to staged jobs
+        self.held = {}      # work path -> [(device, bytes), ...]
+        self.lock = threading.Lock()
+        self.copier = ThreadPoolExecutor(max_workers=copy_workers)
+
+    def _scratch_job_dir(self, out_path):
+        # One folder per output: same-named files from different folders must not collide
+        key = os.path.abspath(out_path) + (f"|{self.tag}" if self.tag else "")
+        return os.path.join(self.scratch_dir, hashlib.sha1(key.encode('utf-8')).hexdigest()[:12])
+
+    def partial_path(self, out_path):
+        """The hidden name next to the output that staging and copies write to."""
+        prefix = f"{PARTIAL_PREFIX}{self.tag}-" if self.tag else PARTIAL_PREFIX
+        return os.path.join(os.path.dirname(os.path.abspath(out_path)), prefix + os.path.basename(out_path))
+
+    def _reserve(self, work_path, need, dirs):
+        """Holds `need` bytes on each device of dirs, or returns False."""
+        with self.lock:
+            devices = {}
+            for d in dirs:
+                dev = _device(d)
+                if dev not in devices: devices[dev] = d
+            for dev, d in devices.items():
+                free = _free(d)
+                if free is not None and free - self.reserved.get(dev, 0) < need:
+                    return False
+            for dev in devices:
+                self.reserved[dev] = self.reserved.get(dev, 0) + need
+            self.held[work_path] = [(dev, need) for dev in devices]
+            return True
+
+    def release(self, work_path):
+        with self.lock:
+            for dev, need in self.held.pop(work_path, []):
+                self.reserved[dev] = max(0, self.reserved.get(dev, 0) - need)
+
+    def stage(self, out_path, need):
+        """Staging path for out_path with `need` bytes free for it. Prefers
+        scratch, falls back to the output folder; StageError when neither fits."""
+        out_dir = os.path.dirname(os.path.abspath(out_path))
+        name = os.path.basename(out_path)
+        if self.scratch_dir:
+            job_dir = self._scratch_job_dir(out_path)
+            work_path = os.path.join(job_dir, name)
+            if self._reserve(work_path, need, [self.scratch_dir, out_dir]):
+                os.makedirs(job_dir, exist_ok=True)
+                return work_path
+        work_path = self.partial_path(out_path)
+        if self._reserve(work_path, need, [out_dir]):
+            return work_path
+        free = _free(out_dir) or 0
+        raise StageError(f"Not enough free space for {name}: about {need / 1e9:.1f} GB needed, "
+                         f"{free / 1e9:.1f} GB free in {out_dir}" + (" and in the scratch folder" if self.scratch_dir else ""))
+
+    def is_scratch(self, work_path):
+        return bool(self.scratch_dir) and os.path.abspath(work_path).startswith(self.scratch_dir + os.sep)
+
+    def discard(self, work_path):
+        """Removes a staged file (and its scratch folder) after a failed job."""
+        try: os.remove(work_path)
+        except OSError: pass
+        if self.is_scratch(work_path):
+            shutil.rmtree(os.path.dirname(work_path), ignore_errors=True)
+        self.release(work_path)
+
+    def clear(self, out_path):
+        """Removes what an interrupted earlier run staged for out_path."""
+        try: os.remove(self.partial_path(out_path))
+        except OSError: pass
+        if self.scratch_dir:
+            shutil.rmtree(self._scratch_job_dir(out_path), ignore_errors=True)
+
+    def commit(self, work_path, out_path, on_done, cancel_event=None):
+        os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+        try:
+            os.replace(work_path, out_path)
+        except OSError:
+            # Different filesystem (scratch -> share): copy off the encode path
+            self.copier.submit(self._copy, work_path, out_path, on_done, cancel_event)
+            return
+        self.discard(work_path)
+        on_done(None)
+
+    def _copy(self, work_path, out_path, on_done, cancel_event):
+        partial = self.partial_path(out_path)
+        error = None
+        try:
+            with open(work_path, "rb") as src, open(partial, "wb") as dst:
+                while True:
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise StageError("cancelled while copying to the output folder")
+                    chunk = src.read(COPY_CHUNK)
+                    if not chunk: break
+                    dst.write(chunk)
+            shutil.copystat(work_path, partial)
+            os.replace(partial, out_path)
+        except OSError as e:
+            error = e
+            try: os.remove(partial)
+            except OSError: pass
+        self.discard(work_path)
+        on_done(error)
+
+    def wait(self):
+        """Blocks until every background copy has finished."""
+        self.copier.shutdown(wait=True)
+        self.copier = ThreadPoolExecutor(max_workers=self.copy_workers)
@@ -0,0 +1,151 @@
+import os
+import time
+import hashlib
+import threading
+import subprocess
+
+from ffmpeg_utils import DATA_DIR, popen_kwargs
+from job_journal import file_signature
+from subtitles import SubtitleCache, load_cues
+from burn_engine import build_style, build_subtitle_filter, find_subtitle
+
+# ==========================================
+#        SNAPSHOT PREVIEW (STILL FRAMES)
+# ==========================================
+# Style previews without encoding anything: the frame under a subtitle cue is
+# decoded once (fast input seek, scaled down) and kept; each style change
+# then only runs the subtitles filter over that still image, which is a
+# fraction of a second. Both the frames and the rendered previews are cached
+# on disk by input, timestamp and style.
+
+PREVIEW_DIR = os.path.join(DATA_DIR, "previews")
+PREVIEW_WIDTH = 960
+PREVIEW_POINTS = 8  # cue times offered per file
+PREVIEW_MAX_AGE = 7 * 86400
+
+
+def preview_times(cues, duration, count=PREVIEW_POINTS):
+    """Timestamps worth previewing: the middle of cues spread over the file,
+    else evenly spaced points when there are no cues to aim at."""
+    if cues:
+        step = max(1, len(cues) // count)
+        return [round((s + e) / 2, 3) for s, e in cues[::step][:count]]
+    if duration > 0:
+        return [round(duration * (i + 1) / (count + 1), 3) for i in range(count)]
+    return [0.0]
+
+
+def build_frame_cmd(ffmpeg_exe, input_path, t, out_path, width=PREVIEW_WIDTH):
+    # -ss before -i: seek to the keyframe before t, decode only up to t
+    return [
+        ffmpeg_exe, '-v', 'error', '-y', '-ss', f"{t:.3f}", '-i', input_path,
+        '-frames:v', '1', '-vf', f"scale='min({width},iw)':-2", out_path
+    ]
+
+
+def build_snapshot_cmd(ffmpeg_exe, frame_path, t, out_path, sub_filter):
+    # The still has timestamp 0; move it to t so the filter draws the cue shown there
+    return [
+        ffmpeg_exe, '-v', 'error', '-y', '-i', frame_path,
+        '-vf', f"setpts=PTS+{t:.3f}/TB,{sub_filter}", '-frames:v', '1', out_path
+    ]
+
+
+def _run(cmd, out_path):
+    try:
+        r = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **popen_kwargs())
+    except OSError:
+        return False
+    return r.returncode == 0 and os.path.exists(out_path)
+
+
+class SnapshotRenderer:
+    """Renders preview stills for any input; request() is the GUI entry point.
+
+    request() runs on one background thread and only the newest request
+    matters: dragging the size slider queues many, but renders happen for
+    the last one when the previous render ends.
+    """
+
+    def __init__(self, ffmpeg_exe, prober=None, subtitles=None, cache_dir=PREVIEW_DIR):
+        self.ffmpeg_exe = ffmpeg_exe
+        self.prober = prober
+        self.subtitles = subtitles or SubtitleCache(ffmpeg_exe)
+        self.cache_dir = cache_dir
+        self.times_cache = {}  # (input signature, sub source signature) -> timestamps
+        self.cond = threading.Condition()
+        self.pending = None
+        self.thread = None
+        self.pruned = False
+
+    def _prune(self):
+        # Frames and stills add up; drop the ones older than a week
+        self.pruned = True
+        cutoff = time.time() - PREVIEW_MAX_AGE
+        try:
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+        except OSError:
+            pass
+
+    def _key(self, *parts):
+        return hashlib.sha1("\n".join(str(p) for p in parts).encode('utf-8')).hexdigest()
+
+    def _sub_path(self, input_path, settings, sub_path=None):
+        source = sub_path or find_subtitle(input_path)
+        info = self.prober.get(input_path) if self.prober else None
+        prepared = self.subtitles.prepare(source, build_style(settings), (info or {}).get("subtitle_streams"))
+        return source, prepared or source, info
+
+    def times(self, input_path, settings, sub_path=None):
+        source, prepared, info = self._sub_path(input_path, settings, sub_path)
+        key = (file_signature(input_path), file_signature(source))
+        if key not in self.times_cache:
+            cues = load_cues(prepared, self.ffmpeg_exe)
+            self.times_cache[key] = preview_times(cues, (info or {}).get("duration") or 0)
+        return self.times_cache[key]
+
+    def render(self, input_path, t, settings, sub_path=None):
+        """Path of a PNG showing the burned subtitles at t, or None."""
+        source, prepared, _ = self._sub_path(input_path, settings, sub_path)
+        signature = file_signature(input_path)
+        out_path = os.path.join(self.cache_dir, self._key(signature, file_signature(source), f"{t:.3f}", build_style(settings)) + ".png")
+        if os.path.exists(out_path):
+            return out_path
+        os.makedirs(self.cache_dir, exist_ok=True)
+        if not self.pruned: self._prune()
+        frame_path = os.path.join(self.cache_dir, self._key(signature, f"{t:.3f}") + ".frame.png")
+        if not os.path.exists(frame_path) and not _run(build_frame_cmd(self.ffmpeg_exe, input_path, t, frame_path), frame_path):
+            return None
+        sub_filter = build_subtitle_filter(input_path, settings, prepared)
+        return out_path if _run(build_snapshot_cmd(self.ffmpeg_exe, frame_path, t, out_path, sub_filter), out_path) else None
+
+    def snapshot(self, input_path, index, settings, sub_path=None):
+        """(png path or None, timestamp, index, number of timestamps) for the
+        index-th preview point of the file (wraps around)."""
+        times = self.times(input_path, settings, sub_path)
+        index %= len(times)
+        return self.render(input_path, times[index], settings, sub_path), times[index], index, len(times)
+
+    # --- BACKGROUND (LATEST REQUEST WINS) ---
+    def request(self, input_path, index, settings, on_done, sub_path=None):
+        """on_done(path, t, index, count) is called from the render thread."""
+        with self.cond:
+            self.pending = (input_path, index, dict(settings), on_done, sub_path)
+            self.cond.notify()
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._loop, daemon=True)
+                self.thread.start()
+
+    def _loop(self):
+        while True:
+            with self.cond:
+                while self.pending is None:
+                    self.cond.wait()
+                (input_path, index, settings, on_done, sub_path), self.pending = self.pending, None
+            try:
+                result = self.snapshot(input_path, index, settings, sub_path)
+            except (OSError, ValueError):
+                result = (None, 0.0, index, 1)
+            on_done(*result)
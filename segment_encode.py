@@ -0,0 +1,141 @@
+import os
+import json
+import subprocess
+
+from ffmpeg_utils import popen_kwargs
+from ffmpeg_progress import PROGRESS_ARGS
+
+# ==========================================
+#      SEGMENT-PARALLEL ENCODE (ONE FILE)
+# ==========================================
+# A feature-length file is cut at keyframes into N spans that are burned in
+# parallel, then joined with the concat demuxer (stream copy, no re-encode).
+# Audio never goes through the segments: it is copied or encoded once over
+# the whole file and muxed in during the join, so it cannot drift.
+#
+# The engine drives the processes; this module only plans and builds commands.
+
+# Spans shorter than this are not worth a separate ffmpeg start-up
+MIN_SEGMENT_SECONDS = 60
+
+
+def keyframe_times(ffprobe_exe, path):
+    """PTS (seconds) of every video keyframe, from packet flags (no decoding)."""
+    cmd = [ffprobe_exe, '-v', 'error', '-select_streams', 'v:0',
+           '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', path]
+    r = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, encoding='utf-8', errors='replace', **popen_kwargs())
+    times = []
+    for line in r.stdout.splitlines():
+        pts, _, flags = line.partition(',')
+        if 'K' in flags:
+            try: times.append(float(pts))
+            except ValueError: pass
+    return sorted(times)
+
+
+def plan_segments(keyframes, duration, count, min_seconds=MIN_SEGMENT_SECONDS):
+    """Splits [0, duration) into up to `count` spans that start on keyframes.
+
+    Returns [(start, end), ...]; the last end is None (read to EOF). Cut
+    points are the keyframes nearest to the even split, so spans are close to
+    equal length. Falls back to a single span when no useful cut exists.
+    """
+    if count < 2 or duration <= 0 or not keyframes:
+        return [(0.0, None)]
+    count = min(count, max(1, int(duration // min_seconds)))
+    cuts = []
+    for i in range(1, count):
+        target = duration * i / count
+        kf = min(keyframes, key=lambda t: abs(t - target))
+        prev = cuts[-1] if cuts else 0.0
+        if kf - prev >= min_seconds and duration - kf >= min_seconds:
+            cuts.append(kf)
+    bounds = [0.0] + cuts
+    return [(start, bounds[i + 1] if i + 1 < len(bounds) else None) for i, start in enumerate(bounds)]
+
+
+def segment_filter(start, sub_filter):
+    """Burn filter for a span that was input-seeked to `start`.
+
+    Seeking resets timestamps to 0, so shift frames back to source time for
+    the subtitles filter (cues line up), then rebase the span to start at 0.
+    """
+    if start <= 0:
+        return f"{sub_filter},format=yuv420p"
+    return f"setpts=PTS+{start:.6f}/TB,{sub_filter},setpts=PTS-STARTPTS,format=yuv420p"
+
+
+def build_segment_cmd(ffmpeg_exe, input_path, start, end, vf, video_args, out_path, input_args=(), fps=0):
+    cmd = [ffmpeg_exe, '-y', '-hide_banner', *PROGRESS_ARGS, *input_args]
+    if start > 0:
+        cmd += ['-ss', f"{start:.6f}"]
+    cmd += ['-i', input_path]
+    if end is not None:
+        # Stop half a frame early: the keyframe at `end` belongs to the next
+        # span, and float rounding must not let it slip into this one too
+        cmd += ['-t', f"{end - start - (0.5 / fps if fps else 0):.6f}"]
+    return cmd + ['-map', '0:v:0', '-vf', vf, *video_args, '-an', '-sn', out_path]
+
+
+def build_audio_cmd(ffmpeg_exe, input_path, audio_args, out_path):
+    """Whole-file audio in one pass, for modes that re-encode audio. First
+    audio track only, like every other mode."""
+    return [ffmpeg_exe, '-y', '-hide_banner', '-i', input_path, '-map', '0:a:0?', '-vn', '-sn', *audio_args, out_path]
+
+
+def write_concat_list(paths, list_path):
+    with open(list_path, "w", encoding='utf-8') as f:
+        for p in paths:
+            safe = os.path.abspath(p).replace("\\", "/").replace("'", "'\\''")
+            f.write(f"file '{safe}'\n")
+    return list_path
+
+
+def build_concat_cmd(ffmpeg_exe, list_path, audio_src, out_path):
+    """Lossless join of the video spans plus the single audio source."""
+    return [
+        ffmpeg_exe, '-y', '-hide_banner', *PROGRESS_ARGS,
+        '-f', 'concat', '-safe', '0', '-i', list_path, '-i', audio_src,
+        '-map', '0:v:0', '-map', '1:a:0?', '-c', 'copy', out_path
+    ]
+
+
+def count_streams(ffprobe_exe, path, count_packets=True):
+    """{codec_type: (packets, duration)}. Counting packets demuxes the whole
+    file; without it only the headers are read and packets is 0."""
+    entries = 'stream=codec_type,nb_read_packets,duration:format=duration' if count_packets else 'stream=codec_type,duration:format=duration'
+    cmd = [ffprobe_exe, '-v', 'error', *(['-count_packets'] if count_packets else []), '-show_entries', entries, '-of', 'json', path]
+    r = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, encoding='utf-8', errors='replace', **popen_kwargs())
+    try:
+        data = json.loads(r.stdout or "{}")
+    except ValueError:
+        return {}
+    fmt_duration = float(data.get("format", {}).get("duration") or 0)
+    out = {}
+    for s in data.get("streams", []):
+        kind = s.get("codec_type")
+        if kind in out: continue
+        out[kind] = (int(s.get("nb_read_packets") or 0), float(s.get("duration") or fmt_duration))
+    return out
+
+
+def check_join(ffprobe_exe, source_path, out_path, fps, count_frames=False):
+    """Verifies a segmented encode: audio ending within a frame or two of the
+    video (no A/V drift) and, with count_frames, the same video frame count
+    as the source (no dropped or doubled frames at the joins; this reads both
+    files end to end). Returns a list of problems; empty means the output is good."""
+    src = count_streams(ffprobe_exe, source_path, count_frames)
+    out = count_streams(ffprobe_exe, out_path, count_frames)
+    problems = []
+    if "video" not in out:
+        return ["output has no video stream"]
+    if count_frames and "video" in src and src["video"][0] != out["video"][0]:
+        problems.append(f"frame count {out['video'][0]} != source {src['video'][0]}")
+    if "audio" in out:
+        # Compare against the source's own A/V offset, which the join must preserve
+        src_offset = src["audio"][1] - src["video"][1] if "audio" in src and "video" in src else 0.0
+        tolerance = max(2.0 / fps if fps else 0.1, 0.1)
+        drift = abs(out["audio"][1] - out["video"][1] - src_offset)
+        if drift > tolerance:
+            problems.append(f"audio/video durations differ by {drift:.3f}s")
+    return problems
@@ -0,0 +1,109 @@
+import os
+import bisect
+
+from ffmpeg_progress import PROGRESS_ARGS
+
+# ==========================================
+#     SMART RENDER (RE-ENCODE ONLY CUES)
+# ==========================================
+# Only GOPs that overlap a subtitle cue are decoded, burned and re-encoded;
+# everything between them (intros, credits, music) is stream-copied. Parts are
+# written as MPEG-TS with Annex B bitstreams so every part carries its own
+# parameter sets, then joined with the concat demuxer.
+#
+# Re-encoded parts must be the same codec as the copied ones, so this only
+# runs for sources we can re-encode like-for-like. Anything else, or a join
+# that fails verification, falls back to a normal full encode.
+
+# Source video codec -> Annex B bitstream filter. Burned parts are encoded by
+# whichever backend outputs the same codec (encoders.backend_for_codec).
+SMART_CODECS = {
+    "h264": "h264_mp4toannexb",
+    "hevc": "hevc_mp4toannexb",
+}
+SAFE_PIX_FMTS = ("yuv420p", None)
+SAFE_OUTPUT_EXTS = ('.mp4', '.mkv', '.mov')
+
+# Text is padded a little so fades/karaoke edges are inside the burned span
+CUE_PADDING = 0.5
+# Copy gaps shorter than this are burned too: another part costs more than it saves
+MIN_COPY_SECONDS = 10.0
+# Above this share of re-encoded time a plain full encode is simpler and as fast
+MAX_BURN_FRACTION = 0.8
+
+
+def blocker(info, out_path):
+    """Why smart rendering is unsafe for this source/output, or None if it is fine."""
+    if not info:
+        return "no probe data"
+    if info.get("vcodec") not in SMART_CODECS:
+        return f"cannot re-encode {info.get('vcodec')} like-for-like"
+    if info.get("pix_fmt") not in SAFE_PIX_FMTS:
+        return f"pixel format {info.get('pix_fmt')} would change in burned parts"
+    if os.path.splitext(out_path)[1].lower() not in SAFE_OUTPUT_EXTS:
+        return "output container does not take stream-copied parts"
+    return None
+
+
+def plan_spans(cues, keyframes, duration, padding=CUE_PADDING, min_copy=MIN_COPY_SECONDS):
+    """Covers [0, duration) with GOP-aligned spans: [(start, end, burn), ...].
+
+    Burn spans start on the keyframe at/before a cue and end on the keyframe
+    at/after it, so copied spans always start on a keyframe. The last span's
+    end is None (to EOF).
+    """
+    burn = []
+    for s, e in cues:
+        s, e = max(0.0, s - padding), min(duration, e + padding)
+        if e <= 0 or s >= duration: continue
+        i = bisect.bisect_right(keyframes, s) - 1
+        start = keyframes[i] if i >= 0 else 0.0
+        j = bisect.bisect_left(keyframes, e)
+        end = keyframes[j] if j < len(keyframes) else duration
+        if burn and start - burn[-1][1] < min_copy:
+            burn[-1][1] = max(burn[-1][1], end)
+        else:
+            burn.append([start, end])
+
+    if burn and burn[0][0] < min_copy:
+        burn[0][0] = 0.0
+    if burn and duration - burn[-1][1] < min_copy:
+        burn[-1][1] = duration
+
+    spans, pos = [], 0.0
+    for start, end in burn:
+        if start > pos:
+            spans.append((pos, start, False))
+        spans.append((start, end, True))
+        pos = end
+    if pos < duration:
+        spans.append((pos, duration, False))
+    if spans:
+        start, _, is_burn = spans[-1]
+        spans[-1] = (start, None, is_burn)
+    return spans
+
+
+def burned_seconds(spans, duration):
+    return sum((duration if e is None else e) - s for s, e, b in spans if b)
+
+
+def _trim_args(start, end, fps):
+    args = ['-ss', f"{start:.6f}"] if start > 0 else []
+    return args, (['-t', f"{end - start - (0.5 / fps if fps else 0):.6f}"] if end is not None else [])
+
+
+def build_copy_part_cmd(ffmpeg_exe, input_path, start, end, vcodec, out_path, fps=0):
+    seek, trim = _trim_args(start, end, fps)
+    return [
+        ffmpeg_exe, '-y', '-hide_banner', *PROGRESS_ARGS, *seek, '-i', input_path, *trim,
+        '-map', '0:v:0', '-c:v', 'copy', '-bsf:v', SMART_CODECS[vcodec], '-an', '-sn', '-f', 'mpegts', out_path
+    ]
+
+
+def build_burn_part_cmd(ffmpeg_exe, input_path, start, end, vf, video_args, out_path, input_args=(), fps=0):
+    seek, trim = _trim_args(start, end, fps)
+    return [
+        ffmpeg_exe, '-y', '-hide_banner', *PROGRESS_ARGS, *input_args, *seek, '-i', input_path, *trim,
+        '-map', '0:v:0', '-vf', vf, *video_args, '-an', '-sn', '-f', 'mpegts', out_path
+    ]
@@ -1,596 +1,954 @@
-import customtkinter as ctk
-import os
-import threading
-import time
-import shutil
-import re
-import subprocess
-import psutil
-import winsound
-import glob
-import sys  # Added at top level for safety
-from tkinter import filedialog, messagebox
-
-# --- DRAG & DROP CHECK ---
-try:
-    from tkinterdnd2 import DND_FILES, TkinterDnD
-    dnd_available = True
-except ImportError:
-    dnd_available = False
-
-# ==========================================
-#         DYNAMIC THEME PALETTE
-# ==========================================
-ctk.set_appearance_mode("Dark")
-ctk.set_default_color_theme("dark-blue")
-
-# Theme Colors (Light, Dark)
-COLOR_BG = ("#F3F3F3", "#121212")        # Main Window Background
-COLOR_SURFACE = ("#FFFFFF", "#1E1E1E")   # Card/Bar Backgrounds
-COLOR_QUEUE_BG = ("#E5E5E5", "#181818")  # Queue Scroll Area
-COLOR_ACCENT = ("#007EA7", "#00ADB5")    # Teal/Blue
-COLOR_SUCCESS = ("#009955", "#008f4c")   # Green
-COLOR_WARNING = ("#D4AF37", "#D4AF37")   # Gold
-COLOR_DANGER = ("#DC3545", "#CF6679")    # Red
-COLOR_TEXT_MAIN = ("#101010", "#E0E0E0") # Text High Contrast
-COLOR_TEXT_DIM = ("#505050", "#A0A0A0")  # Text Low Contrast
-COLOR_BORDER = ("#CCCCCC", "#333333")    # Borders
-
-# Mappings
-PRESET_MAP = {"Fast (p1)": "p1", "Balanced (p4)": "p4", "Best (p7)": "p7"}
-AUDIO_MAP = {"Copy": "copy", "AAC": "aac", "Normalize": "normalize"}
-COLORS = {"White": "&HFFFFFF&", "Yellow": "&H00FFFF&", "Cyan": "&HFFFF00&", "Green": "&H00FF00&"}
-
-BaseClass = TkinterDnD.Tk if dnd_available else ctk.CTk
-
-# ==========================================
-#           CUSTOM WIDGET: QUEUE CARD
-# ==========================================
-class QueueItem(ctk.CTkFrame):
-    def __init__(self, master, filepath, remove_callback, move_callback):
-        # NOTE: bg_color=COLOR_QUEUE_BG fixes the corners of the cards inside the list
-        super().__init__(master, fg_color=COLOR_SURFACE, corner_radius=6, border_width=1, border_color=COLOR_BORDER, bg_color=COLOR_QUEUE_BG)
-        self.filepath = filepath
-        self.filename = os.path.basename(filepath)
-        
-        self.grid_columnconfigure(0, weight=1)
-        
-        # Filename
-        display_name = self.filename if len(self.filename) < 55 else self.filename[:52] + "..."
-        self.lbl_name = ctk.CTkLabel(self, text=display_name, text_color=COLOR_TEXT_MAIN, anchor="w", font=("Roboto", 12))
-        self.lbl_name.grid(row=0, column=0, padx=10, pady=8, sticky="ew")
-        
-        # Controls Frame
-        self.ctrl_frame = ctk.CTkFrame(self, fg_color="transparent")
-        self.ctrl_frame.grid(row=0, column=1, padx=5, pady=2)
-        
-        # Button Colors (Tuples)
-        btn_bg = ("#E0E0E0", "#333333")
-        btn_hover = ("#D0D0D0", "#444444")
-
-        self.btn_up = ctk.CTkButton(self.ctrl_frame, text="▲", width=25, height=25, fg_color=btn_bg, text_color=COLOR_TEXT_MAIN, hover_color=btn_hover, command=lambda: move_callback(self, -1))
-        self.btn_up.pack(side="left", padx=2)
-        
-        self.btn_down = ctk.CTkButton(self.ctrl_frame, text="▼", width=25, height=25, fg_color=btn_bg, text_color=COLOR_TEXT_MAIN, hover_color=btn_hover, command=lambda: move_callback(self, 1))
-        self.btn_down.pack(side="left", padx=2)
-        
-        self.btn_del = ctk.CTkButton(self.ctrl_frame, text="✕", width=25, height=25, fg_color=COLOR_DANGER, text_color="white", command=lambda: remove_callback(self))
-        self.btn_del.pack(side="left", padx=(10, 2))
-
-    def set_active(self, active=True):
-        if active:
-            self.configure(border_color=COLOR_ACCENT, border_width=2)
-            self.lbl_name.configure(text_color=COLOR_ACCENT)
-        else:
-            self.configure(border_color=COLOR_BORDER, border_width=1)
-            self.lbl_name.configure(text_color=COLOR_TEXT_MAIN)
-
-    def set_done(self):
-        self.configure(border_color=COLOR_SUCCESS)
-        self.lbl_name.configure(text_color=COLOR_SUCCESS)
-
-    def update_theme(self):
-        """Forces the card to redraw colors based on current mode"""
-        self.configure(fg_color=COLOR_SURFACE, border_color=COLOR_BORDER)
-        self.lbl_name.configure(text_color=COLOR_TEXT_MAIN)
-        
-        btn_bg = ("#E0E0E0", "#333333")
-        btn_hover = ("#D0D0D0", "#444444")
-        self.btn_up.configure(fg_color=btn_bg, text_color=COLOR_TEXT_MAIN, hover_color=btn_hover)
-        self.btn_down.configure(fg_color=btn_bg, text_color=COLOR_TEXT_MAIN, hover_color=btn_hover)
-
-# ==========================================
-#               MAIN APPLICATION
-# ==========================================
-class subtitle_burner(BaseClass):
-    def __init__(self):
-        super().__init__()
-        
-        # --- VERSION 1.0 ---
-        self.title("Nvidia Subtitle Burner [V1.0]")
-        self.geometry("1200x750")
-        
-        # Initial BG Set
-        if dnd_available:
-            self.config(bg=COLOR_BG[1]) # Start in Dark Mode Hex
-        else:
-            self.configure(fg_color=COLOR_BG)
-        
-        # --- ICON FIX ---
-        # Robustly find the icon whether running as .py or .exe
-        try:
-            if getattr(sys, 'frozen', False):  # Running as compiled .exe
-                icon_path = os.path.join(sys._MEIPASS, "myicon.ico")
-            else:  # Running as .py script
-                icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "myicon.ico")
-            
-            if os.path.exists(icon_path):
-                self.iconbitmap(icon_path)
-        except Exception:
-            pass  # Fail silently if icon has issues
-
-        if dnd_available:
-            self.drop_target_register(DND_FILES)
-            self.dnd_bind('<<Drop>>', self.drop_event)
-
-        # Logic State
-        self.queue_items = []
-        self.is_running = False
-        self.is_paused = False
-        self.stop_event = threading.Event()
-        self.current_process = None
-        self.ffmpeg_exe = None
-
-        # Grid Layout
-        self.grid_columnconfigure(0, weight=0) # Sidebar
-        self.grid_columnconfigure(1, weight=1) # Main
-        self.grid_rowconfigure(0, weight=1)
-        self.grid_rowconfigure(1, weight=0)    # Footer
-
-        self.setup_sidebar()
-        self.setup_dashboard()
-        self.setup_statusbar()
-        
-        self.check_ffmpeg()
-        
-        # GPU Thread
-        self.monitor_thread = threading.Thread(target=self.monitor_system, daemon=True)
-        self.monitor_thread.start()
-
-    # --- GUI SETUP ---
-    def setup_sidebar(self):
-        # NOTE: bg_color=COLOR_BG fixes Sidebar corners
-        self.sidebar = ctk.CTkFrame(self, width=260, fg_color=COLOR_SURFACE, corner_radius=0, bg_color=COLOR_BG)
-        self.sidebar.grid(row=0, column=0, rowspan=2, sticky="nsew")
-        self.sidebar.grid_propagate(False)
-
-        # Title - Updated to V1
-        ctk.CTkLabel(self.sidebar, text="AUTO SUBTITLE\nBURNER V1", font=("Montserrat", 20, "bold"), text_color=COLOR_ACCENT).pack(pady=(30, 20))
-        ctk.CTkFrame(self.sidebar, height=2, fg_color=COLOR_BORDER).pack(fill="x", padx=20, pady=10)
-
-        # VISUALS
-        ctk.CTkLabel(self.sidebar, text="VISUALS", text_color=COLOR_TEXT_DIM, font=("Arial", 11, "bold")).pack(anchor="w", padx=20, pady=(10,5))
-        
-        self.side_font = ctk.CTkOptionMenu(self.sidebar, values=["Arial", "Roboto", "Consolas"], fg_color=COLOR_BG, button_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN)
-        self.side_font.pack(fill="x", padx=20, pady=5)
-        
-        self.side_color = ctk.CTkOptionMenu(self.sidebar, values=list(COLORS.keys()), fg_color=COLOR_BG, button_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN)
-        self.side_color.pack(fill="x", padx=20, pady=5)
-        
-        # SIZE SLIDER
-        self.lbl_fontsize = ctk.CTkLabel(self.sidebar, text="Size: 24px", text_color=COLOR_TEXT_DIM)
-        self.lbl_fontsize.pack(anchor="w", padx=25, pady=(5,0))
-        
-        self.side_size = ctk.CTkSlider(self.sidebar, from_=12, to=64, number_of_steps=52, progress_color=COLOR_ACCENT, command=self.update_font_label)
-        self.side_size.set(24)
-        self.side_size.pack(fill="x", padx=20, pady=5)
-
-        # ENCODING
-        ctk.CTkLabel(self.sidebar, text="ENCODING", text_color=COLOR_TEXT_DIM, font=("Arial", 11, "bold")).pack(anchor="w", padx=20, pady=(20,5))
-        
-        self.side_preset = ctk.CTkOptionMenu(self.sidebar, values=list(PRESET_MAP.keys()), fg_color=COLOR_BG, button_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN)
-        self.side_preset.set("Balanced (p4)")
-        self.side_preset.pack(fill="x", padx=20, pady=5)
-        
-        self.side_audio = ctk.CTkOptionMenu(self.sidebar, values=list(AUDIO_MAP.keys()), fg_color=COLOR_BG, button_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN)
-        self.side_audio.pack(fill="x", padx=20, pady=5)
-
-        # ACTION
-        ctk.CTkLabel(self.sidebar, text="FINISH ACTION", text_color=COLOR_TEXT_DIM, font=("Arial", 11, "bold")).pack(anchor="w", padx=20, pady=(20,5))
-        self.side_finish = ctk.CTkOptionMenu(self.sidebar, values=["Do Nothing", "Play Sound", "Close App", "Shutdown PC"], fg_color=COLOR_BG, button_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN)
-        self.side_finish.pack(fill="x", padx=20, pady=5)
-
-        # THEME SWITCH
-        self.switch_theme = ctk.CTkSwitch(self.sidebar, text="Light Mode", command=self.toggle_theme, progress_color=COLOR_ACCENT, text_color=COLOR_TEXT_MAIN)
-        self.switch_theme.pack(side="bottom", padx=20, pady=20)
-
-    def setup_dashboard(self):
-        # FIX: Replaced "transparent" with COLOR_BG to fix the 'line' artifact
-        self.main_area = ctk.CTkFrame(self, fg_color=COLOR_BG)
-        self.main_area.grid(row=0, column=1, sticky="nsew", padx=20, pady=20)
-        self.main_area.grid_columnconfigure(0, weight=1)
-        self.main_area.grid_rowconfigure(1, weight=1)
-
-        # Top Bar (NOTE: bg_color=COLOR_BG fixes black corners)
-        self.top_bar = ctk.CTkFrame(self.main_area, fg_color=COLOR_SURFACE, height=60, corner_radius=8, bg_color=COLOR_BG)
-        self.top_bar.grid(row=0, column=0, sticky="ew", pady=(0, 20))
-        
-        # Import Buttons
-        self.btn_browse = ctk.CTkButton(self.top_bar, text="Import Files", fg_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN, hover_color=COLOR_ACCENT, width=100, command=self.browse_files)
-        self.btn_browse.pack(side="right", padx=(5, 15), pady=10)
-
-        self.btn_folder = ctk.CTkButton(self.top_bar, text="Import Folder", fg_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN, hover_color=COLOR_ACCENT, width=100, command=self.browse_folder)
-        self.btn_folder.pack(side="right", padx=(0, 5), pady=10)
-        
-        self.path_entry = ctk.CTkEntry(self.top_bar, placeholder_text="Drag & Drop Files or Folders here...", fg_color=COLOR_BG, border_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN)
-        self.path_entry.pack(side="left", fill="x", expand=True, padx=15, pady=10)
-
-        # Queue (NOTE: bg_color=COLOR_BG fixes list area corners)
-        self.queue_container = ctk.CTkScrollableFrame(self.main_area, label_text="BATCH QUEUE", label_font=("Arial", 12, "bold"), label_text_color=COLOR_TEXT_MAIN, fg_color=COLOR_QUEUE_BG, bg_color=COLOR_BG)
-        self.queue_container.grid(row=1, column=0, sticky="nsew")
-
-        # Action Bar (NOTE: fg_color=COLOR_BG fixes black box behind buttons)
-        self.action_bar = ctk.CTkFrame(self.main_area, fg_color=COLOR_BG, corner_radius=0)
-        self.action_bar.grid(row=2, column=0, sticky="ew", pady=(20, 0))
-        
-        self.btn_start = ctk.CTkButton(self.action_bar, text="START BATCH", width=150, height=45, font=("Arial", 13, "bold"), fg_color=COLOR_SUCCESS, hover_color="#006b3a", text_color="white", bg_color=COLOR_BG, command=self.start_thread)
-        self.btn_start.pack(side="right", padx=5)
-        
-        self.btn_preview = ctk.CTkButton(self.action_bar, text="PREVIEW", width=120, height=45, fg_color=COLOR_ACCENT, hover_color="#008c93", text_color="white", bg_color=COLOR_BG, command=self.preview_video)
-        self.btn_preview.pack(side="right", padx=5)
-        
-        self.btn_pause = ctk.CTkButton(self.action_bar, text="PAUSE", width=100, height=45, fg_color=COLOR_WARNING, state="disabled", text_color="white", bg_color=COLOR_BG, command=self.toggle_pause)
-        self.btn_pause.pack(side="right", padx=5)
-
-        self.btn_cancel = ctk.CTkButton(self.action_bar, text="CANCEL", width=100, height=45, fg_color=COLOR_DANGER, state="disabled", text_color="white", bg_color=COLOR_BG, command=self.cancel_process)
-        self.btn_cancel.pack(side="right", padx=5)
-        
-        self.btn_clear = ctk.CTkButton(self.action_bar, text="CLEAR ALL", width=100, height=45, fg_color="transparent", border_width=1, border_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN, hover_color=("#e6e6e6", "#2f2f2f"), command=self.clear_queue)
-        self.btn_clear.pack(side="left", padx=0)
-
-    def setup_statusbar(self):
-        bar_bg = ("#D0D0D0", "#0f0f0f")
-        self.status_bar = ctk.CTkFrame(self, height=35, fg_color=bar_bg, corner_radius=0, bg_color=COLOR_BG)
-        self.status_bar.grid(row=1, column=1, sticky="ew")
-        
-        self.status_text = ctk.CTkLabel(self.status_bar, text="Ready", font=("Consolas", 11), text_color=COLOR_TEXT_DIM)
-        self.status_text.pack(side="left", padx=20)
-        
-        self.gpu_stat = ctk.CTkLabel(self.status_bar, text="GPU: --%", font=("Consolas", 11, "bold"), text_color=COLOR_ACCENT)
-        self.gpu_stat.pack(side="right", padx=20)
-        
-        self.progress_bar = ctk.CTkProgressBar(self.status_bar, width=300, height=8, progress_color=COLOR_ACCENT)
-        self.progress_bar.set(0)
-        self.progress_bar.pack(side="right", padx=20)
-
-    # --- THEME LOGIC ---
-    def toggle_theme(self):
-        # Determine strict Mode Color (0=Light, 1=Dark)
-        is_light = self.switch_theme.get() == 1
-        mode_idx = 0 if is_light else 1
-        current_hex = COLOR_BG[mode_idx]
-
-        if is_light:
-            ctk.set_appearance_mode("Light")
-        else:
-            ctk.set_appearance_mode("Dark")
-            
-        # 1. Update Root Window Background (Fix for DND Tkinter window)
-        if dnd_available:
-            self.config(bg=current_hex)
-
-        # 2. Update Main Container to hide "transparency artifacts"
-        self.main_area.configure(fg_color=current_hex)
-
-        # 3. Explicitly update background colors of containers
-        self.top_bar.configure(bg_color=current_hex)
-        self.queue_container.configure(bg_color=current_hex)
-        self.status_bar.configure(bg_color=current_hex)
-        self.action_bar.configure(fg_color=current_hex) # action_bar is fg, not bg because it isn't rounded
-
-        # 4. Update Buttons to match background
-        self.btn_start.configure(bg_color=current_hex)
-        self.btn_preview.configure(bg_color=current_hex)
-        self.btn_pause.configure(bg_color=current_hex)
-        self.btn_cancel.configure(bg_color=current_hex)
-        self.btn_clear.configure(fg_color=current_hex)
-
-        # 5. Refresh Cards
-        for item in self.queue_items:
-            item.update_theme()
-
-    def update_font_label(self, value):
-        self.lbl_fontsize.configure(text=f"Size: {int(value)}px")
-
-    # --- LOGIC: SYSTEM & QUEUE ---
-    def check_ffmpeg(self):
-        self.ffmpeg_exe = shutil.which("ffmpeg")
-        if not self.ffmpeg_exe and os.path.exists("ffmpeg.exe"):
-            self.ffmpeg_exe = os.path.abspath("ffmpeg.exe")
-        
-        if not self.ffmpeg_exe:
-            self.status_text.configure(text="ERROR: FFmpeg not found", text_color=COLOR_DANGER)
-            self.btn_start.configure(state="disabled")
-
-    def drop_event(self, event):
-        if self.is_running: return
-        data = event.data
-        if data.startswith('{') and data.endswith('}'):
-            items = re.split(r'\} \{', data[1:-1])
-        else:
-            items = data.split()
-        
-        for item in items:
-            if os.path.isdir(item):
-                self.add_folder_to_queue(item)
-            else:
-                self.add_file_to_queue(item)
-
-    def browse_files(self):
-        files = filedialog.askopenfilenames(filetypes=[("Video", "*.mp4 *.mkv *.avi")])
-        if files:
-            for f in files: self.add_file_to_queue(f)
-
-    def browse_folder(self):
-        folder = filedialog.askdirectory()
-        if folder:
-            self.add_folder_to_queue(folder)
-
-    def add_folder_to_queue(self, folder):
-        files = glob.glob(os.path.join(folder, "*"))
-        valid_exts = ('.mp4', '.mkv', '.avi')
-        count = 0
-        for f in files:
-            if f.lower().endswith(valid_exts):
-                self.add_file_to_queue(f)
-                count += 1
-        self.status_text.configure(text=f"Imported {count} files from folder.")
-
-    def add_file_to_queue(self, filepath):
-        if filepath not in [item.filepath for item in self.queue_items]:
-            item = QueueItem(self.queue_container, filepath, self.remove_item, self.move_item)
-            item.pack(fill="x", pady=2, padx=5)
-            self.queue_items.append(item)
-
-    def remove_item(self, item_widget):
-        if self.is_running: return
-        item_widget.destroy()
-        if item_widget in self.queue_items: self.queue_items.remove(item_widget)
-
-    def move_item(self, item_widget, direction):
-        if self.is_running: return
-        if item_widget not in self.queue_items: return
-        curr_idx = self.queue_items.index(item_widget)
-        new_idx = curr_idx + direction
-        if 0 <= new_idx < len(self.queue_items):
-            self.queue_items[curr_idx], self.queue_items[new_idx] = self.queue_items[new_idx], self.queue_items[curr_idx]
-            for item in self.queue_items: item.pack_forget()
-            for item in self.queue_items: item.pack(fill="x", pady=2, padx=5)
-
-    def clear_queue(self):
-        if self.is_running: return
-        for item in self.queue_items: item.destroy()
-        self.queue_items.clear()
-
-    # --- LOGIC: GPU MONITOR ---
-    def monitor_system(self):
-        while True:
-            try:
-                result = subprocess.run(
-                    ['nvidia-smi', '--query-gpu=utilization.gpu', '--format=csv,noheader,nounits'],
-                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, creationflags=0x08000000
-                )
-                if result.returncode == 0:
-                    usage = result.stdout.strip()
-                    self.gpu_stat.configure(text=f"GPU: {usage}%")
-                else:
-                    self.gpu_stat.configure(text="GPU: N/A")
-            except:
-                self.gpu_stat.configure(text="GPU: N/A")
-            time.sleep(2)
-
-    # --- LOGIC: PROCESSING ---
-    def get_settings(self):
-        return {
-            "font": self.side_font.get(),
-            "size": int(self.side_size.get()),
-            "color": COLORS[self.side_color.get()],
-            "preset": PRESET_MAP[self.side_preset.get()],
-            "audio": AUDIO_MAP[self.side_audio.get()],
-            "finish": self.side_finish.get()
-        }
-
-    def set_ui_locked(self, locked):
-        state = "disabled" if locked else "normal"
-        # Sidebar
-        self.side_font.configure(state=state)
-        self.side_size.configure(state=state)
-        self.side_color.configure(state=state)
-        self.side_preset.configure(state=state)
-        self.side_audio.configure(state=state)
-        # Main
-        self.btn_browse.configure(state=state)
-        self.btn_folder.configure(state=state)
-        self.path_entry.configure(state=state)
-        self.btn_clear.configure(state=state)
-        self.btn_start.configure(state=state)
-        self.btn_preview.configure(state=state)
-        # Controls
-        self.btn_pause.configure(state="normal" if locked else "disabled")
-        self.btn_cancel.configure(state="normal" if locked else "disabled")
-        # Items
-        for item in self.queue_items:
-            item.btn_del.configure(state=state)
-            item.btn_up.configure(state=state)
-            item.btn_down.configure(state=state)
-
-    def start_thread(self):
-        if not self.queue_items: return
-        self.is_running = True
-        self.stop_event.clear()
-        self.set_ui_locked(True)
-        threading.Thread(target=self.process_queue, daemon=True).start()
-
-    def process_queue(self):
-        settings = self.get_settings()
-        output_dir = os.path.join(os.path.dirname(self.queue_items[0].filepath), "Output")
-        if not os.path.exists(output_dir): os.makedirs(output_dir)
-
-        style = f"FontName={settings['font']},Fontsize={settings['size']},PrimaryColour={settings['color']},Bold=1,Outline=2,Shadow=1,MarginV=25"
-        files_completed = True
-
-        for item in self.queue_items:
-            if self.stop_event.is_set(): 
-                files_completed = False
-                break
-
-            item.set_active(True)
-            self.status_text.configure(text=f"Processing: {item.filename}")
-            
-            fpath = item.filepath
-            out_path = os.path.join(output_dir, item.filename)
-            duration = self.get_duration(fpath)
-
-            srt_path = os.path.splitext(fpath)[0] + ".srt"
-            if os.path.exists(srt_path):
-                safe_srt = srt_path.replace("\\", "/").replace(":", "\\:")
-                vf = f"subtitles='{safe_srt}':force_style='{style}'"
-            else:
-                safe_inp = fpath.replace("\\", "/").replace(":", "\\:")
-                vf = f"subtitles='{safe_inp}':force_style='{style}'"
-
-            acmd = ['-c:a', 'copy']
-            if settings['audio'] == 'aac': acmd = ['-c:a', 'aac', '-b:a', '192k']
-            elif settings['audio'] == 'normalize': acmd = ['-af', 'loudnorm=I=-16:TP=-1.5:LRA=11', '-c:a', 'aac']
-
-            cmd = [
-                self.ffmpeg_exe, '-y', '-hide_banner', '-hwaccel', 'cuda',
-                '-i', fpath, '-vf', f"{vf},format=yuv420p",
-                '-c:v', 'hevc_nvenc', '-preset', settings['preset'], '-cq', '22'
-            ] + acmd + [out_path]
-
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            self.progress_bar.set(0)
-            
-            self.current_process = subprocess.Popen(
-                cmd, stderr=subprocess.PIPE, universal_newlines=True, encoding='utf-8', errors='replace',
-                startupinfo=startupinfo, creationflags=0x08000000
-            )
-
-            pattern = re.compile(r"time=(\d{2}:\d{2}:\d{2}\.\d{2})")
-            while True:
-                if self.is_paused: time.sleep(0.5); continue
-                line = self.current_process.stderr.readline()
-                if not line and self.current_process.poll() is not None: break
-                if line:
-                    match = pattern.search(line)
-                    if match:
-                        t_str = match.group(1)
-                        h,m,s = map(float, t_str.split(':'))
-                        curr = h*3600 + m*60 + s
-                        if duration > 0: self.progress_bar.set(curr/duration)
-
-            if self.stop_event.is_set():
-                files_completed = False
-                break
-                
-            item.set_active(False)
-            item.set_done()
-
-        if files_completed:
-            self.finish_sequence(settings['finish'])
-        else:
-            self.status_text.configure(text="Batch Cancelled.")
-            self.progress_bar.set(0)
-            self.set_ui_locked(False)
-            self.is_running = False
-
-    def finish_sequence(self, action):
-        self.status_text.configure(text="All Tasks Completed.")
-        self.progress_bar.set(1)
-        self.set_ui_locked(False)
-        self.is_running = False
-        
-        if action == "Play Sound":
-            winsound.MessageBeep(winsound.MB_OK)
-            messagebox.showinfo("Done", "Complete!")
-        elif action == "Close App":
-            self.destroy()
-        elif action == "Shutdown PC":
-            os.system("shutdown /s /t 60")
-        else:
-            messagebox.showinfo("Done", "Complete!")
-
-    def preview_video(self):
-        if not self.queue_items: return
-        target = self.queue_items[0].filepath
-        settings = self.get_settings()
-        
-        self.status_text.configure(text="Generating Preview...")
-        threading.Thread(target=self.run_preview, args=(target, settings), daemon=True).start()
-
-    def run_preview(self, input_path, settings):
-        output_path = os.path.join(os.path.dirname(input_path), "preview.mp4")
-        style = f"FontName={settings['font']},Fontsize={settings['size']},PrimaryColour={settings['color']},Bold=1,Outline=2,Shadow=1,MarginV=25"
-        
-        srt_path = os.path.splitext(input_path)[0] + ".srt"
-        if os.path.exists(srt_path):
-            safe_srt = srt_path.replace("\\", "/").replace(":", "\\:")
-            vf = f"subtitles='{safe_srt}':force_style='{style}'"
-        else:
-            safe_inp = input_path.replace("\\", "/").replace(":", "\\:")
-            vf = f"subtitles='{safe_inp}':force_style='{style}'"
-
-        cmd = [
-            self.ffmpeg_exe, '-y', '-hide_banner', '-t', '30',
-            '-i', input_path, '-vf', vf,
-            '-c:v', 'hevc_nvenc', '-preset', 'p1', output_path
-        ]
-        
-        startupinfo = subprocess.STARTUPINFO()
-        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, startupinfo=startupinfo, creationflags=0x08000000)
-        
-        if os.path.exists(output_path):
-            os.startfile(output_path)
-            self.status_text.configure(text="Preview Launched.")
-        else:
-            self.status_text.configure(text="Preview Failed.")
-
-    def get_duration(self, fpath):
-        try:
-            cmd = [self.ffmpeg_exe, '-i', fpath]
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            r = subprocess.run(cmd, stderr=subprocess.PIPE, encoding='utf-8', startupinfo=startupinfo, creationflags=0x08000000)
-            m = re.search(r"Duration: (\d{2}):(\d{2}):(\d{2}\.\d{2})", r.stderr)
-            if m:
-                h,m,s = map(float, m.groups())
-                return h*3600 + m*60 + s
-        except: pass
-        return 100
-
-    def toggle_pause(self):
-        if not self.current_process: return
-        try:
-            p = psutil.Process(self.current_process.pid)
-            if self.is_paused:
-                p.resume()
-                self.is_paused = False
-                self.btn_pause.configure(text="PAUSE", fg_color=COLOR_WARNING)
-            else:
-                p.suspend()
-                self.is_paused = True
-                self.btn_pause.configure(text="RESUME", fg_color="#3B8ED0")
-        except: pass
-
-    def cancel_process(self):
-        if self.current_process:
-            self.stop_event.set()
-            self.current_process.terminate()
-
-if __name__ == "__main__":
-    app = subtitle_burner()
-
-    app.mainloop()
+import customtkinter as ctk
+import os
+import threading
+import re
+import subprocess
+import sys  # Added at top level for safety
+import tkinter as tk
+from tkinter import filedialog, messagebox
+from burn_engine import PRESET_MAP, AUDIO_MAP, COLORS, OUTPUT_PROFILES, BurnEngine, BurnJob, find_ffmpeg, render_preview
+from ffmpeg_utils import open_path, shutdown_command
+from encoders import detect_backends, choose_backends
+from job_metrics import export_report
+from telemetry import TelemetrySampler
+from throughput import ThroughputModel, makespan
+from media_probe import MediaProber
+from batch_queue import QueueModel
+from media_import import FolderScanner
+from preview import SnapshotRenderer, PREVIEW_DIR
+
+# --- DRAG & DROP CHECK ---
+try:
+    from tkinterdnd2 import DND_FILES, TkinterDnD
+    dnd_available = True
+except ImportError:
+    dnd_available = False
+
+# ==========================================
+#         DYNAMIC THEME PALETTE
+# ==========================================
+ctk.set_appearance_mode("Dark")
+ctk.set_default_color_theme("dark-blue")
+
+# Theme Colors (Light, Dark)
+COLOR_BG = ("#F3F3F3", "#121212")        # Main Window Background
+COLOR_SURFACE = ("#FFFFFF", "#1E1E1E")   # Card/Bar Backgrounds
+COLOR_QUEUE_BG = ("#E5E5E5", "#181818")  # Queue Scroll Area
+COLOR_ACCENT = ("#007EA7", "#00ADB5")    # Teal/Blue
+COLOR_SUCCESS = ("#009955", "#008f4c")   # Green
+COLOR_WARNING = ("#D4AF37", "#D4AF37")   # Gold
+COLOR_DANGER = ("#DC3545", "#CF6679")    # Red
+COLOR_TEXT_MAIN = ("#101010", "#E0E0E0") # Text High Contrast
+COLOR_TEXT_DIM = ("#505050", "#A0A0A0")  # Text Low Contrast
+COLOR_BORDER = ("#CCCCCC", "#333333")    # Borders
+
+BaseClass = TkinterDnD.Tk if dnd_available else ctk.CTk
+
+
+def format_duration(seconds):
+    seconds = int(seconds or 0)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+# ==========================================
+#         THREAD-SAFE UI UPDATE BUS
+# ==========================================
+class UiBus:
+    """Tk is not thread-safe, so worker threads never touch widgets directly.
+
+    They post(key, fn, *args) instead; the Tk loop drains the queue every
+    `interval_ms` on the main thread. Posts sharing a key replace each other
+    (only the latest status text / progress value matters), so the drain cost
+    stays flat however fast workers post. call() is for one-off events that
+    must never be merged.
+    """
+
+    def __init__(self, root, interval_ms=100):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.lock = threading.Lock()
+        self.pending = {}  # key -> (fn, args, kwargs), insertion ordered
+        self.seq = 0
+        self.root.after(self.interval_ms, self._drain)
+
+    def post(self, key, fn, *args, **kwargs):
+        with self.lock:
+            self.pending.pop(key, None)
+            self.pending[key] = (fn, args, kwargs)
+
+    def call(self, fn, *args, **kwargs):
+        with self.lock:
+            self.seq += 1
+            self.pending[("call", self.seq)] = (fn, args, kwargs)
+
+    def _drain(self):
+        with self.lock:
+            batch, self.pending = self.pending, {}
+        for fn, args, kwargs in batch.values():
+            try:
+                fn(*args, **kwargs)
+            except tk.TclError:
+                pass  # a widget destroyed mid-flight must not kill the loop
+            except Exception:
+                # A real bug: report it the way Tk reports callback errors, keep draining
+                self.root.report_callback_exception(*sys.exc_info())
+        try:
+            self.root.after(self.interval_ms, self._drain)
+        except tk.TclError:
+            pass  # window closed
+
+# ==========================================
+#           CUSTOM WIDGET: QUEUE CARD
+# ==========================================
+class QueueItem(ctk.CTkFrame):
+    """One on-screen row. Rows are recycled by QueueView: bind() points an
+    existing card at a different QueueEntry instead of building a new one."""
+
+    def __init__(self, master, remove_callback, move_callback, preview_callback):
+        # NOTE: bg_color=COLOR_QUEUE_BG fixes the corners of the cards inside the list
+        super().__init__(master, fg_color=COLOR_SURFACE, corner_radius=6, border_width=1, border_color=COLOR_BORDER, bg_color=COLOR_QUEUE_BG)
+        self.entry = None
+        self.bound = None  # (filepath, state, estimate) last drawn, to skip no-op redraws
+        
+        self.grid_columnconfigure(0, weight=1)
+        
+        # Filename
+        self.lbl_name = ctk.CTkLabel(self, text="", text_color=COLOR_TEXT_MAIN, anchor="w", font=("Roboto", 12))
+        self.lbl_name.grid(row=0, column=0, padx=10, pady=8, sticky="ew")
+
+        # Predicted encode time
+        self.lbl_eta = ctk.CTkLabel(self, text="", text_color=COLOR_TEXT_DIM, font=("Consolas", 11))
+        self.lbl_eta.grid(row=0, column=1, padx=5)
+        
+        # Controls Frame
+        self.ctrl_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.ctrl_frame.grid(row=0, column=2, padx=5, pady=2)
+        
+        # Button Colors (Tuples)
+        btn_bg = ("#E0E0E0", "#333333")
+        btn_hover = ("#D0D0D0", "#444444")
+
+        self.btn_view = ctk.CTkButton(self.ctrl_frame, text="👁", width=25, height=25, fg_color=btn_bg, text_color=COLOR_TEXT_MAIN, hover_color=btn_hover, command=lambda: preview_callback(self.entry.filepath))
+        self.btn_view.pack(side="left", padx=(2, 8))
+
+        self.btn_up = ctk.CTkButton(self.ctrl_frame, text="▲", width=25, height=25, fg_color=btn_bg, text_color=COLOR_TEXT_MAIN, hover_color=btn_hover, command=lambda: move_callback(self.entry.filepath, -1))
+        self.btn_up.pack(side="left", padx=2)
+        
+        self.btn_down = ctk.CTkButton(self.ctrl_frame, text="▼", width=25, height=25, fg_color=btn_bg, text_color=COLOR_TEXT_MAIN, hover_color=btn_hover, command=lambda: move_callback(self.entry.filepath, 1))
+        self.btn_down.pack(side="left", padx=2)
+        
+        self.btn_del = ctk.CTkButton(self.ctrl_frame, text="✕", width=25, height=25, fg_color=COLOR_DANGER, text_color="white", command=lambda: remove_callback(self.entry.filepath))
+        self.btn_del.pack(side="left", padx=(10, 2))
+
+    def bind_entry(self, entry, force=False):
+        key = (entry.filepath, entry.state, entry.estimate)
+        if key == self.bound and not force: return
+        self.lbl_eta.configure(text=f"~{format_duration(entry.estimate)}" if entry.estimate else "")
+        if self.entry is None or entry.filepath != self.entry.filepath or force:
+            name = entry.filename
+            self.lbl_name.configure(text=name if len(name) < 55 else name[:52] + "...")
+        self.entry = entry
+        self.bound = key
+
+        self.set_active(entry.state == BurnJob.RUNNING)
+        if entry.state == BurnJob.DONE:
+            self.set_done()
+        elif entry.state == BurnJob.FAILED:
+            self.set_failed()
+
+    def set_active(self, active=True):
+        if active:
+            self.configure(border_color=COLOR_ACCENT, border_width=2)
+            self.lbl_name.configure(text_color=COLOR_ACCENT)
+        else:
+            self.configure(border_color=COLOR_BORDER, border_width=1)
+            self.lbl_name.configure(text_color=COLOR_TEXT_MAIN)
+
+    def set_done(self):
+        self.configure(border_color=COLOR_SUCCESS)
+        self.lbl_name.configure(text_color=COLOR_SUCCESS)
+
+    def set_failed(self):
+        self.configure(border_color=COLOR_DANGER)
+        self.lbl_name.configure(text_color=COLOR_DANGER)
+
+    def set_locked(self, locked):
+        state = "disabled" if locked else "normal"
+        self.btn_del.configure(state=state)
+        self.btn_up.configure(state=state)
+        self.btn_down.configure(state=state)
+
+    def update_theme(self):
+        """Forces the card to redraw colors based on current mode"""
+        self.configure(fg_color=COLOR_SURFACE, border_color=COLOR_BORDER)
+        self.lbl_name.configure(text_color=COLOR_TEXT_MAIN)
+        
+        btn_bg = ("#E0E0E0", "#333333")
+        btn_hover = ("#D0D0D0", "#444444")
+        self.btn_view.configure(fg_color=btn_bg, text_color=COLOR_TEXT_MAIN, hover_color=btn_hover)
+        self.btn_up.configure(fg_color=btn_bg, text_color=COLOR_TEXT_MAIN, hover_color=btn_hover)
+        self.btn_down.configure(fg_color=btn_bg, text_color=COLOR_TEXT_MAIN, hover_color=btn_hover)
+        if self.entry is not None:
+            self.bind_entry(self.entry, force=True)
+
+# ==========================================
+#        CUSTOM WIDGET: VIRTUAL QUEUE
+# ==========================================
+class QueueView(ctk.CTkFrame):
+    """Scrolling list over a QueueModel that only owns enough QueueItem rows
+    to fill the visible area. Scrolling re-binds those rows to other entries,
+    so 10k queued files cost the same widgets, theme and lock work as 10."""
+
+    ROW_HEIGHT = 44
+
+    def __init__(self, master, model, remove_callback, move_callback, preview_callback):
+        super().__init__(master, fg_color=COLOR_QUEUE_BG, bg_color=COLOR_BG, corner_radius=6)
+        self.model = model
+        self.remove_callback = remove_callback
+        self.move_callback = move_callback
+        self.preview_callback = preview_callback
+        self.rows = []
+        self.top = 0
+        self.locked = False
+        self.refresh_pending = False
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        self.header = ctk.CTkLabel(self, text="BATCH QUEUE", font=("Arial", 12, "bold"), text_color=COLOR_TEXT_MAIN)
+        self.header.grid(row=0, column=0, columnspan=2, pady=(6, 2))
+
+        self.body = ctk.CTkFrame(self, fg_color=COLOR_QUEUE_BG, corner_radius=0)
+        self.body.grid(row=1, column=0, sticky="nsew", padx=(5, 0), pady=(0, 5))
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.on_scrollbar)
+        self.scrollbar.grid(row=1, column=1, sticky="ns", padx=(0, 3), pady=(0, 5))
+
+        self.body.bind("<Configure>", lambda e: self.schedule_refresh())
+        self.bind_wheel(self.body)
+        model.subscribe(self.schedule_refresh)
+
+    # --- SCROLLING ---
+    def bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", lambda e: self.scroll_by(-1 if e.delta > 0 else 1))
+        widget.bind("<Button-4>", lambda e: self.scroll_by(-1))  # Linux
+        widget.bind("<Button-5>", lambda e: self.scroll_by(1))
+
+    def visible_count(self):
+        return max(1, self.body.winfo_height() // self.ROW_HEIGHT)
+
+    def scroll_by(self, rows):
+        self.top += rows
+        self.refresh()
+
+    def on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.model))
+        elif args[0] == "scroll":
+            step = self.visible_count() if args[2] == "pages" else 1
+            self.top += int(args[1]) * step
+        self.refresh()
+
+    # --- DRAWING ---
+    def schedule_refresh(self):
+        # Many model changes in one Tk tick (a folder import) -> one redraw
+        if self.refresh_pending: return
+        self.refresh_pending = True
+        self.after_idle(self.refresh)
+
+    def refresh(self):
+        self.refresh_pending = False
+        needed = self.visible_count() + 1  # +1 for the partly visible last row
+        while len(self.rows) < needed:
+            row = QueueItem(self.body, self.remove_callback, self.move_callback, self.preview_callback)
+            row.set_locked(self.locked)
+            self.bind_wheel(row)
+            self.bind_wheel(row.lbl_name)
+            self.rows.append(row)
+        while len(self.rows) > needed:
+            self.rows.pop().destroy()
+
+        total = len(self.model)
+        self.top = max(0, min(self.top, total - self.visible_count()))
+        for i, row in enumerate(self.rows):
+            idx = self.top + i
+            if idx < total:
+                row.bind_entry(self.model[idx])
+                row.place(x=0, y=i * self.ROW_HEIGHT, relwidth=1, height=self.ROW_HEIGHT - 4)
+            else:
+                row.place_forget()
+
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + self.visible_count()) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def set_locked(self, locked):
+        self.locked = locked
+        for row in self.rows:
+            row.set_locked(locked)
+
+    def update_theme(self, current_hex):
+        self.configure(bg_color=current_hex)
+        self.header.configure(text_color=COLOR_TEXT_MAIN)
+        for row in self.rows:
+            row.update_theme()
+
+# ==========================================
+#        CUSTOM WIDGET: PREVIEW WINDOW
+# ==========================================
+class PreviewWindow(ctk.CTkToplevel):
+    """In-app style preview: a still of one queued file at a subtitle cue,
+    re-rendered (from cache when possible) whenever the style changes."""
+
+    def __init__(self, master, request_callback, clip_callback):
+        super().__init__(master, fg_color=COLOR_SURFACE)
+        self.title("Preview")
+        self.geometry("1000x640")
+        self.request_callback = request_callback
+        self.filepath = None
+        self.index = 0
+        self.t = 0.0
+        self.photo = None  # Tk drops images nothing references
+
+        self.lbl_title = ctk.CTkLabel(self, text="", text_color=COLOR_TEXT_MAIN, font=("Roboto", 12))
+        self.lbl_title.pack(fill="x", padx=15, pady=(10, 5))
+
+        self.image = tk.Label(self, bg="#000000", fg="#A0A0A0", text="Rendering...")
+        self.image.pack(fill="both", expand=True, padx=15)
+
+        bar = ctk.CTkFrame(self, fg_color="transparent")
+        bar.pack(fill="x", padx=15, pady=10)
+        ctk.CTkButton(bar, text="◀", width=40, fg_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN, command=lambda: self.step(-1)).pack(side="left")
+        self.lbl_pos = ctk.CTkLabel(bar, text="", width=140, font=("Consolas", 11), text_color=COLOR_TEXT_DIM)
+        self.lbl_pos.pack(side="left", padx=10)
+        ctk.CTkButton(bar, text="▶", width=40, fg_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN, command=lambda: self.step(1)).pack(side="left")
+        ctk.CTkButton(bar, text="PLAY CLIP", width=110, fg_color=COLOR_ACCENT, text_color="white",
+                      command=lambda: self.filepath and clip_callback(self.filepath, self.t)).pack(side="right")
+
+    def show(self, filepath):
+        self.filepath = filepath
+        self.index = 0
+        self.lbl_title.configure(text=os.path.basename(filepath))
+        self.refresh()
+
+    def step(self, direction):
+        self.index += direction
+        self.refresh()
+
+    def refresh(self):
+        if not self.filepath: return
+        self.lbl_pos.configure(text="Rendering...")
+        self.request_callback(self.filepath, self.index)
+
+    def set_image(self, path, t, index, count):
+        self.index, self.t = index, t
+        self.lbl_pos.configure(text=f"{index + 1}/{count}  {format_duration(t)}")
+        if path:
+            self.photo = tk.PhotoImage(file=path)
+            self.image.configure(image=self.photo, text="")
+        else:
+            self.photo = None
+            self.image.configure(image="", text="Preview failed.")
+
+# ==========================================
+#               MAIN APPLICATION
+# ==========================================
+class subtitle_burner(BaseClass):
+    def __init__(self):
+        super().__init__()
+        
+        # --- VERSION 1.0 ---
+        self.title("Nvidia Subtitle Burner [V1.0]")
+        self.geometry("1200x750")
+        
+        # Initial BG Set
+        if dnd_available:
+            self.config(bg=COLOR_BG[1]) # Start in Dark Mode Hex
+        else:
+            self.configure(fg_color=COLOR_BG)
+        
+        # --- ICON FIX ---
+        # Robustly find the icon whether running as .py or .exe
+        try:
+            if getattr(sys, 'frozen', False):  # Running as compiled .exe
+                icon_path = os.path.join(sys._MEIPASS, "myicon.ico")
+            else:  # Running as .py script
+                icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "myicon.ico")
+            
+            if os.path.exists(icon_path):
+                self.iconbitmap(icon_path)
+        except Exception:
+            pass  # Fail silently if icon has issues
+
+        if dnd_available:
+            self.drop_target_register(DND_FILES)
+            self.dnd_bind('<<Drop>>', self.drop_event)
+
+        # Worker threads report through here, never straight to widgets
+        self.bus = UiBus(self)
+
+        # Logic State
+        self.queue = QueueModel()
+        self.is_running = False
+        self.engine = None
+        self.scanner = None
+        self.ffmpeg_exe = None
+        self.preview_window = None
+
+        # Grid Layout
+        self.grid_columnconfigure(0, weight=0) # Sidebar
+        self.grid_columnconfigure(1, weight=1) # Main
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=0)    # Footer
+
+        self.setup_sidebar()
+        self.setup_dashboard()
+        self.setup_statusbar()
+        
+        self.check_ffmpeg()
+
+        # Background probing: files are probed (or read from cache) as soon as they are queued
+        self.prober = MediaProber(self.ffmpeg_exe)
+        # Learned encode speeds: per-file and batch estimates before anything runs
+        self.model = ThroughputModel()
+        # Preview stills: one decoded frame per cue time, re-styled on every sidebar change
+        self.previewer = SnapshotRenderer(self.ffmpeg_exe, self.prober)
+
+        # Encoder detection does trial encodes the first time; keep it off the UI thread
+        self.backends = None
+        threading.Thread(target=self.detect_encoders, daemon=True).start()
+        
+        # One long-lived sampler (GPU via nvidia-smi dmon, CPU/disk via psutil); the label just reads it
+        self.telemetry = TelemetrySampler(pids_fn=lambda: self.engine.ffmpeg_pids() if self.engine else []).start()
+        self.after(2000, self.monitor_system)
+        self.protocol("WM_DELETE_WINDOW", self.destroy)
+
+    # --- GUI SETUP ---
+    def setup_sidebar(self):
+        # NOTE: bg_color=COLOR_BG fixes Sidebar corners
+        self.sidebar = ctk.CTkFrame(self, width=260, fg_color=COLOR_SURFACE, corner_radius=0, bg_color=COLOR_BG)
+        self.sidebar.grid(row=0, column=0, rowspan=2, sticky="nsew")
+        self.sidebar.grid_propagate(False)
+
+        # Title - Updated to V1
+        ctk.CTkLabel(self.sidebar, text="AUTO SUBTITLE\nBURNER V1", font=("Montserrat", 20, "bold"), text_color=COLOR_ACCENT).pack(pady=(30, 20))
+        ctk.CTkFrame(self.sidebar, height=2, fg_color=COLOR_BORDER).pack(fill="x", padx=20, pady=10)
+
+        # VISUALS
+        ctk.CTkLabel(self.sidebar, text="VISUALS", text_color=COLOR_TEXT_DIM, font=("Arial", 11, "bold")).pack(anchor="w", padx=20, pady=(10,5))
+        
+        self.side_font = ctk.CTkOptionMenu(self.sidebar, values=["Arial", "Roboto", "Consolas"], fg_color=COLOR_BG, button_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN,
+                                           command=lambda _: self.bus.post("preview_refresh", self.refresh_preview))
+        self.side_font.pack(fill="x", padx=20, pady=5)
+        
+        self.side_color = ctk.CTkOptionMenu(self.sidebar, values=list(COLORS.keys()), fg_color=COLOR_BG, button_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN,
+                                            command=lambda _: self.bus.post("preview_refresh", self.refresh_preview))
+        self.side_color.pack(fill="x", padx=20, pady=5)
+        
+        # SIZE SLIDER
+        self.lbl_fontsize = ctk.CTkLabel(self.sidebar, text="Size: 24px", text_color=COLOR_TEXT_DIM)
+        self.lbl_fontsize.pack(anchor="w", padx=25, pady=(5,0))
+        
+        self.side_size = ctk.CTkSlider(self.sidebar, from_=12, to=64, number_of_steps=52, progress_color=COLOR_ACCENT, command=self.update_font_label)
+        self.side_size.set(24)
+        self.side_size.pack(fill="x", padx=20, pady=5)
+
+        # ENCODING
+        ctk.CTkLabel(self.sidebar, text="ENCODING", text_color=COLOR_TEXT_DIM, font=("Arial", 11, "bold")).pack(anchor="w", padx=20, pady=(20,5))
+        
+        self.side_preset = ctk.CTkOptionMenu(self.sidebar, values=list(PRESET_MAP.keys()), fg_color=COLOR_BG, button_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN,
+                                             command=lambda _: self.bus.post("estimates", self.update_estimates))
+        self.side_preset.set("Balanced (p4)")
+        self.side_preset.pack(fill="x", padx=20, pady=5)
+        
+        self.side_audio = ctk.CTkOptionMenu(self.sidebar, values=list(AUDIO_MAP.keys()), fg_color=COLOR_BG, button_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN)
+        self.side_audio.pack(fill="x", padx=20, pady=5)
+
+        self.side_outputs = ctk.CTkOptionMenu(self.sidebar, values=list(OUTPUT_PROFILES.keys()), fg_color=COLOR_BG, button_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN)
+        self.side_outputs.pack(fill="x", padx=20, pady=5)
+
+        self.side_encoder = ctk.CTkOptionMenu(self.sidebar, values=["Auto Encoder"], fg_color=COLOR_BG, button_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN)
+        self.side_encoder.pack(fill="x", padx=20, pady=5)
+
+        self.side_jobs = ctk.CTkOptionMenu(self.sidebar, values=["1 Job", "2 Jobs", "3 Jobs", "4 Jobs"], fg_color=COLOR_BG, button_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN,
+                                           command=lambda _: self.bus.post("estimates", self.update_estimates))
+        self.side_jobs.pack(fill="x", padx=20, pady=5)
+
+        self.side_order = ctk.CTkOptionMenu(self.sidebar, values=["Queue Order", "Longest First"], fg_color=COLOR_BG, button_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN,
+                                            command=lambda _: self.bus.post("estimates", self.update_estimates))
+        self.side_order.pack(fill="x", padx=20, pady=5)
+
+        # Encode on fast local disk, then move/copy into Output (click again to turn off)
+        self.scratch_dir = None
+        self.btn_scratch = ctk.CTkButton(self.sidebar, text="Scratch: Off", fg_color=COLOR_BG, text_color=COLOR_TEXT_MAIN, hover_color=COLOR_BORDER, command=self.choose_scratch)
+        self.btn_scratch.pack(fill="x", padx=20, pady=5)
+
+        # Send the queue to a job server (job_server.py serve) instead of encoding here
+        self.server_url = None
+        self.server_token = None
+        self.btn_server = ctk.CTkButton(self.sidebar, text="Server: Off", fg_color=COLOR_BG, text_color=COLOR_TEXT_MAIN, hover_color=COLOR_BORDER, command=self.choose_server)
+        self.btn_server.pack(fill="x", padx=20, pady=5)
+
+        # ACTION
+        ctk.CTkLabel(self.sidebar, text="FINISH ACTION", text_color=COLOR_TEXT_DIM, font=("Arial", 11, "bold")).pack(anchor="w", padx=20, pady=(20,5))
+        self.side_finish = ctk.CTkOptionMenu(self.sidebar, values=["Do Nothing", "Play Sound", "Close App", "Shutdown PC"], fg_color=COLOR_BG, button_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN)
+        self.side_finish.pack(fill="x", padx=20, pady=5)
+
+        # THEME SWITCH
+        self.switch_theme = ctk.CTkSwitch(self.sidebar, text="Light Mode", command=self.toggle_theme, progress_color=COLOR_ACCENT, text_color=COLOR_TEXT_MAIN)
+        self.switch_theme.pack(side="bottom", padx=20, pady=20)
+
+    def setup_dashboard(self):
+        # FIX: Replaced "transparent" with COLOR_BG to fix the 'line' artifact
+        self.main_area = ctk.CTkFrame(self, fg_color=COLOR_BG)
+        self.main_area.grid(row=0, column=1, sticky="nsew", padx=20, pady=20)
+        self.main_area.grid_columnconfigure(0, weight=1)
+        self.main_area.grid_rowconfigure(1, weight=1)
+
+        # Top Bar (NOTE: bg_color=COLOR_BG fixes black corners)
+        self.top_bar = ctk.CTkFrame(self.main_area, fg_color=COLOR_SURFACE, height=60, corner_radius=8, bg_color=COLOR_BG)
+        self.top_bar.grid(row=0, column=0, sticky="ew", pady=(0, 20))
+        
+        # Import Buttons
+        self.btn_browse = ctk.CTkButton(self.top_bar, text="Import Files", fg_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN, hover_color=COLOR_ACCENT, width=100, command=self.browse_files)
+        self.btn_browse.pack(side="right", padx=(5, 15), pady=10)
+
+        self.btn_folder = ctk.CTkButton(self.top_bar, text="Import Folder", fg_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN, hover_color=COLOR_ACCENT, width=100, command=self.browse_folder)
+        self.btn_folder.pack(side="right", padx=(0, 5), pady=10)
+        
+        self.path_entry = ctk.CTkEntry(self.top_bar, placeholder_text="Drag & Drop Files or Folders here...", fg_color=COLOR_BG, border_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN)
+        self.path_entry.pack(side="left", fill="x", expand=True, padx=15, pady=10)
+
+        # Queue (NOTE: bg_color=COLOR_BG fixes list area corners)
+        self.queue_container = QueueView(self.main_area, self.queue, self.remove_item, self.move_item, self.preview_item)
+        self.queue_container.grid(row=1, column=0, sticky="nsew")
+
+        # Action Bar (NOTE: fg_color=COLOR_BG fixes black box behind buttons)
+        self.action_bar = ctk.CTkFrame(self.main_area, fg_color=COLOR_BG, corner_radius=0)
+        self.action_bar.grid(row=2, column=0, sticky="ew", pady=(20, 0))
+        
+        self.btn_start = ctk.CTkButton(self.action_bar, text="START BATCH", width=150, height=45, font=("Arial", 13, "bold"), fg_color=COLOR_SUCCESS, hover_color="#006b3a", text_color="white", bg_color=COLOR_BG, command=self.start_thread)
+        self.btn_start.pack(side="right", padx=5)
+        
+        self.btn_preview = ctk.CTkButton(self.action_bar, text="PREVIEW", width=120, height=45, fg_color=COLOR_ACCENT, hover_color="#008c93", text_color="white", bg_color=COLOR_BG, command=self.preview_video)
+        self.btn_preview.pack(side="right", padx=5)
+        
+        self.btn_pause = ctk.CTkButton(self.action_bar, text="PAUSE", width=100, height=45, fg_color=COLOR_WARNING, state="disabled", text_color="white", bg_color=COLOR_BG, command=self.toggle_pause)
+        self.btn_pause.pack(side="right", padx=5)
+
+        self.btn_cancel = ctk.CTkButton(self.action_bar, text="CANCEL", width=100, height=45, fg_color=COLOR_DANGER, state="disabled", text_color="white", bg_color=COLOR_BG, command=self.cancel_process)
+        self.btn_cancel.pack(side="right", padx=5)
+        
+        self.btn_clear = ctk.CTkButton(self.action_bar, text="CLEAR ALL", width=100, height=45, fg_color="transparent", border_width=1, border_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN, hover_color=("#e6e6e6", "#2f2f2f"), command=self.clear_queue)
+        self.btn_clear.pack(side="left", padx=0)
+
+        self.btn_report = ctk.CTkButton(self.action_bar, text="REPORT", width=90, height=45, fg_color="transparent", border_width=1, border_color=COLOR_BORDER, text_color=COLOR_TEXT_MAIN, hover_color=("#e6e6e6", "#2f2f2f"), state="disabled", command=self.export_report)
+        self.btn_report.pack(side="left", padx=5)
+
+    def setup_statusbar(self):
+        bar_bg = ("#D0D0D0", "#0f0f0f")
+        self.status_bar = ctk.CTkFrame(self, height=35, fg_color=bar_bg, corner_radius=0, bg_color=COLOR_BG)
+        self.status_bar.grid(row=1, column=1, sticky="ew")
+        
+        self.status_text = ctk.CTkLabel(self.status_bar, text="Ready", font=("Consolas", 11), text_color=COLOR_TEXT_DIM)
+        self.status_text.pack(side="left", padx=20)
+        
+        self.gpu_stat = ctk.CTkLabel(self.status_bar, text="GPU: --%", font=("Consolas", 11, "bold"), text_color=COLOR_ACCENT)
+        self.gpu_stat.pack(side="right", padx=20)
+        
+        self.progress_bar = ctk.CTkProgressBar(self.status_bar, width=300, height=8, progress_color=COLOR_ACCENT)
+        self.progress_bar.set(0)
+        self.progress_bar.pack(side="right", padx=20)
+
+    # --- THEME LOGIC ---
+    def toggle_theme(self):
+        # Determine strict Mode Color (0=Light, 1=Dark)
+        is_light = self.switch_theme.get() == 1
+        mode_idx = 0 if is_light else 1
+        current_hex = COLOR_BG[mode_idx]
+
+        if is_light:
+            ctk.set_appearance_mode("Light")
+        else:
+            ctk.set_appearance_mode("Dark")
+            
+        # 1. Update Root Window Background (Fix for DND Tkinter window)
+        if dnd_available:
+            self.config(bg=current_hex)
+
+        # 2. Update Main Container to hide "transparency artifacts"
+        self.main_area.configure(fg_color=current_hex)
+
+        # 3. Explicitly update background colors of containers
+        self.top_bar.configure(bg_color=current_hex)
+        self.queue_container.update_theme(current_hex)
+        self.status_bar.configure(bg_color=current_hex)
+        self.action_bar.configure(fg_color=current_hex) # action_bar is fg, not bg because it isn't rounded
+
+        # 4. Update Buttons to match background
+        self.btn_start.configure(bg_color=current_hex)
+        self.btn_preview.configure(bg_color=current_hex)
+        self.btn_pause.configure(bg_color=current_hex)
+        self.btn_cancel.configure(bg_color=current_hex)
+        self.btn_clear.configure(fg_color=current_hex)
+
+    def update_font_label(self, value):
+        self.lbl_fontsize.configure(text=f"Size: {int(value)}px")
+        self.bus.post("preview_refresh", self.refresh_preview)
+
+    # --- LOGIC: SYSTEM & QUEUE ---
+    def check_ffmpeg(self):
+        self.ffmpeg_exe = find_ffmpeg()
+        
+        if not self.ffmpeg_exe:
+            self.status_text.configure(text="ERROR: FFmpeg not found", text_color=COLOR_DANGER)
+            self.btn_start.configure(state="disabled")
+
+    def drop_event(self, event):
+        if self.is_running: return
+        data = event.data
+        if data.startswith('{') and data.endswith('}'):
+            items = re.split(r'\} \{', data[1:-1])
+        else:
+            items = data.split()
+        
+        folders = [i for i in items if os.path.isdir(i)]
+        self.add_files_to_queue([i for i in items if not os.path.isdir(i)])
+        if folders:
+            self.add_folder_to_queue(*folders)
+
+    def browse_files(self):
+        files = filedialog.askopenfilenames(filetypes=[("Video", "*.mp4 *.mkv *.avi")])
+        if files:
+            self.add_files_to_queue(files)
+
+    def browse_folder(self):
+        # Doubles as "Stop Scan" while a folder import is running
+        if self.scanner and self.scanner.is_alive():
+            self.scanner.cancel()
+            return
+        folder = filedialog.askdirectory()
+        if folder:
+            self.add_folder_to_queue(folder)
+
+    def add_folder_to_queue(self, *folders):
+        """Recursive scan on a worker thread; matches stream into the queue in batches."""
+        if self.scanner and self.scanner.is_alive():
+            self.scanner.roots.extend(folders)  # picked up before the running scan finishes
+            return
+        self.btn_folder.configure(text="Stop Scan")
+        self.scanner = FolderScanner(folders, on_batch=self.on_scan_batch, on_done=self.on_scan_done).start()
+
+    def on_scan_batch(self, pairs):
+        # Scanner thread
+        self.bus.call(self.add_files_to_queue, [v for v, _ in pairs], dict(pairs))
+        self.bus.post("status", self.status_text.configure, text=f"Scanning... {self.scanner.count} files found")
+
+    def on_scan_done(self, count, cancelled):
+        # Scanner thread
+        text = f"Scan stopped: {count} files imported." if cancelled else f"Imported {count} files from folder."
+        self.bus.post("status", self.status_text.configure, text=text)
+        self.bus.post("scan_btn", self.btn_folder.configure, text="Import Folder")
+
+    def add_files_to_queue(self, filepaths, subtitles=None):
+        added = self.queue.add(filepaths, subtitles)
+        self.prober.submit(added, lambda path, info: self.bus.post("estimates", self.update_estimates))
+        return added
+
+    def update_estimates(self):
+        """Predicted time per queued file and for the whole batch (main thread)."""
+        if self.is_running: return
+        settings = self.get_settings()
+        backends = choose_backends(self.backends or [], settings["encoder"])
+        backend = backends[0] if backends else None
+        estimates = []
+        for entry in self.queue:
+            info = self.prober.cache.get(entry.filepath)
+            entry.estimate = self.model.predict_seconds(info, settings["preset"], backend and backend.name, backend and backend.resource) if info else None
+            if entry.estimate: estimates.append(entry.estimate)
+        self.queue_container.schedule_refresh()
+        if estimates:
+            if settings["order"] == "longest_first": estimates.sort(reverse=True)
+            total = makespan(estimates, settings["jobs"])
+            self.status_text.configure(text=f"{len(self.queue)} files  |  estimated batch time {format_duration(total)}")
+
+    def remove_item(self, filepath):
+        if self.is_running: return
+        self.queue.remove(filepath)
+
+    def move_item(self, filepath, direction):
+        if self.is_running: return
+        self.queue.move(filepath, direction)
+
+    def clear_queue(self):
+        if self.is_running: return
+        self.queue.clear()
+
+    # --- LOGIC: GPU MONITOR ---
+    def destroy(self):
+        # nvidia-smi dmon is a child process; do not leave it running
+        self.telemetry.stop()
+        super().destroy()
+
+    def monitor_system(self):
+        sample = self.telemetry.latest() or {}
+        if sample.get("gpu") is not None:
+            text = f"GPU: {sample['gpu']:.0f}%"
+            if sample.get("enc") is not None:
+                text += f"  ENC {sample['enc']:.0f}%  DEC {sample.get('dec') or 0:.0f}%"
+        elif sample.get("cpu") is not None:
+            text = f"CPU: {sample['cpu']:.0f}%"
+        else:
+            text = "GPU: N/A"
+        self.gpu_stat.configure(text=text)
+        self.after(2000, self.monitor_system)
+
+    def detect_encoders(self):
+        backends = detect_backends(self.ffmpeg_exe)
+        self.bus.call(self.set_encoders, backends)
+
+    def set_encoders(self, backends):
+        self.backends = backends
+        self.encoder_names = {b.label: b.name for b in backends}
+        self.side_encoder.configure(values=["Auto Encoder"] + list(self.encoder_names))
+        if not backends:
+            self.status_text.configure(text="No working video encoder found.", text_color=COLOR_DANGER)
+
+    # --- LOGIC: PROCESSING ---
+    def get_settings(self):
+        return {
+            "font": self.side_font.get(),
+            "size": int(self.side_size.get()),
+            "color": COLORS[self.side_color.get()],
+            "preset": PRESET_MAP[self.side_preset.get()],
+            "audio": AUDIO_MAP[self.side_audio.get()],
+            "outputs": OUTPUT_PROFILES[self.side_outputs.get()],
+            "encoder": getattr(self, "encoder_names", {}).get(self.side_encoder.get(), "auto"),
+            "jobs": int(self.side_jobs.get().split()[0]),
+            "order": "longest_first" if self.side_order.get() == "Longest First" else "queue",
+            "scratch": self.scratch_dir,
+            "finish": self.side_finish.get()
+        }
+
+    def choose_scratch(self):
+        if self.scratch_dir:
+            self.scratch_dir = None
+        else:
+            self.scratch_dir = filedialog.askdirectory(title="Scratch folder (fast local disk)") or None
+        name = os.path.basename(self.scratch_dir.rstrip("/\\")) if self.scratch_dir else "Off"
+        self.btn_scratch.configure(text=f"Scratch: {name or self.scratch_dir}")
+
+    def choose_server(self):
+        if self.server_url:
+            self.server_url = None
+        else:
+            from job_server import DEFAULT_SERVER_PORT, TOKEN_ENV
+            url = ctk.CTkInputDialog(text="Job server address (host:port)", title="Job Server").get_input()
+            url = (url or "").strip().rstrip("/")
+            if url and "://" not in url:
+                url = "http://" + (url if ":" in url else f"{url}:{DEFAULT_SERVER_PORT}")
+            self.server_url = url or None
+            if self.server_url and not os.environ.get(TOKEN_ENV):
+                token = ctk.CTkInputDialog(text="Server token (empty if it has none)", title="Job Server").get_input()
+                self.server_token = (token or "").strip() or None
+        self.btn_server.configure(text=f"Server: {self.server_url.split('://')[-1] if self.server_url else 'Off'}")
+
+    def set_ui_locked(self, locked):
+        state = "disabled" if locked else "normal"
+        # Sidebar
+        self.side_font.configure(state=state)
+        self.side_size.configure(state=state)
+        self.side_color.configure(state=state)
+        self.side_preset.configure(state=state)
+        self.side_audio.configure(state=state)
+        self.side_outputs.configure(state=state)
+        self.side_encoder.configure(state=state)
+        self.side_jobs.configure(state=state)
+        self.side_order.configure(state=state)
+        self.btn_scratch.configure(state=state)
+        self.btn_server.configure(state=state)
+        # Main
+        self.btn_browse.configure(state=state)
+        self.btn_folder.configure(state=state)
+        self.path_entry.configure(state=state)
+        self.btn_clear.configure(state=state)
+        self.btn_start.configure(state=state)
+        self.btn_preview.configure(state=state)
+        # Controls
+        self.btn_pause.configure(state="normal" if locked else "disabled")
+        self.btn_cancel.configure(state="normal" if locked else "disabled")
+        # Items (only the rows on screen exist)
+        self.queue_container.set_locked(locked)
+
+    def start_thread(self):
+        if not len(self.queue): return
+        self.is_running = True
+        self.set_ui_locked(True)
+        settings = self.get_settings()
+        self.finish_action = settings.pop("finish")
+        max_jobs = settings.pop("jobs")
+        if self.server_url:
+            from job_server import RemoteEngine
+            # Workers share the server's queue; "jobs" is up to how many workers run
+            self.engine = RemoteEngine(
+                self.server_url, settings, token=self.server_token,
+                on_job_start=self.on_job_start, on_progress=self.on_job_progress,
+                on_job_done=self.on_job_done, on_batch_done=self.on_batch_done
+            )
+            self.engine.start(self.queue.paths(), subtitles=self.queue.subtitles())
+            return
+        self.engine = BurnEngine(
+            settings, ffmpeg_exe=self.ffmpeg_exe,
+            on_job_start=self.on_job_start, on_progress=self.on_job_progress,
+            on_job_done=self.on_job_done, on_batch_done=self.on_batch_done,
+            max_jobs=max_jobs, prober=self.prober, backends=self.backends, model=self.model
+        )
+        self.engine.start(self.queue.paths(), subtitles=self.queue.subtitles())
+
+    # --- ENGINE CALLBACKS (worker threads: only post to the bus) ---
+    def on_job_start(self, job):
+        self.bus.post(("item", job.filepath), self.queue.set_state, job.filepath, BurnJob.RUNNING)
+        self.bus.post("status", self.update_batch_status)
+
+    def on_job_progress(self, job, fraction):
+        self.bus.post("progress", self.update_batch_progress)
+        self.bus.post("status", self.update_batch_status)
+
+    def on_job_done(self, job):
+        # A cancelled job goes back to pending so it shows as not yet done
+        state = BurnJob.PENDING if job.status == BurnJob.CANCELLED else job.status
+        self.bus.post(("item", job.filepath), self.queue.set_state, job.filepath, state)
+
+    def on_batch_done(self, jobs, completed):
+        self.bus.call(self.finish_batch, completed)
+
+    # --- BATCH UI (main thread) ---
+    def update_batch_progress(self):
+        # One bar for the whole batch; with parallel jobs per-file progress would jump around
+        if self.engine: self.progress_bar.set(self.engine.batch_progress())
+
+    def update_batch_status(self):
+        running = self.engine.running_jobs() if self.engine else []
+        if not running: return
+        if len(running) > 1:
+            text = f"Processing {len(running)} files: {running[0].filename} ..."
+        else:
+            text = f"Processing: {running[0].filename}"
+            if running[0].stats:
+                text += f"  |  {running[0].stats.fps:.0f} fps ({running[0].stats.speed:.1f}x)"
+        eta = self.engine.batch_eta()
+        if eta is not None:
+            text += f"  |  ETA {format_duration(eta)}"
+        self.status_text.configure(text=text)
+
+    def finish_batch(self, completed):
+        # Kept for REPORT: per-job timings, fps, sizes and errors of the last batch
+        self.last_jobs = self.engine.jobs if self.engine else []
+        self.btn_report.configure(state="normal" if self.last_jobs else "disabled")
+        self.engine = None
+        # The model learned from this batch; re-estimate what is left once the UI is unlocked
+        self.bus.post("estimates", self.update_estimates)
+        if completed:
+            self.finish_sequence(self.finish_action)
+        else:
+            self.status_text.configure(text="Batch Cancelled.")
+            self.progress_bar.set(0)
+            self.set_ui_locked(False)
+            self.is_running = False
+
+    def finish_sequence(self, action):
+        failed = sum(j.status == BurnJob.FAILED for j in getattr(self, "last_jobs", []))
+        if failed:
+            self.status_text.configure(text=f"Finished: {failed} file(s) failed (see REPORT).")
+        else:
+            self.status_text.configure(text="All Tasks Completed.")
+        self.progress_bar.set(1)
+        self.set_ui_locked(False)
+        self.is_running = False
+        
+        if action == "Play Sound":
+            if sys.platform == "win32":
+                import winsound
+                winsound.MessageBeep(winsound.MB_OK)
+            else:
+                self.bell()
+            messagebox.showinfo("Done", "Complete!")
+        elif action == "Close App":
+            self.destroy()
+        elif action == "Shutdown PC":
+            try:
+                subprocess.Popen(shutdown_command(60))
+            except OSError as e:
+                messagebox.showerror("Shutdown", f"Could not schedule shutdown:\n{e}")
+        else:
+            messagebox.showinfo("Done", "Complete!")
+
+    def export_report(self):
+        if not getattr(self, "last_jobs", None): return
+        path = filedialog.asksaveasfilename(defaultextension=".csv", initialfile="batch_report.csv",
+                                            filetypes=[("CSV", "*.csv"), ("JSON", "*.json")])
+        if not path: return
+        try:
+            export_report(self.last_jobs, path)
+            self.status_text.configure(text=f"Report saved: {os.path.basename(path)}")
+        except OSError as e:
+            messagebox.showerror("Report", f"Could not save report:\n{e}")
+
+    def preview_video(self):
+        if not len(self.queue): return
+        self.preview_item(self.queue[0].filepath)
+
+    def preview_item(self, filepath):
+        if self.preview_window is None or not self.preview_window.winfo_exists():
+            self.preview_window = PreviewWindow(self, self.request_preview, self.play_clip)
+        self.preview_window.show(filepath)
+        self.preview_window.focus()
+
+    def request_preview(self, filepath, index):
+        entry = self.queue.get(filepath)
+        self.previewer.request(filepath, index, self.get_settings(),
+                               lambda *result: self.bus.post("preview", self.show_preview, *result),
+                               entry.sub_path if entry else None)
+
+    def show_preview(self, path, t, index, count):
+        if self.preview_window is not None and self.preview_window.winfo_exists():
+            self.preview_window.set_image(path, t, index, count)
+
+    def refresh_preview(self):
+        if self.preview_window is not None and self.preview_window.winfo_exists():
+            self.preview_window.refresh()
+
+    def play_clip(self, filepath, t):
+        self.status_text.configure(text="Generating Preview...")
+        threading.Thread(target=self.run_preview, args=(filepath, self.get_settings(), t), daemon=True).start()
+
+    def run_preview(self, input_path, settings, t=0.0):
+        # A few seconds around the cue shown in the preview window
+        backends = choose_backends(self.backends or [], settings["encoder"])
+        os.makedirs(PREVIEW_DIR, exist_ok=True)
+        output_path = render_preview(self.ffmpeg_exe, input_path, settings, os.path.join(PREVIEW_DIR, "clip.mp4"),
+                                     backends[0] if backends else None, start=max(0.0, t - 2), seconds=6)
+        if output_path:
+            open_path(output_path)
+            self.bus.post("status", self.status_text.configure, text="Preview Launched.")
+        else:
+            self.bus.post("status", self.status_text.configure, text="Preview Failed.")
+
+    def toggle_pause(self):
+        if not self.engine: return
+        if self.engine.is_paused:
+            self.engine.resume()
+            self.btn_pause.configure(text="PAUSE", fg_color=COLOR_WARNING)
+        else:
+            self.engine.pause()
+            if self.engine.is_paused:
+                self.btn_pause.configure(text="RESUME", fg_color="#3B8ED0")
+
+    def cancel_process(self):
+        if self.engine:
+            self.engine.cancel()
+
+if __name__ == "__main__":
+    app = subtitle_burner()
+
+    app.mainloop()
@@ -0,0 +1,321 @@
+import os
+import re
+import time
+import codecs
+import hashlib
+import tempfile
+import subprocess
+
+from ffmpeg_utils import popen_kwargs, DATA_DIR
+from job_journal import file_signature
+
+# ==========================================
+#          SUBTITLE CUE TIMELINES
+# ==========================================
+# Just enough parsing to know *when* text is on screen. Rendering is still
+# libass's job inside the subtitles filter.
+
+TEXT_SUB_EXTS = ('.srt', '.ass', '.ssa')
+
+SRT_TIME = re.compile(r"(\d+):(\d{2}):(\d{2})[,.](\d{1,3})\s*-->\s*(\d+):(\d{2}):(\d{2})[,.](\d{1,3})")
+ASS_DIALOGUE = re.compile(r"^Dialogue:\s*[^,]*,(\d+):(\d{2}):(\d{2})[.](\d{1,2}),(\d+):(\d{2}):(\d{2})[.](\d{1,2}),")
+
+
+def _secs(h, m, s, frac):
+    return int(h)*3600 + int(m)*60 + int(s) + int(frac) / (10 ** len(frac))
+
+
+def parse_srt(text):
+    """[(start, end), ...] in seconds, in file order."""
+    cues = []
+    for m in SRT_TIME.finditer(text):
+        g = m.groups()
+        cues.append((_secs(*g[:4]), _secs(*g[4:])))
+    return cues
+
+
+def parse_srt_events(text):
+    """[(start, end, text), ...] with the cue text lines joined by newlines."""
+    events = []
+    for block in re.split(r"\n\s*\n", text.replace("\r\n", "\n").replace("\r", "\n")):
+        lines = block.strip("\n").split("\n")
+        for i, line in enumerate(lines):
+            m = SRT_TIME.search(line)
+            if m:
+                g = m.groups()
+                events.append((_secs(*g[:4]), _secs(*g[4:]), "\n".join(lines[i + 1:]).strip()))
+                break
+    return events
+
+
+def parse_ass(text):
+    cues = []
+    for line in text.splitlines():
+        m = ASS_DIALOGUE.match(line)
+        if m:
+            g = m.groups()
+            cues.append((_secs(*g[:4]), _secs(*g[4:])))
+    return cues
+
+
+# --- TEXT ENCODINGS ---
+BOMS = [(codecs.BOM_UTF8, 'utf-8'), (codecs.BOM_UTF16_LE, 'utf-16-le'), (codecs.BOM_UTF16_BE, 'utf-16-be')]
+
+
+def decode_text(raw):
+    """Subtitle bytes as text: BOM if there is one, else BOM-less UTF-16,
+    UTF-8, then cp1252 (most legacy .srt files) and latin-1 as the catch-all."""
+    for bom, encoding in BOMS:
+        if raw.startswith(bom):
+            return raw[len(bom):].decode(encoding, errors='replace')
+    # Before UTF-8: NUL is valid UTF-8, so BOM-less UTF-16 would "decode" into
+    # NUL-interleaved text that no cue pattern matches
+    head = raw[:400]
+    if head and head.count(b"\0") > len(head) // 4:
+        # ASCII-range text in UTF-16: every other byte is NUL
+        encoding = 'utf-16-le' if head[1::2].count(b"\0") > head[::2].count(b"\0") else 'utf-16-be'
+        return raw.decode(encoding, errors='replace')
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        pass
+    try:
+        return raw.decode('cp1252')
+    except UnicodeDecodeError:
+        return raw.decode('latin-1')
+
+
+def read_text(path):
+    with open(path, 'rb') as f:
+        return decode_text(f.read()).replace("\r\n", "\n")
+
+
+def extract_embedded_srt(ffmpeg_exe, video_path, stream=0):
+    """First (or given) text subtitle track of a container as SRT text, or None
+    when there is none or it is a bitmap format ffmpeg cannot turn into text."""
+    cmd = [ffmpeg_exe, '-v', 'error', '-i', video_path, '-map', f'0:s:{stream}', '-f', 'srt', 'pipe:1']
+    try:
+        r = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, encoding='utf-8', errors='replace', **popen_kwargs())
+    except OSError:
+        return None
+    return r.stdout if r.returncode == 0 and r.stdout.strip() else None
+
+
+def load_cues(sub_path, ffmpeg_exe=None):
+    """Cue timeline for a sidecar file or, for a video, its embedded track.
+    Returns a sorted list of (start, end), or None if it could not be read."""
+    ext = os.path.splitext(sub_path)[1].lower()
+    if ext in TEXT_SUB_EXTS:
+        try:
+            text = read_text(sub_path)
+        except OSError:
+            return None
+        cues = parse_srt(text) if ext == '.srt' else parse_ass(text)
+    else:
+        text = extract_embedded_srt(ffmpeg_exe, sub_path) if ffmpeg_exe else None
+        if text is None: return None
+        cues = parse_srt(text)
+    return sorted((s, e) for s, e in cues if e > s)
+
+
+# ==========================================
+#      SUBTITLE PREPARATION AND CACHE
+# ==========================================
+# Before a burn, the subtitle source is turned into a small UTF-8 file the
+# subtitles filter can open cheaply: a sidecar .srt becomes an .ass with the
+# burn style already in its Default style, and an embedded track is pulled
+# out of the container once (stream copy) instead of libass demuxing the
+# whole video on every encode, segment and preview. Results are cached by
+# source signature + style, so re-runs and retries reuse them.
+
+SUBTITLE_CACHE_DIR = os.path.join(DATA_DIR, "subtitle_cache")
+# Files the cache wrote with the style baked in; the filter adds no force_style for them
+STYLED_SUFFIX = ".styled.ass"
+CACHE_MAX_AGE = 30 * 86400
+# Bitmap tracks cannot become text; the filter keeps reading them from the video
+BITMAP_CODECS = {"hdmv_pgs_subtitle", "dvd_subtitle", "dvb_subtitle", "xsub", "dvb_teletext"}
+SRT_LIKE_CODECS = {"subrip", "srt", "mov_text", "webvtt", "text"}
+
+# What ffmpeg's own SRT -> ASS conversion produces, so burns look the same as before
+ASS_STYLE_FIELDS = ["Name", "Fontname", "Fontsize", "PrimaryColour", "SecondaryColour", "OutlineColour", "BackColour",
+                    "Bold", "Italic", "Underline", "StrikeOut", "ScaleX", "ScaleY", "Spacing", "Angle", "BorderStyle",
+                    "Outline", "Shadow", "Alignment", "MarginL", "MarginR", "MarginV", "Encoding"]
+ASS_DEFAULT_STYLE = ["Default", "Arial", "16", "&Hffffff", "&Hffffff", "&H0", "&H0", "0", "0", "0", "0", "100", "100",
+                     "0", "0", "1", "1", "0", "2", "10", "10", "10", "0"]
+ASS_HEADER = """[Script Info]
+ScriptType: v4.00+
+PlayResX: 384
+PlayResY: 288
+ScaledBorderAndShadow: yes
+
+[V4+ Styles]
+Format: {fields}
+Style: {style}
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+"""
+
+SRT_TAG = re.compile(r"<(/?)([a-zA-Z]+)([^>]*)>")
+FONT_COLOR = re.compile(r"""color\s*=\s*["']?#?([0-9a-fA-F]{6})""")
+
+
+def escape_filter_path(path):
+    return path.replace("\\", "/").replace(":", "\\:")
+
+
+def subtitle_filter(sub_path, style=None):
+    """The subtitles= filter for a file; style is its force_style (None for
+    files already styled by prepare)."""
+    vf = f"subtitles='{escape_filter_path(sub_path)}'"
+    return f"{vf}:force_style='{style}'" if style else vf
+
+
+def is_prestyled(sub_path):
+    return sub_path.endswith(STYLED_SUFFIX)
+
+
+def _ass_time(seconds):
+    cs = int(round(seconds * 100))
+    return f"{cs // 360000}:{cs // 6000 % 60:02d}:{cs // 100 % 60:02d}.{cs % 100:02d}"
+
+
+def _srt_markup_to_ass(text):
+    def tag(m):
+        closing, name, attrs = m.group(1), m.group(2).lower(), m.group(3)
+        if name in ("i", "b", "u", "s"):
+            return f"{{\\{name}{0 if closing else 1}}}"
+        if name == "font":
+            if closing: return "{\\c}"
+            color = FONT_COLOR.search(attrs)
+            if color:
+                rgb = color.group(1)
+                return f"{{\\c&H{rgb[4:6]}{rgb[2:4]}{rgb[0:2]}&}}"
+            return ""
+        return ""  # other HTML-ish tags are dropped, as ffmpeg does
+    return SRT_TAG.sub(tag, text).replace("\n", "\\N")
+
+
+def styled_header(style):
+    """ASS header whose Default style is ffmpeg's default with the
+    force_style overrides ("Key=Value,...") applied."""
+    values = dict(zip([f.lower() for f in ASS_STYLE_FIELDS], ASS_DEFAULT_STYLE))
+    for item in (style or "").split(","):
+        key, _, value = item.partition("=")
+        if key.strip().lower() in values and key.strip().lower() != "name":
+            values[key.strip().lower()] = value.strip()
+    return ASS_HEADER.format(fields=", ".join(ASS_STYLE_FIELDS),
+                             style=",".join(values[f.lower()] for f in ASS_STYLE_FIELDS))
+
+
+def srt_to_ass(text, style=None):
+    lines = [styled_header(style)]
+    for start, end, body in parse_srt_events(text):
+        if end <= start: continue
+        lines.append(f"Dialogue: 0,{_ass_time(start)},{_ass_time(end)},Default,,0,0,0,,{_srt_markup_to_ass(body)}")
+    return "\n".join(lines) + "\n"
+
+
+def extract_embedded_track(ffmpeg_exe, video_path, out_path, codec=None, stream=0):
+    """Writes one subtitle track of a container to out_path (.srt or .ass).
+    Stream copy when the codec already matches, else a text conversion.
+    Returns True on success."""
+    copy = codec in ("subrip", "srt") and out_path.endswith(".srt") or codec in ("ass", "ssa") and out_path.endswith(".ass")
+    cmd = [ffmpeg_exe, '-v', 'error', '-y', '-i', video_path, '-map', f'0:s:{stream}',
+           '-c:s', 'copy' if copy else ('ass' if out_path.endswith(".ass") else 'srt'), out_path]
+    try:
+        r = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **popen_kwargs())
+    except OSError:
+        return False
+    return r.returncode == 0 and os.path.exists(out_path) and os.path.getsize(out_path) > 0
+
+
+class SubtitleCache:
+    """Prepared subtitle files under DATA_DIR/subtitle_cache.
+
+    prepare(source, style, streams) returns a path for the subtitles filter,
+    or None when nothing better than the source itself can be made (bitmap
+    tracks, no track, or a failed extraction).
+    """
+
+    def __init__(self, ffmpeg_exe=None, cache_dir=SUBTITLE_CACHE_DIR):
+        self.ffmpeg_exe = ffmpeg_exe
+        self.cache_dir = cache_dir
+        self.pruned = False
+
+    def _prune(self):
+        # Once per cache object: drop files nothing has used for a month
+        self.pruned = True
+        cutoff = time.time() - CACHE_MAX_AGE
+        try:
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+        except OSError:
+            pass
+
+    def _tmp(self, suffix):
+        # Unique per call: the preview and several engine threads of one
+        # process may prepare the same subtitle at once
+        fd, tmp = tempfile.mkstemp(suffix=suffix, dir=self.cache_dir)
+        os.close(fd)
+        return tmp
+
+    def _write(self, path, text):
+        tmp = self._tmp(".tmp")
+        try:
+            with open(tmp, "w", encoding='utf-8', newline="\n") as f:
+                f.write(text)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp): os.remove(tmp)
+        return path
+
+    def _hit(self, path):
+        if not os.path.exists(path): return False
+        try: os.utime(path)  # keeps it from being pruned
+        except OSError: pass
+        return True
+
+    def prepare(self, source, style, streams=None):
+        """streams: the probe's subtitle_streams for a video source ([] means
+        it has none; None means not probed)."""
+        ext = os.path.splitext(source)[1].lower()
+        if ext not in TEXT_SUB_EXTS and (streams == [] or streams and streams[0].get("codec") in BITMAP_CODECS):
+            return None
+        signature = file_signature(source)
+        source_key = hashlib.sha1(signature.encode('utf-8')).hexdigest()
+        # ASS keeps its own styles (force_style still applies at burn time), so it
+        # does not depend on the style; SRT gets one styled file per style
+        plain = os.path.join(self.cache_dir, source_key + ".ass")
+        styled = os.path.join(self.cache_dir, hashlib.sha1(f"{signature}\n{style}".encode('utf-8')).hexdigest() + STYLED_SUFFIX)
+        # An extracted SRT track, kept so a style change does not extract again
+        track = os.path.join(self.cache_dir, source_key + ".track.srt")
+        for path in (styled, plain):
+            if self._hit(path): return path
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if not self.pruned: self._prune()
+            if ext == '.srt':
+                return self._write(styled, srt_to_ass(read_text(source), style))
+            if ext in ('.ass', '.ssa'):
+                return self._write(plain, read_text(source))
+            if not self._hit(track):
+                if not self.ffmpeg_exe:
+                    return None
+                codec = streams[0].get("codec") if streams else None
+                # Plain-text tracks get the style baked in; ASS (or unknown) keeps its own styles
+                out = track if codec in SRT_LIKE_CODECS else plain
+                tmp = self._tmp(".tmp" + os.path.splitext(out)[1])
+                try:
+                    if not extract_embedded_track(self.ffmpeg_exe, source, tmp, codec):
+                        return None
+                    self._write(out, read_text(tmp))
+                finally:
+                    if os.path.exists(tmp): os.remove(tmp)
+                if out == plain:
+                    return plain
+            return self._write(styled, srt_to_ass(read_text(track), style))
+        except (OSError, ValueError):
+            return None
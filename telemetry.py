@@ -0,0 +1,214 @@
+import time
+import shutil
+import threading
+import subprocess
+import collections
+
+from ffmpeg_utils import popen_kwargs
+
+# ==========================================
+#            SYSTEM TELEMETRY
+# ==========================================
+# One sampler thread fills a fixed-size ring buffer that the GUI and the
+# scheduler read whenever they like. GPU numbers come from a single
+# long-lived `nvidia-smi dmon` process (not one spawn per tick); CPU, memory,
+# disk and per-ffmpeg numbers from psutil. A backend that is missing on this
+# machine is dropped once, quietly, and the others keep going.
+
+DEFAULT_INTERVAL = 1.0
+DEFAULT_CAPACITY = 600  # 10 minutes at 1 s
+
+
+class RingBuffer:
+    """Last `capacity` samples, oldest first. Thread-safe."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.items = collections.deque(maxlen=capacity)
+        self.lock = threading.Lock()
+
+    def append(self, item):
+        with self.lock:
+            self.items.append(item)
+
+    def latest(self):
+        with self.lock:
+            return self.items[-1] if self.items else None
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.items)
+
+    def since(self, t):
+        with self.lock:
+            return [s for s in self.items if s["t"] > t]
+
+
+# --- BACKENDS ---
+# A backend has `available`, start(), stop() and read() -> dict of fields
+# for the current sample (read() must not block).
+
+class NvidiaDmonBackend:
+    """Keeps one `nvidia-smi dmon` running and parses its rows as they come.
+
+    Fields: gpu (SM %), gpu_mem (memory controller %), enc, dec (NVENC/NVDEC
+    %), gpu_fb_mb (framebuffer in use). Values are for GPU 0.
+    """
+
+    name = "nvidia"
+
+    def __init__(self, interval=DEFAULT_INTERVAL, exe=None):
+        self.exe = exe or shutil.which("nvidia-smi")
+        self.interval = max(1, int(round(interval)))
+        self.available = bool(self.exe)
+        self.proc = None
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def start(self):
+        if not self.available: return
+        try:
+            self.proc = subprocess.Popen(
+                [self.exe, "dmon", "-i", "0", "-s", "um", "-d", str(self.interval)],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, encoding='utf-8', errors='replace', **popen_kwargs()
+            )
+        except OSError:
+            self.available = False
+            return
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        columns = []
+        for line in self.proc.stdout:
+            parts = line.split()
+            if not parts: continue
+            if parts[0] == "#":
+                # "# gpu sm mem enc dec [jpg ofa] fb bar1 ..." (columns vary by driver)
+                if not columns and len(parts) > 1 and parts[1] == "gpu":
+                    columns = parts[1:]
+                continue
+            if not columns or len(parts) != len(columns): continue
+            row = dict(zip(columns, parts))
+            with self.lock:
+                self.values = {
+                    "gpu": _num(row.get("sm")), "gpu_mem": _num(row.get("mem")),
+                    "enc": _num(row.get("enc")), "dec": _num(row.get("dec")),
+                    "gpu_fb_mb": _num(row.get("fb")),
+                }
+        # dmon exited: no driver, no GPU, or unsupported; stop reporting GPU numbers
+        self.available = False
+        with self.lock:
+            self.values = {}
+
+    def read(self):
+        with self.lock:
+            return dict(self.values)
+
+    def stop(self):
+        if self.proc and self.proc.poll() is None:
+            try: self.proc.terminate()
+            except OSError: pass
+
+
+class PsutilBackend:
+    """CPU %, memory %, disk read/write bytes per second, and CPU/RSS of the
+    ffmpeg processes pids_fn() returns (the engine's running encodes)."""
+
+    name = "psutil"
+
+    def __init__(self, pids_fn=None):
+        self.pids_fn = pids_fn
+        try:
+            import psutil
+        except ImportError:
+            psutil = None
+        self.psutil = psutil
+        self.available = psutil is not None
+        self.last_io = None
+        self.procs = {}  # pid -> psutil.Process, kept so cpu_percent() has a baseline
+
+    def start(self):
+        if not self.available: return
+        self.psutil.cpu_percent(None)
+
+    def read(self):
+        ps = self.psutil
+        if ps is None: return {}
+        now = time.monotonic()
+        fields = {"cpu": ps.cpu_percent(None), "mem": ps.virtual_memory().percent}
+        try:
+            io = ps.disk_io_counters()
+        except Exception:
+            io = None
+        if io is not None:
+            if self.last_io:
+                t0, r0, w0 = self.last_io
+                dt = max(now - t0, 1e-6)
+                fields["disk_read_bps"] = (io.read_bytes - r0) / dt
+                fields["disk_write_bps"] = (io.write_bytes - w0) / dt
+            self.last_io = (now, io.read_bytes, io.write_bytes)
+
+        pids = set(self.pids_fn() if self.pids_fn else [])
+        for pid in list(self.procs):
+            if pid not in pids: del self.procs[pid]
+        ffmpeg = []
+        for pid in pids:
+            try:
+                p = self.procs.get(pid)
+                if p is None:
+                    p = self.procs[pid] = ps.Process(pid)
+                    p.cpu_percent(None)
+                ffmpeg.append({"pid": pid, "cpu": p.cpu_percent(None), "rss_mb": p.memory_info().rss / 1048576})
+            except Exception:
+                self.procs.pop(pid, None)
+        fields["ffmpeg"] = ffmpeg
+        return fields
+
+    def stop(self):
+        pass
+
+
+def _num(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None  # "-" when the driver does not report that column
+
+
+class TelemetrySampler:
+    """Merges every available backend into one sample per interval.
+
+    Samples are dicts with "t" (time.time()) plus whatever fields the
+    backends provide; readers should treat every other field as optional.
+    """
+
+    def __init__(self, interval=DEFAULT_INTERVAL, capacity=DEFAULT_CAPACITY, pids_fn=None, backends=None):
+        self.interval = interval
+        self.buffer = RingBuffer(capacity)
+        self.backends = backends if backends is not None else [NvidiaDmonBackend(interval), PsutilBackend(pids_fn)]
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+
+    def start(self):
+        for b in self.backends:
+            b.start()
+        self.thread.start()
+        return self
+
+    def _loop(self):
+        while not self.stop_event.wait(self.interval):
+            sample = {"t": time.time()}
+            for b in self.backends:
+                if b.available:
+                    sample.update(b.read())
+            self.buffer.append(sample)
+
+    def latest(self):
+        return self.buffer.latest()
+
+    def has_gpu(self):
+        return any(b.name == "nvidia" and b.available for b in self.backends)
+
+    def stop(self):
+        self.stop_event.set()
+        for b in self.backends:
+            b.stop()
@@ -0,0 +1,167 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+
+from burn_engine import BurnJob
+from job_journal import JOURNAL_NAME
+from job_server import JobQueue, JobServer, JobClient, spawn_local_workers
+from output_stage import OutputStager
+from run_bench import fake_tools, make_fake_inputs
+
+TOKEN = "s3cret"
+FINISHED = (BurnJob.DONE, BurnJob.FAILED, BurnJob.CANCELLED)
+
+
+class JobQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.work = tempfile.mkdtemp(prefix="jobq-")
+        self.queue = JobQueue(lease_timeout=0.0, allowed_roots=[self.work])
+        self.clip = os.path.join(self.work, "in", "a.mp4")
+
+    def tearDown(self):
+        shutil.rmtree(self.work, ignore_errors=True)
+
+    def test_malformed_batches_are_refused(self):
+        for settings in ([1], {"size": "big"}, {"segments": 2.5}, {"size": 24.0}, {"no_such_setting": 1}, {"audio": "loud"},
+                         {"font": "x',movie=/etc/passwd"}, {"smart_render": "yes"}, {"outputs": [{"suffix": "/../../x"}]}, {"outputs": [{"height": "720"}]}):
+            with self.assertRaises(ValueError, msg=repr(settings)):
+                self.queue.submit([self.clip], settings=settings)
+        for inputs in ("a.mp4", [1], [""]):
+            with self.assertRaises(ValueError):
+                self.queue.submit(inputs)
+        with self.assertRaises(ValueError):
+            self.queue.submit([self.clip], subtitles=["a.srt"])
+        self.assertEqual(self.queue.snapshot(), [])
+
+    def test_outputs_outside_the_allowed_roots_are_refused(self):
+        with self.assertRaises(PermissionError):
+            self.queue.submit([self.clip], output_dir=os.path.join(self.work, "..", "elsewhere"))
+        with self.assertRaises(PermissionError):
+            self.queue.submit(["/tmp/other/b.mp4"])  # Output folder next to an input outside the roots
+        self.assertEqual(len(self.queue.submit([self.clip], output_dir=os.path.join(self.work, "out"))), 1)
+
+    def test_reassigned_lease_gets_its_own_tag(self):
+        self.queue.submit([self.clip], settings={"size": 30, "scratch": "/submitter/scratch"})
+        first = self.queue.lease("w1")
+        self.assertIsNone(first["settings"]["scratch"])
+        second = self.queue.lease("w2")  # lease_timeout=0: w1's lease has already expired
+        self.assertEqual(second["id"], first["id"])
+        self.assertNotEqual(second["lease"], first["lease"])
+        self.assertFalse(self.queue.finish(first["id"], "w1", BurnJob.DONE))
+        self.assertTrue(self.queue.finish(second["id"], "w2", BurnJob.DONE))
+        self.assertEqual(self.queue.snapshot()[0]["attempts"], 2)
+
+    def test_lease_tags_keep_staging_apart(self):
+        out_path = os.path.join(self.work, "out", "a.mp4")
+        for scratch in (None, os.path.join(self.work, "scratch")):
+            old, new = OutputStager(scratch, tag="lease1"), OutputStager(scratch, tag="lease2")
+            self.assertNotEqual(old.stage(out_path, 0), new.stage(out_path, 0))
+            self.assertNotEqual(old.partial_path(out_path), new.partial_path(out_path))
+
+
+class JobServerHttpTest(unittest.TestCase):
+    def setUp(self):
+        self.work = tempfile.mkdtemp(prefix="jobhttp-")
+        self.server = JobServer(0, queue=JobQueue(allowed_roots=[self.work]), token=TOKEN).start()
+        self.clip = os.path.join(self.work, "a.mp4")
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree(self.work, ignore_errors=True)
+
+    def test_requests_without_the_token_are_refused(self):
+        with mock.patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("SUBBURN_JOB_TOKEN", None)
+            self.assertEqual(JobClient(self.server.url).call("GET", "/jobs")[0], 401)
+            self.assertEqual(JobClient(self.server.url, token="wrong").call("POST", "/lease", {"worker": "w"})[0], 401)
+        self.assertEqual(JobClient(self.server.url, token=TOKEN).call("GET", "/jobs")[0], 200)
+
+    def test_bad_requests_get_400_and_foreign_outputs_403(self):
+        client = JobClient(self.server.url, token=TOKEN)
+        self.assertEqual(client.call("POST", "/jobs", {"inputs": [self.clip], "settings": [1]})[0], 400)
+        self.assertEqual(client.call("POST", "/jobs", {"inputs": [self.clip], "settings": {"size": "big"}})[0], 400)
+        self.assertEqual(client.call("POST", "/jobs", [self.clip])[0], 400)
+        self.assertEqual(client.call("POST", "/lease", {"worker": 7})[0], 400)
+        self.assertEqual(client.call("POST", "/jobs/1/progress", {"worker": "w", "progress": "half"})[0], 400)
+        self.assertEqual(client.call("POST", "/jobs", {"inputs": [self.clip], "output_dir": "/"})[0], 403)
+        self.assertEqual(client.submit([self.clip], os.path.join(self.work, "out")), ["1"])
+
+
+@unittest.skipIf(sys.platform == "win32", "the stand-in ffmpeg is a shell script")
+class LocalWorkersTest(unittest.TestCase):
+    """Several worker processes on this machine against one server, with the
+    bench's stand-in ffmpeg (no encoder needed)."""
+
+    def setUp(self):
+        self.work = tempfile.mkdtemp(prefix="jobworkers-")
+        self.ffmpeg, _ = fake_tools(self.work)
+        home = os.path.join(self.work, "home")
+        os.makedirs(home)
+        # Workers find the stand-in ffprobe on PATH and cache encoder detection in their own HOME
+        self.env = mock.patch.dict(os.environ, {"HOME": home, "USERPROFILE": home, "BENCH_FAKE_SPEED": "4",
+                                                "PATH": os.path.dirname(self.ffmpeg) + os.pathsep + os.environ.get("PATH", "")})
+        self.env.start()
+        self.server = JobServer(0, queue=JobQueue(lease_timeout=2.0, allowed_roots=[self.work]), token=TOKEN).start()
+        self.client = JobClient(self.server.url, token=TOKEN)
+        self.procs = []
+
+    def tearDown(self):
+        for proc in self.procs: proc.terminate()
+        for proc in self.procs: proc.wait()
+        self.server.stop()
+        self.env.stop()
+        shutil.rmtree(self.work, ignore_errors=True)
+
+    def _inputs(self, count, duration):
+        folder = os.path.join(self.work, "in")
+        os.makedirs(folder, exist_ok=True)
+        return make_fake_inputs(folder, count, duration, "sparse")
+
+    def _wait(self, ids, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            jobs = [j for j in self.client.jobs() if j["id"] in ids]
+            if all(j["status"] in FINISHED for j in jobs): return jobs
+            time.sleep(0.2)
+        self.fail(f"jobs still running after {timeout}s: {self.client.jobs()}")
+
+    def test_workers_share_the_queue(self):
+        inputs = self._inputs(6, 2)
+        out_dir = os.path.join(self.work, "out")
+        ids = self.client.submit(inputs, out_dir)
+        self.procs = spawn_local_workers(self.server.url, 3, self.ffmpeg, token=TOKEN)
+        jobs = self._wait(ids)
+        self.assertEqual([j["status"] for j in jobs], [BurnJob.DONE] * 6)
+        self.assertGreater(len({j["worker"] for j in jobs}), 1)
+        names = sorted(os.path.basename(p) for p in inputs)
+        self.assertEqual(sorted(n for n in os.listdir(out_dir) if n != JOURNAL_NAME), names)  # no staging leftovers
+
+    def test_job_of_a_killed_worker_runs_again_elsewhere(self):
+        inputs = self._inputs(2, 12)  # 3 s each at BENCH_FAKE_SPEED=4
+        ids = self.client.submit(inputs, os.path.join(self.work, "out"))
+        self.procs = spawn_local_workers(self.server.url, 2, self.ffmpeg, token=TOKEN)
+        deadline = time.monotonic() + 30
+        while not all(j["status"] == BurnJob.RUNNING for j in self.client.jobs()):
+            self.assertLess(time.monotonic(), deadline, "workers never started")
+            time.sleep(0.1)
+        victim = self.procs[0]
+        victim.kill()
+        victim.wait()
+        jobs = self._wait(ids)
+        self.assertEqual([j["status"] for j in jobs], [BurnJob.DONE] * 2)
+        lost = [j for j in jobs if j["attempts"] == 2]
+        self.assertEqual(len(lost), 1)
+        self.assertNotIn(f"-{victim.pid}-", lost[0]["worker"])
+        self.assertTrue(os.path.exists(lost[0]["output"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import segment_encode
+from media_probe import find_ffprobe
+
+FFMPEG = shutil.which("ffmpeg")
+FFPROBE = find_ffprobe(FFMPEG) if FFMPEG else None
+FPS = 25
+# Lossless, so decoded frames of a join can be compared bit for bit with a full encode
+LOSSLESS = ['-c:v', 'libx264', '-preset', 'ultrafast', '-qp', '0']
+# Time-dependent stand-in for the subtitles filter (no libass needed): if the
+# segment offsets were wrong, the box would land on the wrong frames
+TIMED_FILTER = "drawbox=x=0:y=0:w=64:h=64:c=red:t=fill:enable='between(t,3.2,5.6)'"
+
+
+class PlanSegmentsTest(unittest.TestCase):
+    def test_cuts_on_keyframes_near_even_split(self):
+        keyframes = [i * 2.0 for i in range(150)]
+        spans = segment_encode.plan_segments(keyframes, 300.0, 3)
+        self.assertEqual(spans, [(0.0, 100.0), (100.0, 200.0), (200.0, None)])
+
+    def test_cut_snaps_to_nearest_keyframe(self):
+        keyframes = [0.0, 95.0, 130.0, 240.0]
+        spans = segment_encode.plan_segments(keyframes, 240.0, 2)
+        self.assertEqual(spans, [(0.0, 130.0), (130.0, None)])
+
+    def test_short_or_unsplittable_files_stay_whole(self):
+        self.assertEqual(segment_encode.plan_segments([0.0, 10.0], 90.0, 4), [(0.0, None)])
+        self.assertEqual(segment_encode.plan_segments([], 600.0, 4), [(0.0, None)])
+        self.assertEqual(segment_encode.plan_segments([0.0, 300.0], 600.0, 1), [(0.0, None)])
+
+    def test_count_is_capped_by_min_seconds(self):
+        keyframes = [float(i) for i in range(200)]
+        self.assertEqual(len(segment_encode.plan_segments(keyframes, 200.0, 8, min_seconds=60)), 3)
+
+
+class EngineSegmentCountTest(unittest.TestCase):
+    """--segments is capped by a GPU's sessions, not by the CPU job limit."""
+
+    class Prober:
+        def duration(self, path):
+            return 3600.0
+
+    def _segments(self, resource):
+        from burn_engine import BurnEngine, BurnJob
+        engine = BurnEngine({"segments": 4}, ffmpeg_exe="ffmpeg", prober=self.Prober(), resource_limits={"cpu": 1, "nvenc": 3})
+        engine.jobs = [BurnJob("in.mkv", "out.mkv", resource=resource)]
+        engine.plan_segments()
+        return engine.jobs[0].segments
+
+    def test_cpu_keeps_the_requested_count(self):
+        self.assertEqual(self._segments("cpu"), 4)
+
+    def test_gpu_is_capped_at_its_sessions(self):
+        self.assertEqual(self._segments("nvenc"), 3)
+
+
+class SegmentFilterTest(unittest.TestCase):
+    def test_first_span_is_not_shifted(self):
+        self.assertEqual(segment_encode.segment_filter(0.0, "subtitles=a.srt"), "subtitles=a.srt,format=yuv420p")
+
+    def test_later_span_is_shifted_to_source_time_and_rebased(self):
+        vf = segment_encode.segment_filter(12.5, "subtitles=a.srt")
+        self.assertEqual(vf, "setpts=PTS+12.500000/TB,subtitles=a.srt,setpts=PTS-STARTPTS,format=yuv420p")
+
+
+class AudioMappingTest(unittest.TestCase):
+    """Every mode keeps the same audio: the first track, if there is one."""
+
+    def _audio_maps(self, cmd):
+        return [cmd[i + 1] for i, a in enumerate(cmd[:-1]) if a == '-map' and ':a' in cmd[i + 1]]
+
+    def test_segment_commands_map_first_track(self):
+        self.assertEqual(self._audio_maps(segment_encode.build_audio_cmd("ffmpeg", "in.mkv", ['-c:a', 'aac'], "a.mka")), ['0:a:0?'])
+        self.assertEqual(self._audio_maps(segment_encode.build_concat_cmd("ffmpeg", "list.txt", "in.mkv", "out.mkv")), ['1:a:0?'])
+
+    def test_full_encode_maps_first_track(self):
+        from burn_engine import build_burn_cmd, make_settings
+        self.assertEqual(self._audio_maps(build_burn_cmd("ffmpeg", "in.mkv", "out.mkv", make_settings(), "in.srt")), ['0:a:0?'])
+
+    def test_normalize_mux_maps_the_measured_track(self):
+        # Loudness pass 1 measures 0:a:0; pass 2 must not apply its gain to other tracks
+        from burn_engine import build_mux_cmd, audio_args
+        cmd = build_mux_cmd("ffmpeg", "video.mkv", "in.mkv", "out.mkv", audio_args("normalize"))
+        self.assertEqual(self._audio_maps(cmd), ['1:a:0?'])
+
+
+def _run(cmd):
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _frame_hashes(path):
+    """Per-frame hashes of the decoded video."""
+    r = subprocess.run([FFMPEG, '-v', 'error', '-i', path, '-map', '0:v:0', '-f', 'framemd5', '-'],
+                       stdout=subprocess.PIPE, check=True, encoding='utf-8')
+    return [line.rsplit(',', 1)[-1].strip() for line in r.stdout.splitlines() if line and not line.startswith('#')]
+
+
+@unittest.skipUnless(FFMPEG and FFPROBE, "needs ffmpeg and ffprobe")
+class SegmentJoinTest(unittest.TestCase):
+    """Encodes a short lavfi clip in keyframe-aligned spans and joins them the
+    way the engine does."""
+
+    def setUp(self):
+        self.work = tempfile.mkdtemp(prefix="segtest-")
+        self.source = os.path.join(self.work, "source.mp4")
+        _run([FFMPEG, '-y', '-f', 'lavfi', '-i', f"testsrc2=size=160x120:rate={FPS}:duration=9",
+              '-f', 'lavfi', '-i', "sine=frequency=440:duration=9",
+              '-c:v', 'libx264', '-preset', 'ultrafast', '-g', str(FPS), '-pix_fmt', 'yuv420p',
+              '-c:a', 'aac', '-shortest', self.source])
+
+    def tearDown(self):
+        shutil.rmtree(self.work, ignore_errors=True)
+
+    def _segmented(self, count):
+        keyframes = segment_encode.keyframe_times(FFPROBE, self.source)
+        spans = segment_encode.plan_segments(keyframes, 9.0, count, min_seconds=2)
+        self.assertEqual(len(spans), count)
+        self.assertTrue(all(start in keyframes for start, _ in spans))
+        parts = []
+        for i, (start, end) in enumerate(spans):
+            part = os.path.join(self.work, f"seg{i}.mkv")
+            _run(segment_encode.build_segment_cmd(FFMPEG, self.source, start, end,
+                                                  segment_encode.segment_filter(start, TIMED_FILTER), LOSSLESS, part, fps=FPS))
+            parts.append(part)
+        list_path = segment_encode.write_concat_list(parts, os.path.join(self.work, "list.txt"))
+        out = os.path.join(self.work, "joined.mp4")
+        _run(segment_encode.build_concat_cmd(FFMPEG, list_path, self.source, out))
+        return out
+
+    def test_join_matches_full_encode_frame_for_frame(self):
+        full = os.path.join(self.work, "full.mp4")
+        _run([FFMPEG, '-y', '-i', self.source, '-map', '0:v:0', '-vf', f"{TIMED_FILTER},format=yuv420p", *LOSSLESS, full])
+        joined = self._segmented(3)
+        self.assertEqual(_frame_hashes(joined), _frame_hashes(full))
+
+    def test_join_keeps_frame_count_and_av_sync(self):
+        joined = self._segmented(3)
+        self.assertEqual(segment_encode.check_join(FFPROBE, self.source, joined, FPS, count_frames=True), [])
+        self.assertEqual(segment_encode.check_join(FFPROBE, self.source, joined, FPS), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from subtitles import decode_text, parse_srt, srt_to_ass
+
+SRT = "1\r\n00:00:01,000 --> 00:00:02,500\r\nHello there\r\n\r\n2\r\n00:00:03,000 --> 00:00:04,000\r\nCafé\r\n"
+# Only ASCII-range characters: as UTF-16 these bytes are also valid UTF-8
+ASCII_SRT = SRT.replace("é", "e")
+
+
+class DecodeTextTest(unittest.TestCase):
+    def test_bomless_utf16_is_not_taken_for_utf8(self):
+        for encoding in ('utf-16-le', 'utf-16-be'):
+            text = decode_text(ASCII_SRT.encode(encoding))
+            self.assertEqual(text, ASCII_SRT, encoding)
+            self.assertEqual(parse_srt(text), [(1.0, 2.5), (3.0, 4.0)])
+            self.assertEqual(srt_to_ass(text).count("\nDialogue:"), 2)
+
+    def test_bom_utf8_and_legacy_encodings(self):
+        self.assertEqual(decode_text(SRT.encode('utf-16')), SRT)  # with BOM
+        self.assertEqual(decode_text(SRT.encode('utf-8')), SRT)
+        self.assertEqual(decode_text(SRT.encode('cp1252')), SRT)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import json
+import heapq
+import threading
+
+from ffmpeg_utils import DATA_DIR
+
+# ==========================================
+#      THROUGHPUT MODEL AND BATCH ETA
+# ==========================================
+# Learns encode speed (media seconds per wall second) from finished jobs,
+# per resolution class, source codec, preset and backend, and keeps it on
+# disk so the first file of the next run is already estimated well. Probe
+# data + the model give each job a predicted encode time; a small list
+# scheduling simulation over the engine's worker count gives the batch ETA.
+
+THROUGHPUT_PATH = os.path.join(DATA_DIR, "throughput.json")
+# Weight of the newest job in the running average: adapts, but one odd file does not swing it
+EWMA_ALPHA = 0.3
+HEIGHT_CLASSES = (480, 720, 1080, 1440, 2160)
+# Before any history: rough 1080p speeds per resource, scaled by pixel count
+PRIOR_SPEED_1080 = {"nvenc": 6.0, "qsv": 4.0, "amf": 4.0, "videotoolbox": 3.0, "cpu": 1.0}
+PRESET_FACTOR = {"p1": 1.4, "p4": 1.0, "p7": 0.6}
+
+
+def height_class(height):
+    for h in HEIGHT_CLASSES:
+        if (height or 0) <= h * 1.1:
+            return h
+    return HEIGHT_CLASSES[-1]
+
+
+def model_key(info, preset, backend_name):
+    info = info or {}
+    return f"{height_class(info.get('height'))}p|{info.get('vcodec') or '?'}|{preset}|{backend_name or '?'}"
+
+
+class ThroughputModel:
+    """Per-key running average of encode speed, persisted as JSON."""
+
+    def __init__(self, path=THROUGHPUT_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        try:
+            with open(path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+        self.dirty = False
+
+    def learn(self, info, preset, backend_name, media_seconds, wall_seconds):
+        if media_seconds <= 0 or wall_seconds <= 0: return
+        speed = media_seconds / wall_seconds
+        key = model_key(info, preset, backend_name)
+        with self.lock:
+            e = self.entries.get(key)
+            if e is None:
+                self.entries[key] = {"speed": speed, "n": 1}
+            else:
+                e["speed"] += EWMA_ALPHA * (speed - e["speed"])
+                e["n"] += 1
+            self.dirty = True
+
+    def predict_speed(self, info, preset, backend_name, resource=None):
+        """Expected speed for this source/preset/backend. Falls back to the
+        same backend and preset at another resolution (scaled by pixels),
+        then to a prior for the resource."""
+        info = info or {}
+        with self.lock:
+            e = self.entries.get(model_key(info, preset, backend_name))
+            if e: return e["speed"]
+            pixels = (info.get("width") or 1920) * (info.get("height") or 1080)
+            related = [(k, v) for k, v in self.entries.items() if k.endswith(f"|{preset}|{backend_name}")]
+        if related:
+            # Nearest resolution class with history, speed scaled by pixel count
+            k, v = min(related, key=lambda kv: abs(int(kv[0].split("p|")[0]) - height_class(info.get("height"))))
+            h = int(k.split("p|")[0])
+            return v["speed"] * (h * h * 16 / 9) / pixels
+        base = PRIOR_SPEED_1080.get(resource or "nvenc", 1.0) * PRESET_FACTOR.get(preset, 1.0)
+        return base * (1920 * 1080) / pixels
+
+    def predict_seconds(self, info, preset, backend_name, resource=None):
+        duration = (info or {}).get("duration") or 0
+        return duration / self.predict_speed(info, preset, backend_name, resource) if duration else 0.0
+
+    def save(self):
+        with self.lock:
+            if not self.dirty: return
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp = self.path + ".tmp"
+                with open(tmp, "w", encoding='utf-8') as f:
+                    json.dump(self.entries, f, indent=1)
+                os.replace(tmp, self.path)
+                self.dirty = False
+            except OSError:
+                pass
+
+
+def makespan(durations, workers, busy=()):
+    """Finish time of list-scheduling `durations` (in order) on `workers`
+    slots, some of which are already busy for the given remaining times."""
+    workers = max(1, workers)
+    slots = sorted(busy)[:workers] + [0.0] * max(0, workers - len(busy))
+    heapq.heapify(slots)
+    for d in durations:
+        heapq.heappush(slots, heapq.heappop(slots) + d)
+    return max(slots) if slots else 0.0
+
+
+def longest_first(jobs, estimate):
+    """LPT order: longest predicted jobs first keeps parallel workers from
+    ending on one long straggler."""
+    return sorted(jobs, key=estimate, reverse=True)
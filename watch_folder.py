@@ -0,0 +1,294 @@
+import os
+import sys
+import time
+import errno
+import struct
+import select
+import threading
+
+from media_import import VIDEO_EXTS, DEFAULT_EXCLUDE, scan_folder, _matches
+from job_journal import file_signature
+
+# ==========================================
+#           WATCH-FOLDER DAEMON
+# ==========================================
+# Long-running ingest: new videos (and their .srt sidecars) under a watched
+# folder are burned with the configured settings into a target folder.
+#
+# Change hints come from inotify on Linux (via ctypes, no extra package) and
+# from a periodic scandir walk everywhere; network shares do not deliver
+# inotify events for writes made by other machines, so the walk still runs
+# with inotify, just rarely. A file is only picked up once its size and
+# mtime have stopped changing for `settle` seconds. What has been handled is
+# remembered by file signature, and the output folder's job journal skips
+# anything already burned, so nothing is processed twice across restarts.
+
+SUB_EXT = ".srt"
+DEFAULT_SETTLE = 10.0
+DEFAULT_POLL = 10.0        # walk interval without inotify
+INOTIFY_POLL = 300.0       # safety walk interval with inotify
+# A video with no .srt yet waits this long for one before burning its embedded track
+DEFAULT_PAIR_WAIT = 30.0
+
+
+# --- INOTIFY (LINUX) ---
+IN_CLOSE_WRITE, IN_MOVED_TO, IN_CREATE = 0x8, 0x80, 0x100
+IN_IGNORED, IN_ISDIR, IN_Q_OVERFLOW = 0x8000, 0x40000000, 0x4000
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class Inotify:
+    """Minimal recursive inotify over ctypes. get(timeout) returns the paths
+    that changed, once each per read, or None after a queue overflow (caller
+    should rescan)."""
+
+    # No IN_MODIFY: it fires on every write of a copy in progress. IN_CREATE
+    # starts the settle timer (which polls size and mtime itself) and
+    # IN_CLOSE_WRITE / IN_MOVED_TO mark the end of a write or a rename in.
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    def __init__(self):
+        import ctypes, ctypes.util
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}  # watch descriptor -> directory
+
+    def add_tree(self, root, exclude):
+        self.add(root)
+        for folder, subdirs, _ in os.walk(root):
+            subdirs[:] = [d for d in subdirs if not _matches(d, exclude)]
+            for d in subdirs:
+                self.add(os.path.join(folder, d))
+
+    def add(self, folder):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(folder), self.MASK)
+        if wd >= 0:
+            self.dirs[wd] = folder
+
+    def get(self, timeout, wake_fd=None):
+        """wake_fd: another fd (a pipe) that ends the wait early when readable."""
+        ready, _, _ = select.select([self.fd] + ([wake_fd] if wake_fd is not None else []), [], [], timeout)
+        if self.fd not in ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except OSError as e:
+            if e.errno == errno.EAGAIN: return []
+            raise
+        changed, pos = {}, 0  # insertion-ordered set
+        while pos + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, pos)
+            name = data[pos + EVENT_HEADER.size:pos + EVENT_HEADER.size + length].rstrip(b"\0")
+            pos += EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            folder = self.dirs.get(wd)
+            if folder is None: continue
+            path = os.path.join(folder, os.fsdecode(name)) if name else folder
+            changed[(path, bool(mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO)))] = None
+        return list(changed)
+
+    def close(self):
+        os.close(self.fd)
+
+
+def open_inotify():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        return Inotify()
+    except (OSError, AttributeError):
+        return None
+
+
+# --- WATCHER ---
+class FolderWatcher:
+    """Watches `root` and hands stable (video, sub_path) pairs to on_ready.
+
+    on_ready(pairs) is called from the watcher thread; it should return
+    quickly (queue the work). Call start() / stop().
+    """
+
+    def __init__(self, root, on_ready, settle=DEFAULT_SETTLE, poll=None, pair_wait=DEFAULT_PAIR_WAIT,
+                 include=None, exclude=None, use_inotify=True, skip_existing=False):
+        self.root = os.path.abspath(root)
+        self.on_ready = on_ready
+        self.settle = settle
+        self.pair_wait = pair_wait
+        self.include = include
+        self.exclude = DEFAULT_EXCLUDE + list(exclude or [])
+        self.inotify = open_inotify() if use_inotify else None
+        self.poll = poll or (INOTIFY_POLL if self.inotify else DEFAULT_POLL)
+        self.skip_existing = skip_existing
+        self.pending = {}  # video path -> (signature, first time that signature was seen)
+        self.handled = {}  # video path -> (video signature, sub signature) last handed over
+        self.stop_event = threading.Event()
+        # stop() writes here so a watcher blocked on inotify wakes at once
+        self.wake_r, self.wake_w = os.pipe() if self.inotify else (None, None)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.wake_w is not None:
+            os.write(self.wake_w, b"x")
+
+    def join(self, timeout=None):
+        self.thread.join(timeout)
+
+    def _is_video(self, path):
+        name = os.path.basename(path)
+        return name.lower().endswith(VIDEO_EXTS) and not _matches(name, self.exclude)
+
+    def _video_for_sub(self, sub_path):
+        stem = os.path.splitext(sub_path)[0]
+        folder = os.path.dirname(sub_path)
+        try:
+            names = {n.lower(): n for n in os.listdir(folder)}
+        except OSError:
+            return None
+        for ext in VIDEO_EXTS:
+            name = names.get(os.path.basename(stem).lower() + ext)
+            if name: return os.path.join(folder, name)
+        return None
+
+    def _sidecar(self, video):
+        folder = os.path.dirname(video)
+        try:
+            names = {n.lower(): n for n in os.listdir(folder)}
+        except OSError:
+            return None
+        name = names.get(os.path.splitext(os.path.basename(video))[0].lower() + SUB_EXT)
+        return os.path.join(folder, name) if name else None
+
+    def _touch(self, video):
+        """Something about this video (or its sidecar) may have changed."""
+        sub = self._sidecar(video)
+        key = (file_signature(video), file_signature(sub))
+        if self.handled.get(video) == key: return
+        if video not in self.pending or self.pending[video][0] != key:
+            self.pending[video] = (key, time.monotonic())
+
+    def _walk(self, initial=False):
+        for video, _ in scan_folder(self.root, self.include, self.exclude, cancel_event=self.stop_event):
+            if initial and self.skip_existing:
+                self.handled[video] = (file_signature(video), file_signature(self._sidecar(video)))
+            else:
+                self._touch(video)
+
+    def _check_pending(self):
+        """Moves videos whose files stopped changing to on_ready."""
+        now = time.monotonic()
+        ready = []
+        for video, (key, since) in list(self.pending.items()):
+            current = (file_signature(video), file_signature(self._sidecar(video)))
+            if "|missing" in current[0]:
+                del self.pending[video]
+                continue
+            if current != key:
+                self.pending[video] = (current, now)  # still being written
+                continue
+            age = now - since
+            if age < self.settle: continue
+            # No sidecar yet: give the ingest a little longer to drop one
+            if current[1] == "-" and age < self.pair_wait: continue
+            if not _readable(video): continue
+            del self.pending[video]
+            self.handled[video] = current
+            sub = self._sidecar(video)
+            ready.append((video, sub or video))
+        if ready:
+            self.on_ready(ready)
+
+    def run(self):
+        if self.inotify:
+            self.inotify.add_tree(self.root, self.exclude)
+        self._walk(initial=True)
+        last_walk = time.monotonic()
+        while not self.stop_event.is_set():
+            # Idle: block on events (or sleep) until the next walk; busy: tick every second
+            timeout = 1.0 if self.pending else max(0.0, self.poll - (time.monotonic() - last_walk))
+            if self.inotify:
+                changed = self.inotify.get(timeout, self.wake_r)
+                if changed is None:
+                    self._walk()
+                    last_walk = time.monotonic()
+                else:
+                    for path, is_dir in changed:
+                        if is_dir:
+                            self.inotify.add_tree(path, self.exclude)
+                            for video, _ in scan_folder(path, self.include, self.exclude):
+                                self._touch(video)
+                        elif path.lower().endswith(SUB_EXT):
+                            video = self._video_for_sub(path)
+                            if video: self._touch(video)
+                        elif self._is_video(path):
+                            self._touch(path)
+            else:
+                self.stop_event.wait(timeout)
+            if time.monotonic() - last_walk >= self.poll:
+                self._walk()
+                last_walk = time.monotonic()
+            self._check_pending()
+        if self.inotify:
+            self.inotify.close()
+            os.close(self.wake_r)
+            os.close(self.wake_w)
+
+
+def _readable(path):
+    # Windows keeps files that are still being copied locked against reading
+    try:
+        with open(path, "rb") as f:
+            f.read(1)
+        return True
+    except OSError:
+        return False
+
+
+# --- DAEMON ---
+def run_watch(root, output_dir, make_engine, settle=DEFAULT_SETTLE, poll=None, skip_existing=False, log=None):
+    """Watches root until interrupted, burning stable files into output_dir.
+
+    make_engine() returns a fresh BurnEngine for each batch of ready files;
+    files that become ready while a batch runs go into the next one.
+    """
+    log = log or (lambda msg: print(msg, file=sys.stderr))
+    output_dir = os.path.abspath(output_dir)
+    exclude = []
+    if output_dir.startswith(os.path.abspath(root) + os.sep):
+        exclude.append(os.path.basename(output_dir))  # never ingest our own outputs
+
+    queue, cond = [], threading.Condition()
+
+    def on_ready(pairs):
+        with cond:
+            queue.extend(pairs)
+            cond.notify()
+
+    watcher = FolderWatcher(root, on_ready, settle=settle, poll=poll, exclude=exclude, skip_existing=skip_existing).start()
+    log(f"Watching {root} -> {output_dir} ({'inotify' if watcher.inotify else 'polling'}, settle {settle:g}s)")
+    engine = None
+    try:
+        while True:
+            with cond:
+                while not queue:
+                    cond.wait(1.0)
+                batch, queue[:] = list(queue), []
+            engine = make_engine()
+            log(f"Burning {len(batch)} new file(s)")
+            # Outputs mirror each file's folder below the watched root
+            engine.run([v for v, _ in batch], output_dir, dict(batch), root=root)
+    except KeyboardInterrupt:
+        if engine: engine.cancel()
+        return 130
+    finally:
+        watcher.stop()